@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+AstockQuant 导入耗时预算检查
+用python -X importtime分别测量各插件的导入耗时，超出预算或导入了akshare、tushare、talib、
+backtrader等重量级依赖时返回非零退出码，可在本地修改后运行；CI中由tests/test_import_time_budget.py执行
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+# 各插件的导入耗时预算（毫秒），不含pandas和numpy本身
+BUDGETS_MS = {
+    'qdata': 250,
+    'qindicator': 50,
+    'qstrategy': 100,
+    'qbackengine': 400,
+}
+
+# 这些依赖只应在首次使用对应后端、策略或引擎时导入
+HEAVY_MODULES = ('akshare', 'tushare', 'talib', 'backtrader')
+
+# 预先导入的基础依赖，计入各插件耗时会掩盖插件自身的变化
+BASELINE_IMPORTS = 'import numpy, pandas'
+
+
+def plugin_env():
+    """
+    子进程环境变量：PYTHONPATH指向各插件的源码目录
+    """
+    root = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ)
+    paths = [os.path.join(root, name) for name in BUDGETS_MS]
+    env['PYTHONPATH'] = os.pathsep.join(paths + [env.get('PYTHONPATH', '')]).rstrip(os.pathsep)
+    return env
+
+
+def measure(package, env):
+    """
+    在新进程中导入插件，返回插件的累计导入耗时（微秒）和本次导入的全部模块
+
+    子进程在空的临时目录中运行：'-c'会把当前目录放在sys.path最前面，
+    在仓库根目录运行时会导入根目录下的同名包装模块而不是插件本身
+
+    参数:
+        package: 插件名称
+        env: 子进程环境变量
+    """
+    with tempfile.TemporaryDirectory() as cwd:
+        proc = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'{BASELINE_IMPORTS}; import {package}'],
+            capture_output=True, text=True, env=env, cwd=cwd
+        )
+    if proc.returncode != 0:
+        raise RuntimeError(f"导入{package}失败:\n{proc.stderr[-2000:]}")
+
+    cumulative = None
+    modules = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        name = fields[2].strip()
+        modules.add(name)
+        if name == package:
+            cumulative = int(fields[1])
+    if cumulative is None:
+        raise RuntimeError(f"importtime输出中没有找到{package}")
+    return cumulative, modules
+
+
+def check(package, env=None, repeat=3, scale=1.0):
+    """
+    测量插件的导入耗时并与预算比较
+
+    参数:
+        package: 插件名称
+        env: 子进程环境变量，默认为plugin_env()
+        repeat: 测量次数，取最小值以减少抖动
+        scale: 预算倍数
+
+    返回:
+        (导入耗时毫秒数, 预算毫秒数或None, 导入了的重量级依赖列表)
+    """
+    env = env or plugin_env()
+    samples = [measure(package, env) for _ in range(max(repeat, 1))]
+    elapsed_ms = min(cumulative for cumulative, _ in samples) / 1000.0
+    heavy = sorted({name for _, modules in samples for name in modules
+                    if name.split('.')[0] in HEAVY_MODULES})
+    budget = BUDGETS_MS.get(package)
+    return elapsed_ms, budget * scale if budget is not None else None, heavy
+
+
+def main():
+    parser = argparse.ArgumentParser(description='检查各插件的导入耗时预算')
+    parser.add_argument('packages', nargs='*', default=list(BUDGETS_MS), help='要检查的插件，默认全部')
+    parser.add_argument('--repeat', type=int, default=3, help='每个插件测量的次数，取最小值以减少抖动')
+    parser.add_argument('--scale', type=float, default=1.0, help='预算倍数，较慢的机器上可以放宽')
+    args = parser.parse_args()
+
+    env = plugin_env()
+    failed = False
+    for package in args.packages:
+        try:
+            elapsed_ms, budget, heavy = check(package, env, args.repeat, args.scale)
+        except RuntimeError as e:
+            print(f"✗ {e}")
+            failed = True
+            continue
+
+        over = budget is not None and elapsed_ms > budget
+        status = '✗' if over or heavy else '✓'
+        limit = f"{budget:.0f}ms" if budget is not None else '无预算'
+        print(f"{status} {package:<12} {elapsed_ms:8.1f}ms / {limit}")
+        if heavy:
+            print(f"    导入了重量级依赖: {', '.join(heavy)}")
+        failed = failed or over or bool(heavy)
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -826,6 +826,11 @@ if __name__ == '__main__':
     
     print("将要分析的股票代码：", codeList)
 
+    # 先并发批量获取所有股票的日线数据写入本地存储，后续逐只分析时直接读取本地数据
+    batch = qdata.get_daily_data_batch(codeList, "20250101", "20251201", backend='akshare')
+    if batch.failed:
+        print("以下股票数据获取失败：", list(batch.failed.keys()))
+
     for i in codeList:
         try:
             stock1 = Stock()
@@ -5,7 +5,7 @@ qbackengine - 一个简洁的量化交易回测引擎插件系统
 """
 
 import logging
-from typing import Any, Dict, Optional, Type
+from typing import TYPE_CHECKING, Any, Dict, Optional, Type
 import pandas as pd
 from datetime import datetime
 
@@ -24,8 +24,11 @@ __author__ = "AstockQuant Team"
 from qdata import get_provider
 import qstrategy
 
-# 导入回测引擎实现
-from .engine import BacktraderEngine, MultiSymbolBacktraderEngine, SimpleLoopEngine, SimpleResult
+# 回测引擎实现依赖backtrader，在首次创建引擎或访问引擎类时才导入
+if TYPE_CHECKING:
+    from .engine import BacktraderEngine, MultiSymbolBacktraderEngine, SimpleLoopEngine, SimpleResult
+
+_ENGINE_CLASSES = ('BacktraderEngine', 'MultiSymbolBacktraderEngine', 'SimpleLoopEngine', 'SimpleResult')
 
 # 全局变量
 _current_engine = None
@@ -62,7 +65,7 @@ def create_backtrader_engine(
     commission: float = 0.00025,
     email_on_finish: bool = False,
     strategy_kwargs: dict = None
-) -> BacktraderEngine:
+) -> 'BacktraderEngine':
     """
     创建backtrader回测引擎
     
@@ -79,6 +82,8 @@ def create_backtrader_engine(
     返回:
         回测引擎实例
     """
+    from .engine import BacktraderEngine
+    
     # 获取数据提供者
     data_provider = get_provider()
     
@@ -121,7 +126,7 @@ def create_multi_symbol_engine(
     strategy_name: str = 'PairTrading',
     starting_cash: float = 100000.0,
     commission: float = 0.00025
-) -> MultiSymbolBacktraderEngine:
+) -> 'MultiSymbolBacktraderEngine':
     """
     创建多标的回测引擎
     
@@ -137,6 +142,8 @@ def create_multi_symbol_engine(
     返回:
         回测引擎实例
     """
+    from .engine import MultiSymbolBacktraderEngine
+    
     # 获取数据提供者
     data_provider = get_provider()
     
@@ -214,6 +221,7 @@ def run(
         )
     else:
         # 使用简单回测引擎
+        from .engine import SimpleLoopEngine
         data_provider = get_provider()
         
         # 应用策略名称映射
@@ -249,4 +257,11 @@ if not _initialized:
         logger.warning(f"自动初始化失败: {e}")
         logger.info("请手动调用qbackengine.init()进行初始化")
 
+def __getattr__(name: str) -> Any:
+    # 引擎类在首次访问时才导入backtrader
+    if name in _ENGINE_CLASSES:
+        from . import engine
+        return getattr(engine, name)
+    raise AttributeError(f"module 'qbackengine' has no attribute '{name}'")
+
 __all__ = ['BacktraderEngine', 'MultiSymbolBacktraderEngine', 'SimpleLoopEngine', 'run', 'init', 'create_backtrader_engine', 'create_multi_symbol_engine']
\ No newline at end of file
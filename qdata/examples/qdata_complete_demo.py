@@ -29,7 +29,7 @@ def show_module_info():
     try:
         print(f"qdata版本: {getattr(qdata, '__version__', '未知')}")
         qdata.init()
-        print(f"已注册后端: {list(getattr(qdata.backends, '_registered_backends', {}).keys())}")
+        print(f"可用后端: {qdata.backends.get_available_backends()}")
         print("模块初始化成功!")
     except Exception as e:
         print(f"模块信息获取失败: {e}")
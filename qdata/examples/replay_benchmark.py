@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+qdata 获取路径压测示例
+
+使用replay后端回放生成的日线数据，模拟上游延迟、错误率和限流，
+在不访问网络的情况下比较以下几种获取方式的耗时：
+1. 逐个请求（不使用缓存和本地存储）
+2. 批量请求（请求调度器和批量线程池）
+3. 内存缓存命中
+4. 本地K线存储（首次写入和再次读取）
+5. 上游出错和限流时的批量请求
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import qdata
+from qdata import BarStore, MemoryCache, TradingCalendar
+from qdata.calendar import set_calendar
+from qdata.backends.replay_provider import ReplayServer, set_replay_server
+
+START_DATE = '2021-01-01'
+END_DATE = '2023-12-31'
+
+
+def make_fixtures(fixture_dir: str, count: int, seed: int = 0) -> list:
+    """生成count个证券的随机游走日线录制文件，返回证券代码列表"""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(START_DATE, END_DATE)
+    daily_dir = os.path.join(fixture_dir, 'daily')
+    os.makedirs(daily_dir, exist_ok=True)
+    symbols = [f'{600000 + i:06d}' for i in range(count)]
+    for symbol in symbols:
+        close = 10 * np.exp(np.cumsum(rng.normal(0, 0.02, len(dates))))
+        spread = np.abs(rng.normal(0, 0.01, len(dates))) * close
+        df = pd.DataFrame({
+            'date': dates,
+            'open': close + rng.normal(0, 0.005, len(dates)) * close,
+            'high': close + spread,
+            'low': close - spread,
+            'close': close,
+            'volume': rng.integers(1_000_000, 10_000_000, len(dates)),
+        })
+        df.to_csv(os.path.join(daily_dir, f'{symbol}.csv'), index=False)
+    return symbols
+
+
+def run_scenario(name: str, server: ReplayServer, fn) -> None:
+    """执行一个场景并打印耗时和回放统计"""
+    server.reset_stats()
+    start = time.perf_counter()
+    failed = fn()
+    elapsed = time.perf_counter() - start
+    stats = server.stats()
+    print(f"{name:<20} {elapsed * 1000:10.1f}ms  上游请求 {stats['requests']:4d}  "
+          f"失败 {stats['errors']:3d}  限流 {stats['throttled']:3d}  未获取 {failed or 0:3d}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='使用replay后端压测qdata的获取路径')
+    parser.add_argument('--symbols', type=int, default=20, help='证券数量')
+    parser.add_argument('--latency', type=float, default=0.05, help='模拟的上游延迟（秒）')
+    parser.add_argument('--jitter', type=float, default=0.02, help='延迟抖动（秒）')
+    parser.add_argument('--error-rate', type=float, default=0.1, help='场景5的上游错误率')
+    parser.add_argument('--rate-limit', type=float, default=20, help='场景5的上游每秒请求数限制')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        fixture_dir = os.path.join(work_dir, 'fixtures')
+        symbols = make_fixtures(fixture_dir, args.symbols)
+
+        # 固定交易日历和存储位置，压测结果不受网络和本机已有数据影响
+        set_calendar('CN', TradingCalendar('CN', pd.bdate_range('2020-01-01', '2024-12-31')))
+        qdata.set_bar_store(BarStore(os.path.join(work_dir, 'bars')))
+        server = ReplayServer(fixture_dir, latency=args.latency, jitter=args.jitter)
+        set_replay_server(server)
+        options = dict(backend='replay', fixture_dir=fixture_dir)
+
+        print(f"{args.symbols}个证券，{START_DATE} ~ {END_DATE}，上游延迟{args.latency * 1000:.0f}ms")
+
+        def sequential():
+            for symbol in symbols:
+                qdata.get_daily_data(symbol, START_DATE, END_DATE, use_cache=False, use_store=False, **options)
+
+        def batch(**kwargs):
+            result = qdata.get_daily_data_batch(symbols, START_DATE, END_DATE, **options, **kwargs)
+            return len(result.failed)
+
+        run_scenario('1. 逐个请求', server, sequential)
+        run_scenario('2. 批量请求', server, lambda: batch(use_cache=False, use_store=False))
+
+        qdata.set_memory_cache(MemoryCache())
+        batch(use_store=False)
+        run_scenario('3. 内存缓存命中', server, lambda: batch(use_store=False))
+
+        run_scenario('4. 本地存储首次', server, lambda: batch(use_cache=False))
+        run_scenario('4. 本地存储再次', server, lambda: batch(use_cache=False))
+
+        # 换一个存储目录，保证请求真正到达上游
+        qdata.set_bar_store(BarStore(os.path.join(work_dir, 'bars_faulty')))
+        faulty = ReplayServer(fixture_dir, latency=args.latency, jitter=args.jitter,
+                              error_rate=args.error_rate, rate_limit=args.rate_limit, burst=5)
+        set_replay_server(faulty)
+        run_scenario('5. 出错和限流', faulty, lambda: batch(use_cache=False))
+
+
+if __name__ == '__main__':
+    main()
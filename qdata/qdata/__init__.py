@@ -4,8 +4,9 @@ qdata模块
 统一不同数据源的访问接口
 """
 import logging
+import numpy as np
 import pandas as pd
-from typing import Dict, List, Optional, Union, Any
+from typing import Any, Dict, Iterator, List, Optional, Union
 
 # 版本信息
 __version__ = "0.1.0"
@@ -14,30 +15,48 @@ __version__ = "0.1.0"
 logger = logging.getLogger(__name__)
 
 # 导入核心模块
-from qdata.provider import DataProvider
+from qdata.provider import AsyncDataProvider, DataProvider, ExecutorAsyncProvider, IncrementalProvider
 from qdata.core.data_manager import DataManager
+from qdata.core.bar_store import BarStore
+from qdata.core.batch import BatchResult, fetch_batch, get_backend_semaphore
+from qdata.core.panel import PanelArray, to_panel, to_array
+from qdata.core.singleflight import SingleFlight
+from qdata.core.memory_cache import MemoryCache, is_live_range
+from qdata.core.resample import resample_bars
+from qdata.core.adjust import apply_adjustment, normalize_adjust
+from qdata.core.executor import get_executor, run_blocking, set_executor
+from qdata.calendar import UNKNOWN_MARKET, TradingCalendar, calendar_for, get_calendar, market_of
 
 # 导入后端管理函数
 from qdata.backends import (
     register_backend,
     get_backend,
     set_default_backend,
-    create_provider
+    get_default_backend,
+    get_backend_config,
+    create_provider,
+    request_priority,
+    PRIORITY_BATCH
 )
 
 # 全局变量
 _data_provider = None
+_bar_store = None
+_bar_store_enabled = True
+_single_flight = SingleFlight()
+_memory_cache = MemoryCache()
 
 
 def init():
     """
-    初始化模块，设置默认后端并创建数据提供者实例
+    初始化模块，使用默认后端创建数据提供者实例
+    
+    导入qdata时不再自动调用，首次调用get_provider()时才创建数据提供者，
+    akshare、tushare等数据源依赖也在此时才导入
     """
     global _data_provider
     
     try:
-        # 设置默认后端为akshare
-        set_default_backend('akshare')
         # 创建数据提供者实例
         _data_provider = create_provider()
         logger.info("qdata模块初始化成功")
@@ -64,76 +83,556 @@ def get_provider() -> DataProvider:
     return _data_provider
 
 
+def set_bar_store(store: Optional[BarStore]) -> None:
+    """
+    设置本地K线存储
+    
+    Args:
+        store: BarStore实例，传入None则关闭本地存储
+    """
+    global _bar_store, _bar_store_enabled
+    
+    _bar_store = store
+    _bar_store_enabled = store is not None
+
+
+def get_bar_store() -> Optional[BarStore]:
+    """
+    获取本地K线存储实例，首次调用时按默认配置创建
+    
+    Returns:
+        Optional[BarStore]: 本地存储实例，已关闭时返回None
+    """
+    global _bar_store
+    
+    if not _bar_store_enabled:
+        return None
+    if _bar_store is None:
+        _bar_store = BarStore()
+    return _bar_store
+
+
+def _resolve_provider(backend: Optional[str], use_store: bool,
+                      dtype_profile: Optional[str] = None, mmap: bool = False, **kwargs) -> DataProvider:
+    """
+    解析本次调用使用的数据提供者，需要时在外层包装本地存储
+    
+    Args:
+        backend: 数据源后端名称，如果为None则使用默认后端
+        use_store: 是否使用本地K线存储
+        dtype_profile: 从本地存储读取时使用的数据类型方案
+        mmap: 是否以内存映射方式读取本地存储
+        **kwargs: 传递给后端构造函数的额外参数
+        
+    Returns:
+        DataProvider: 数据提供者实例
+    """
+    if backend is None:
+        provider = get_provider()
+    else:
+        provider = create_provider(backend, **kwargs)
+    backend_name = backend or get_default_backend()
+    
+    if isinstance(provider, AsyncDataProvider):
+        raise TypeError(f"{backend_name}是异步后端，请使用aget_daily_data/aget_minute_data")
+    
+    store = get_bar_store() if use_store and get_backend_config(backend_name).get('store', False) else None
+    if store is not None:
+        provider = IncrementalProvider(provider, backend_name, store, dtype_profile=dtype_profile, mmap=mmap,
+                                       trim_sessions=_uses_calendar(backend_name))
+    return provider
+
+
+def set_memory_cache(cache: Optional[MemoryCache]) -> None:
+    """
+    设置进程内存缓存
+    
+    Args:
+        cache: MemoryCache实例，传入None则关闭内存缓存
+    """
+    global _memory_cache
+    
+    _memory_cache = cache
+
+
+def get_memory_cache() -> Optional[MemoryCache]:
+    """
+    获取进程内存缓存
+    
+    Returns:
+        Optional[MemoryCache]: 内存缓存实例，已关闭时返回None
+    """
+    return _memory_cache
+
+
+def _cached_call(key: tuple, kwargs: Dict[str, Any], end: str, use_cache: bool, fetch) -> pd.DataFrame:
+    """
+    依次经过内存缓存和单飞层执行数据获取
+    
+    Args:
+        key: 请求键（不含额外参数），如(频率, 后端, 证券代码, 开始, 结束, ...)
+        kwargs: 传递给后端的额外参数，参与请求键的计算
+        end: 请求的结束时间，用于判断是否包含仍在变化的当天数据
+        use_cache: 是否使用内存缓存
+        fetch: 实际获取数据的无参函数
+        
+    Returns:
+        DataFrame: 获取到的数据，来自缓存或共享结果时返回浅拷贝
+    """
+    key = key + (tuple(sorted(kwargs.items())),)
+    try:
+        hash(key)
+    except TypeError:
+        # 额外参数不可哈希时既不缓存也不合并
+        return fetch()
+    
+    cache = _memory_cache if use_cache else None
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached.copy(deep=False)
+    
+    df, shared = _single_flight.do(key, fetch)
+    if cache is not None and not shared:
+        cache.put(key, df, live=is_live_range(end))
+    # 缓存和共享的结果在调用方之间共用底层数据，各自拿到浅拷贝，增删列不会互相影响
+    return df.copy(deep=False) if shared or cache is not None else df
+
+
+def _uses_calendar(backend: Optional[str]) -> bool:
+    """后端是否按交易日历收缩区间，csv、replay等离线后端在配置中关闭，避免构建A股日历时联网"""
+    return get_backend_config(backend or get_default_backend()).get('calendar', True)
+
+
+def _session_bounds(symbol: str, start_date: str, end_date: str, backend: Optional[str] = None) -> tuple:
+    """
+    把日期区间的首尾收缩到证券所属市场的交易日，用于生成缓存键
+    
+    Args:
+        symbol: 证券代码
+        start_date: 开始日期
+        end_date: 结束日期
+        backend: 数据源后端名称，如果为None则使用默认后端
+        
+    Returns:
+        tuple: (开始日期, 结束日期)，格式为'YYYY-MM-DD'；
+            后端不使用交易日历、无法判断所属市场、日历不可用或区间内没有交易日时原样返回
+    """
+    if not _uses_calendar(backend) or market_of(symbol) == UNKNOWN_MARKET:
+        return start_date, end_date
+    try:
+        bounds = calendar_for(symbol).clamp(start_date, end_date)
+    except Exception as e:
+        logger.debug(f"交易日历不可用，按原始日期请求: {e}")
+        return start_date, end_date
+    if bounds is None:
+        return start_date, end_date
+    return bounds[0].strftime('%Y-%m-%d'), bounds[1].strftime('%Y-%m-%d')
+
+
 def get_daily_data(
     symbol: str, 
     start_date: str, 
     end_date: str, 
     backend: Optional[str] = None, 
+    use_store: bool = True,
+    use_cache: bool = True,
+    adjust: Optional[str] = 'qfq',
+    dtype_profile: Optional[str] = None,
+    mmap: bool = False,
     **kwargs
 ) -> pd.DataFrame:
     """
     获取股票日线数据
     
+    依次查询进程内存缓存和本地K线存储，只向后端请求覆盖索引中缺失的日期区间；
+    并发的相同请求只会执行一次，其余调用方共享其结果
+    
     Args:
         symbol: 证券代码
         start_date: 开始日期，格式为'YYYY-MM-DD'
         end_date: 结束日期，格式为'YYYY-MM-DD'
         backend: 数据源后端名称，如果为None则使用默认后端
+        use_store: 是否使用本地K线存储
+        use_cache: 是否使用进程内存缓存
+        adjust: 复权方式，'qfq'（前复权）、'hfq'（后复权），None表示不复权；
+            使用本地存储且后端支持复权因子时，三种方式共用同一份不复权数据
+        dtype_profile: 数据类型方案，'compact'使用float32价格和uint32成交量，None保持float64
+        mmap: 是否返回内存映射本地存储文件的只读数据，多个回测进程共享同一份物理内存
         **kwargs: 传递给后端的额外参数
         
     Returns:
         DataFrame: 包含开盘价、最高价、最低价、收盘价、成交量等数据的DataFrame
     """
-    if backend is None:
-        provider = get_provider()
-    else:
-        provider = create_provider(backend, **kwargs)
+    # 按交易日历把首尾收缩到交易日，覆盖相同交易日的请求共用同一个缓存键；
+    # 后端仍按调用方的原始区间请求，收缩只影响缓存键
+    key_start, key_end = _session_bounds(symbol, start_date, end_date, backend)
     
-    try:
-        df = provider.get_daily_data(symbol, start_date, end_date, **kwargs)
+    def _fetch() -> pd.DataFrame:
+        provider = _resolve_provider(backend, use_store, dtype_profile, mmap, **kwargs)
+        df = provider.get_daily_data(symbol, start_date, end_date, adjust=adjust, **kwargs)
         # 使用数据管理器准备数据
-        return DataManager.prepare_data(df, 'daily')
+        return DataManager.prepare_data(df, 'daily', dtype_profile)
+    
+    try:
+        key = ('daily', backend or get_default_backend(), symbol, key_start, key_end,
+               use_store, normalize_adjust(adjust), dtype_profile, mmap)
+        return _cached_call(key, kwargs, end_date, use_cache, _fetch)
     except Exception as e:
         logger.error(f"获取日线数据失败: {e}")
         raise
 
 
+def get_daily_data_batch(
+    symbols: List[str],
+    start_date: str,
+    end_date: str,
+    backend: Optional[str] = None,
+    max_workers: Optional[int] = None,
+    **kwargs
+) -> BatchResult:
+    """
+    批量获取多个证券的日线数据
+    
+    在有界线程池上并发调用get_daily_data，同一后端同时在途的请求数
+    不超过后端配置中的max_concurrency，上游调用以批量优先级经过请求调度器
+    
+    Args:
+        symbols: 证券代码列表
+        start_date: 开始日期，格式为'YYYY-MM-DD'
+        end_date: 结束日期，格式为'YYYY-MM-DD'
+        backend: 数据源后端名称，如果为None则使用默认后端
+        max_workers: 线程池大小，默认根据证券数量确定
+        **kwargs: 传递给get_daily_data的额外参数
+        
+    Returns:
+        BatchResult: 以证券代码为键的DataFrame字典，失败的证券及异常记录在failed属性中
+    """
+    backend_name = backend or get_default_backend()
+    if backend is None:
+        # 在主线程中完成默认数据提供者的初始化，避免工作线程竞争
+        get_provider()
+    
+    semaphore = get_backend_semaphore(
+        backend_name, get_backend_config(backend_name).get('max_concurrency', 4)
+    )
+    
+    def _fetch_one(symbol: str) -> pd.DataFrame:
+        # 批量请求以低优先级排队，交互请求可以插队
+        with request_priority(PRIORITY_BATCH):
+            return get_daily_data(symbol, start_date, end_date, backend=backend, **kwargs)
+    
+    return fetch_batch(symbols, _fetch_one, semaphore, max_workers=max_workers)
+
+
+def get_panel_data(
+    symbols: List[str],
+    start_date: str,
+    end_date: str,
+    layout: str = 'long',
+    fields: Optional[List[str]] = None,
+    how: str = 'outer',
+    backend: Optional[str] = None,
+    **kwargs
+) -> Union[pd.DataFrame, PanelArray]:
+    """
+    获取多个证券对齐后的日线面板数据
+    
+    Args:
+        symbols: 证券代码列表
+        start_date: 开始日期，格式为'YYYY-MM-DD'
+        end_date: 结束日期，格式为'YYYY-MM-DD'
+        layout: 输出格式，'long'为(date, symbol)多级索引的长表，'array'为 时间 × 证券 × 字段 的三维数组
+        fields: 需要保留的字段，默认为开高低收量
+        how: 日历对齐方式，'outer'保留任一证券有数据的日期，'inner'只保留所有证券都有数据的日期
+        backend: 数据源后端名称，如果为None则使用默认后端
+        **kwargs: 传递给get_daily_data_batch的额外参数，dtype_profile='compact'时数组使用float32，
+            长表的symbol层使用category
+        
+    Returns:
+        Union[pd.DataFrame, PanelArray]: 面板数据
+    """
+    if layout not in ('long', 'array'):
+        raise ValueError(f"不支持的面板格式: {layout}")
+    
+    frames = get_daily_data_batch(symbols, start_date, end_date, backend=backend, **kwargs)
+    if frames.failed:
+        logger.warning(f"以下证券获取失败，未包含在面板中: {', '.join(frames.failed)}")
+    
+    if layout == 'array':
+        dtype = np.float32 if kwargs.get('dtype_profile') == 'compact' else np.float64
+        return to_array(frames, fields=fields, how=how, dtype=dtype)
+    return to_panel(frames, fields=fields, how=how, dtype_profile=kwargs.get('dtype_profile'))
+
+
 def get_minute_data(
     symbol: str, 
     start_time: str, 
     end_time: str, 
     frequency: str = '1', 
     backend: Optional[str] = None, 
+    use_store: bool = True,
+    use_cache: bool = True,
+    dtype_profile: Optional[str] = None,
+    mmap: bool = False,
     **kwargs
 ) -> pd.DataFrame:
     """
     获取股票分时数据
     
+    依次查询进程内存缓存和本地K线存储，只向后端请求覆盖索引中缺失的日期；
+    并发的相同请求只会执行一次，其余调用方共享其结果
+    
     Args:
         symbol: 证券代码
         start_time: 开始时间，格式为'YYYY-MM-DD HH:MM:SS'或'YYYY-MM-DD'
         end_time: 结束时间，格式为'YYYY-MM-DD HH:MM:SS'或'YYYY-MM-DD'
         frequency: 时间频率，例如'1'表示1分钟，'5'表示5分钟等
         backend: 数据源后端名称，如果为None则使用默认后端
+        use_store: 是否使用本地K线存储
+        use_cache: 是否使用进程内存缓存
+        dtype_profile: 数据类型方案，'compact'使用float32价格和uint32成交量，None保持float64
+        mmap: 是否返回内存映射本地存储文件的只读数据，多个回测进程共享同一份物理内存
         **kwargs: 传递给后端的额外参数
         
     Returns:
         DataFrame: 包含开盘价、最高价、最低价、收盘价、成交量等数据的DataFrame
     """
-    if backend is None:
-        provider = get_provider()
-    else:
-        provider = create_provider(backend, **kwargs)
-    
-    try:
+    def _fetch() -> pd.DataFrame:
+        provider = _resolve_provider(backend, use_store, dtype_profile, mmap, **kwargs)
         df = provider.get_minute_data(symbol, start_time, end_time, frequency, **kwargs)
         # 使用数据管理器准备数据
-        return DataManager.prepare_data(df, 'minute')
+        return DataManager.prepare_data(df, 'minute', dtype_profile)
+    
+    try:
+        key = ('minute', backend or get_default_backend(), symbol, start_time, end_time, frequency,
+               use_store, dtype_profile, mmap)
+        return _cached_call(key, kwargs, end_time, use_cache, _fetch)
     except Exception as e:
         logger.error(f"获取分时数据失败: {e}")
         raise
 
 
+def resample(
+    symbol: str,
+    start_time: str,
+    end_time: str,
+    from_freq: str = '1',
+    to_freq: str = '5',
+    backend: Optional[str] = None,
+    sessions: Optional[List[tuple]] = None,
+    use_cache: bool = True,
+    **kwargs
+) -> pd.DataFrame:
+    """
+    由本地存储的细粒度分钟K线派生更粗周期的K线
+    
+    只需获取并存储一次1分钟数据，5/15/30/60分钟、日线和周线都在本地一次向量化聚合得到，
+    分钟级别的K线按交易时段切分，不跨越午间休市
+    
+    Args:
+        symbol: 证券代码
+        start_time: 开始时间，格式为'YYYY-MM-DD HH:MM:SS'或'YYYY-MM-DD'
+        end_time: 结束时间，格式为'YYYY-MM-DD HH:MM:SS'或'YYYY-MM-DD'
+        from_freq: 源分钟频率，如'1'
+        to_freq: 目标周期，'5'、'15'、'30'、'60'等分钟数，或'D'、'W'、'M'
+        backend: 数据源后端名称，如果为None则使用默认后端
+        sessions: 交易时段列表，如[('09:30', '11:30'), ('13:00', '15:00')]，默认为A股交易时段
+        use_cache: 是否使用进程内存缓存
+        **kwargs: 传递给get_minute_data的额外参数
+        
+    Returns:
+        DataFrame: 重采样后的K线
+    """
+    if to_freq.isdigit() and from_freq.isdigit() and int(to_freq) % int(from_freq) != 0:
+        raise ValueError(f"目标周期{to_freq}分钟不是源周期{from_freq}分钟的整数倍")
+    
+    def _fetch() -> pd.DataFrame:
+        df = get_minute_data(symbol, start_time, end_time, from_freq, backend=backend, use_cache=False, **kwargs)
+        return resample_bars(df, to_freq, sessions)
+    
+    key = ('resample', backend or get_default_backend(), symbol, start_time, end_time, from_freq, to_freq,
+           tuple(map(tuple, sessions)) if sessions else None)
+    return _cached_call(key, kwargs, end_time, use_cache, _fetch)
+
+
+def _split_windows(start_time: str, end_time: str, chunk: str) -> List[tuple]:
+    """
+    把[start_time, end_time]按pandas频率切分为首尾相接的时间窗口，跳过只包含周末的窗口
+    
+    Args:
+        start_time: 开始时间
+        end_time: 结束时间，只给出日期时包含当天
+        chunk: 窗口长度，pandas频率字符串，如'1D'、'1W'、'MS'
+        
+    Returns:
+        List[tuple]: (窗口开始, 窗口结束)时间戳列表，均为闭区间
+    """
+    start_ts = pd.Timestamp(start_time)
+    end_ts = pd.Timestamp(end_time)
+    if len(end_time) <= 10:
+        end_ts = end_ts + pd.Timedelta(days=1) - pd.Timedelta(seconds=1)
+    
+    points = pd.date_range(start_ts.normalize(), end_ts, freq=chunk)
+    bounds = [start_ts] + [p for p in points if start_ts < p <= end_ts] + [end_ts + pd.Timedelta(seconds=1)]
+    windows = []
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        hi = hi - pd.Timedelta(seconds=1)
+        if len(pd.bdate_range(lo.normalize(), hi.normalize())) > 0:
+            windows.append((lo, hi))
+    return windows
+
+
+def _has_sessions(symbol: str, lo: pd.Timestamp, hi: pd.Timestamp, backend: Optional[str] = None) -> bool:
+    """
+    [lo, hi]内是否有证券所属市场的交易日
+    
+    Returns:
+        bool: 有交易日时为True；后端不使用交易日历、无法判断所属市场或日历不可用时也为True，由后端决定
+    """
+    if not _uses_calendar(backend) or market_of(symbol) == UNKNOWN_MARKET:
+        return True
+    try:
+        return calendar_for(symbol).clamp(lo, hi) is not None
+    except Exception as e:
+        logger.debug(f"交易日历不可用，按原始窗口请求: {e}")
+        return True
+
+
+def iter_minute_data(
+    symbol: str,
+    start_time: str,
+    end_time: str,
+    chunk: str = '1D',
+    frequency: str = '1',
+    backend: Optional[str] = None,
+    failed: Optional[List[tuple]] = None,
+    **kwargs
+) -> Iterator[pd.DataFrame]:
+    """
+    按时间窗口逐块获取股票分时数据
+    
+    每次只读取一个窗口的数据（本地存储已覆盖的部分直接读本地，缺失部分向后端请求），
+    多年的1分钟历史数据也能以固定内存逐块处理；默认不放入进程内存缓存。
+    不含交易日的窗口（周末、节假日）不会请求后端，没有数据的窗口被跳过
+    
+    Args:
+        symbol: 证券代码
+        start_time: 开始时间，格式为'YYYY-MM-DD HH:MM:SS'或'YYYY-MM-DD'
+        end_time: 结束时间，格式为'YYYY-MM-DD HH:MM:SS'或'YYYY-MM-DD'
+        chunk: 每块覆盖的时间长度，pandas频率字符串，如'1D'、'1W'、'MS'（按自然月）
+        frequency: 时间频率，例如'1'表示1分钟，'5'表示5分钟等
+        backend: 数据源后端名称，如果为None则使用默认后端
+        failed: 可选，传入列表时获取失败的窗口以(开始, 结束, 错误)追加到其中并继续后面的窗口；
+            为None时获取失败直接抛出
+        **kwargs: 传递给get_minute_data的额外参数，如use_store、dtype_profile、mmap
+        
+    Yields:
+        DataFrame: 单个窗口内的分时数据
+        
+    Raises:
+        Exception: 未传入failed时，任一窗口获取失败的错误
+    """
+    kwargs.setdefault('use_cache', False)
+    for lo, hi in _split_windows(start_time, end_time, chunk):
+        if not _has_sessions(symbol, lo, hi, backend):
+            continue
+        try:
+            df = get_minute_data(
+                symbol,
+                lo.strftime('%Y-%m-%d %H:%M:%S'),
+                hi.strftime('%Y-%m-%d %H:%M:%S'),
+                frequency,
+                backend=backend,
+                **kwargs
+            )
+        except Exception as e:
+            if failed is None:
+                raise
+            logger.warning(f"获取{symbol}从{lo}到{hi}的分时数据失败: {e}")
+            failed.append((lo, hi, e))
+            continue
+        if df is not None and not df.empty:
+            yield df
+
+
+# qdata自身的选项，不传给原生异步后端
+_QDATA_OPTIONS = ('use_store', 'use_cache', 'dtype_profile', 'mmap')
+
+
+def _async_backend(backend: Optional[str], **kwargs) -> Optional[AsyncDataProvider]:
+    """
+    如果指定的后端是原生异步后端则创建其实例，否则返回None
+    """
+    backend_class = get_backend(backend)
+    if isinstance(backend_class, type) and issubclass(backend_class, AsyncDataProvider):
+        return create_provider(backend, **kwargs)
+    return None
+
+
+async def aget_daily_data(
+    symbol: str,
+    start_date: str,
+    end_date: str,
+    backend: Optional[str] = None,
+    **kwargs
+) -> pd.DataFrame:
+    """
+    异步获取股票日线数据
+    
+    原生异步后端直接await；同步后端在qdata共用的线程池中执行get_daily_data，
+    仍然经过内存缓存、单飞、本地存储和请求调度各层，事件循环不会被阻塞
+    
+    Args:
+        symbol: 证券代码
+        start_date: 开始日期，格式为'YYYY-MM-DD'
+        end_date: 结束日期，格式为'YYYY-MM-DD'
+        backend: 数据源后端名称，如果为None则使用默认后端
+        **kwargs: 传递给get_daily_data的参数，如adjust、use_store、dtype_profile
+        
+    Returns:
+        DataFrame: 包含开盘价、最高价、最低价、收盘价、成交量等数据的DataFrame
+    """
+    backend_kwargs = {k: v for k, v in kwargs.items() if k not in _QDATA_OPTIONS}
+    provider = _async_backend(backend, **backend_kwargs)
+    if provider is not None:
+        df = await provider.get_daily_data(symbol, start_date, end_date, **backend_kwargs)
+        return DataManager.prepare_data(df, 'daily', kwargs.get('dtype_profile'))
+    return await run_blocking(get_daily_data, symbol, start_date, end_date, backend=backend, **kwargs)
+
+
+async def aget_minute_data(
+    symbol: str,
+    start_time: str,
+    end_time: str,
+    frequency: str = '1',
+    backend: Optional[str] = None,
+    **kwargs
+) -> pd.DataFrame:
+    """
+    异步获取股票分时数据
+    
+    原生异步后端直接await；同步后端在qdata共用的线程池中执行get_minute_data
+    
+    Args:
+        symbol: 证券代码
+        start_time: 开始时间，格式为'YYYY-MM-DD HH:MM:SS'或'YYYY-MM-DD'
+        end_time: 结束时间，格式为'YYYY-MM-DD HH:MM:SS'或'YYYY-MM-DD'
+        frequency: 时间频率，例如'1'表示1分钟，'5'表示5分钟等
+        backend: 数据源后端名称，如果为None则使用默认后端
+        **kwargs: 传递给get_minute_data的参数
+        
+    Returns:
+        DataFrame: 包含开盘价、最高价、最低价、收盘价、成交量等数据的DataFrame
+    """
+    backend_kwargs = {k: v for k, v in kwargs.items() if k not in _QDATA_OPTIONS}
+    provider = _async_backend(backend, **backend_kwargs)
+    if provider is not None:
+        df = await provider.get_minute_data(symbol, start_time, end_time, frequency, **backend_kwargs)
+        return DataManager.prepare_data(df, 'minute', kwargs.get('dtype_profile'))
+    return await run_blocking(get_minute_data, symbol, start_time, end_time, frequency, backend=backend, **kwargs)
+
+
 def get_stock_list(
     backend: Optional[str] = None, 
     **kwargs
@@ -185,18 +684,107 @@ def get_etf_list(
         logger.error(f"获取ETF列表失败: {e}")
         raise
 
-# 自动初始化
-init()
+
+def _instrument_master(backend: Optional[str], **kwargs):
+    """
+    获取后端的证券主数据
+    
+    主数据按后端名称在进程内共享（见get_instrument_master），下载函数绑定第一个创建主数据的提供者实例，
+    之后以不同参数（如不同的请求调度器）创建的实例仍通过第一个实例刷新列表
+    
+    Args:
+        backend: 数据源后端名称，如果为None则使用默认后端
+        **kwargs: 传递给后端构造函数的额外参数
+        
+    Returns:
+        InstrumentMaster: 证券主数据
+        
+    Raises:
+        NotImplementedError: 后端不支持证券主数据时抛出
+    """
+    provider = get_provider() if backend is None else create_provider(backend, **kwargs)
+    instruments = getattr(provider, 'instruments', None)
+    if instruments is None:
+        raise NotImplementedError(f"数据源{type(provider).__name__}不支持证券主数据")
+    return instruments
+
+
+def search_symbols(
+    query: str,
+    limit: int = 10,
+    kind: Optional[str] = None,
+    backend: Optional[str] = None,
+    **kwargs
+) -> List[Dict[str, str]]:
+    """
+    按代码、名称或拼音首字母搜索证券
+    
+    Args:
+        query: 查询字符串，如'600519'、'茅台'、'gzmt'
+        limit: 最多返回的条数
+        kind: 只返回该类型的证券，'stock'或'etf'
+        backend: 数据源后端名称，如果为None则使用默认后端
+        **kwargs: 传递给后端的额外参数
+        
+    Returns:
+        List[Dict[str, str]]: 匹配的证券，包含code、name、type
+    """
+    return _instrument_master(backend, **kwargs).search(query, limit, kind)
+
+
+def get_instrument(symbol: str, backend: Optional[str] = None, **kwargs) -> Optional[Dict[str, str]]:
+    """
+    按代码查找证券信息
+    
+    Args:
+        symbol: 证券代码
+        backend: 数据源后端名称，如果为None则使用默认后端
+        **kwargs: 传递给后端的额外参数
+        
+    Returns:
+        Optional[Dict[str, str]]: 包含code、name、type的证券信息，查不到时返回None
+    """
+    return _instrument_master(backend, **kwargs).get(symbol)
+
 
 __all__ = [
     "get_daily_data",
+    "get_daily_data_batch",
+    "get_panel_data",
     "get_minute_data",
+    "aget_daily_data",
+    "aget_minute_data",
+    "iter_minute_data",
+    "resample",
+    "resample_bars",
+    "apply_adjustment",
+    "TradingCalendar",
+    "get_calendar",
+    "calendar_for",
     "get_stock_list",
     "get_etf_list",
+    "search_symbols",
+    "get_instrument",
     "set_default_backend",
+    "get_default_backend",
     "create_provider",
+    "set_bar_store",
+    "get_bar_store",
+    "set_memory_cache",
+    "get_memory_cache",
     "register_backend",
     "get_backend",
     "DataProvider",
-    "DataManager"
+    "AsyncDataProvider",
+    "ExecutorAsyncProvider",
+    "IncrementalProvider",
+    "get_executor",
+    "set_executor",
+    "DataManager",
+    "BarStore",
+    "BatchResult",
+    "MemoryCache",
+    "PanelArray",
+    "to_panel",
+    "to_array"
 ]
@@ -4,15 +4,18 @@ qdata.backends模块
 """
 import importlib
 import logging
-from typing import Dict, Optional, Type
+from typing import Dict, List, Optional, Type, Union
 
-from qdata.provider import DataProvider
+from qdata.provider import AsyncDataProvider, DataProvider
 
 # 配置日志记录器
 logger = logging.getLogger(__name__)
 
 # 已注册的后端字典
-_registered_backends: Dict[str, Type[DataProvider]] = {}
+_registered_backends: Dict[str, Type[Union[DataProvider, AsyncDataProvider]]] = {}
+
+# 尚未导入的后端：后端名称 -> 模块路径，首次使用时才导入模块，模块导入时自行注册
+_lazy_backends: Dict[str, str] = {}
 
 # 默认后端
 _default_backend: str = 'akshare'
@@ -22,31 +25,104 @@ _backend_config = {
     'akshare': {
         'enabled': True,
         'priority': 1,
+        'store': True,
+        'max_concurrency': 4,
+        # 请求调度配额：每秒请求数和允许的突发请求数
+        'rate_limit': 5,
+        'burst': 10,
     },
     'tushare': {
         'enabled': True,
         'priority': 2,
+        'store': True,
+        'max_concurrency': 2,
+        # tushare默认积分每分钟约200次调用
+        'rate_limit': 3,
+        'burst': 5,
     },
     'csv': {
         'enabled': True,
         'priority': 3,
+        # 本地文件本身就是存储，不需要再缓存到BarStore
+        'store': False,
+        'max_concurrency': 8,
+        # 离线后端不按交易日历收缩区间，A股日历首次构建时需要联网下载
+        'calendar': False,
+    },
+    'replay': {
+        # 回放录制数据的测试后端，只能显式指定，不参与故障转移
+        'enabled': False,
+        'priority': 99,
+        # 经过BarStore，压测时可以覆盖完整的获取路径
+        'store': True,
+        'max_concurrency': 8,
+        # 调度器配额放宽，限流由ReplayProvider自己按参数模拟
+        'rate_limit': 1000,
+        'burst': 1000,
+        'calendar': False,
+    },
+    'failover': {
+        # 组合后端按优先级调用上面已启用的后端，只能显式指定
+        'enabled': False,
+        'priority': 100,
+        # 结果按failover后端名称写入BarStore，重复请求不再经过各个后端
+        'store': True,
+        'max_concurrency': 8,
     }
 }
 
-def register_backend(name: str, backend_class: Type[DataProvider]) -> None:
+def register_backend(name: str, backend_class: Type[Union[DataProvider, AsyncDataProvider]]) -> None:
     """
     注册一个新的数据源后端
     
     Args:
         name: 后端名称，用于标识后端
-        backend_class: 后端类，必须是DataProvider的子类
+        backend_class: 后端类，必须是DataProvider或AsyncDataProvider的子类
     """
-    if not issubclass(backend_class, DataProvider):
-        raise TypeError(f"后端类必须是DataProvider的子类，而不是{type(backend_class)}")
+    if not issubclass(backend_class, (DataProvider, AsyncDataProvider)):
+        raise TypeError(f"后端类必须是DataProvider或AsyncDataProvider的子类，而不是{type(backend_class)}")
     
     _registered_backends[name] = backend_class
+    _lazy_backends.pop(name, None)
     logger.info(f"已注册数据源后端: {name}")
 
+def register_lazy_backend(name: str, module_name: str) -> None:
+    """
+    登记一个延迟加载的数据源后端，模块在首次使用该后端时才导入
+    
+    Args:
+        name: 后端名称
+        module_name: 后端模块路径，模块导入时需要调用register_backend注册后端类
+    """
+    if name not in _registered_backends:
+        _lazy_backends[name] = module_name
+
+def _load_backend(name: str) -> None:
+    """
+    导入后端模块完成注册
+    
+    Raises:
+        ValueError: 如果指定的后端不存在
+    """
+    module_name = _lazy_backends.get(name, f'qdata.backends.{name}_provider')
+    try:
+        importlib.import_module(module_name)
+    except ImportError as e:
+        logger.warning(f"无法加载后端模块 {module_name}: {e}")
+    
+    if name not in _registered_backends:
+        available = ', '.join(get_available_backends())
+        raise ValueError(f"不支持的数据源后端: {name}。可用的后端: {available}")
+
+def get_available_backends() -> List[str]:
+    """
+    获取所有可用的后端名称，包括尚未导入的延迟加载后端
+    
+    Returns:
+        List[str]: 后端名称列表
+    """
+    return list(_registered_backends) + [name for name in _lazy_backends if name not in _registered_backends]
+
 def get_backend(name: Optional[str] = None) -> Type[DataProvider]:
     """
     获取指定的后端类
@@ -64,16 +140,7 @@ def get_backend(name: Optional[str] = None) -> Type[DataProvider]:
         name = _default_backend
     
     if name not in _registered_backends:
-        # 尝试动态加载后端
-        try:
-            module_name = f'qdata.backends.{name}_provider'
-            importlib.import_module(module_name)
-        except ImportError:
-            pass
-        
-        if name not in _registered_backends:
-            available = ', '.join(_registered_backends.keys())
-            raise ValueError(f"不支持的数据源后端: {name}。可用的后端: {available}")
+        _load_backend(name)
     
     return _registered_backends[name]
 
@@ -87,22 +154,44 @@ def set_default_backend(name: str) -> None:
     Raises:
         ValueError: 如果指定的后端不存在
     """
-    if name not in _registered_backends:
-        # 尝试动态加载后端
-        try:
-            module_name = f'qdata.backends.{name}_provider'
-            importlib.import_module(module_name)
-        except ImportError:
-            pass
-        
-        if name not in _registered_backends:
-            available = ', '.join(_registered_backends.keys())
-            raise ValueError(f"不支持的数据源后端: {name}。可用的后端: {available}")
+    if name not in _registered_backends and name not in _lazy_backends:
+        _load_backend(name)
     
     global _default_backend
     _default_backend = name
     logger.info(f"默认数据源后端已设置为: {name}")
 
+def get_default_backend() -> str:
+    """
+    获取默认的数据源后端名称
+    
+    Returns:
+        str: 默认后端名称
+    """
+    return _default_backend
+
+def get_backend_config(name: str) -> Dict:
+    """
+    获取指定后端的配置
+    
+    Args:
+        name: 后端名称
+        
+    Returns:
+        Dict: 后端配置，未配置的后端返回空字典
+    """
+    return _backend_config.get(name, {})
+
+def get_backends_by_priority() -> List[str]:
+    """
+    按配置中的优先级返回已启用的后端名称
+    
+    Returns:
+        List[str]: 后端名称列表，priority数值越小越靠前
+    """
+    enabled = [name for name, config in _backend_config.items() if config.get('enabled', False)]
+    return sorted(enabled, key=lambda name: _backend_config[name].get('priority', float('inf')))
+
 def create_provider(name: Optional[str] = None, **kwargs) -> DataProvider:
     """
     创建一个数据源提供者实例
@@ -119,24 +208,50 @@ def create_provider(name: Optional[str] = None, **kwargs) -> DataProvider:
 
 def _auto_register_backends() -> None:
     """
-    自动注册配置中的后端
+    登记配置中的后端，akshare、tushare等依赖在首次使用对应后端时才导入
     """
     for backend_name, config in _backend_config.items():
         if config.get('enabled', False):
-            try:
-                module_name = f'qdata.backends.{backend_name}_provider'
-                importlib.import_module(module_name)
-            except ImportError:
-                logger.warning(f"无法加载后端模块: {module_name}")
-            except Exception as e:
-                logger.error(f"注册后端 {backend_name} 时出错: {e}")
-
-# 自动注册后端
+            register_lazy_backend(backend_name, f'qdata.backends.{backend_name}_provider')
+    # 组合后端和回放后端在配置中未启用，只能显式指定
+    register_lazy_backend('failover', 'qdata.backends.failover_provider')
+    register_lazy_backend('replay', 'qdata.backends.replay_provider')
+
+# 自动登记后端
 _auto_register_backends()
 
+from qdata.backends.scheduler import (
+    RequestScheduler,
+    get_scheduler,
+    set_scheduler,
+    request_priority,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_BATCH
+)
+
 __all__ = [
     'register_backend',
     'get_backend',
     'set_default_backend',
+    'get_default_backend',
+    'get_backend_config',
+    'get_backends_by_priority',
     'create_provider',
-]
\ No newline at end of file
+    'register_lazy_backend',
+    'get_available_backends',
+    'FailoverProvider',
+    'RequestScheduler',
+    'get_scheduler',
+    'set_scheduler',
+    'request_priority',
+    'PRIORITY_INTERACTIVE',
+    'PRIORITY_BATCH',
+]
+
+
+def __getattr__(name: str):
+    # FailoverProvider在首次访问时才导入
+    if name == 'FailoverProvider':
+        from qdata.backends.failover_provider import FailoverProvider
+        return FailoverProvider
+    raise AttributeError(f"module 'qdata.backends' has no attribute '{name}'")
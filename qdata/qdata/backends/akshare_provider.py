@@ -2,14 +2,35 @@
 AkShare数据源后端
 使用akshare库获取股票和ETF数据
 """
-import sys
+import logging
 import time
-from typing import Optional
+from typing import Callable, List, Optional, Tuple
+import numpy as np
 import pandas as pd
 import akshare as ak
 
 from qdata.provider import DataProvider
+from qdata.core.adjust import FACTOR_COLUMN, normalize_adjust
+from qdata.core.schema import BarSchema, empty_bars, normalize
+from qdata.core.instruments import ETF, STOCK, InstrumentMaster, get_instrument_master
 from qdata.backends import register_backend
+from qdata.backends.scheduler import RequestScheduler, get_scheduler
+
+# 场内ETF代码前缀：上交所51/56/58，深交所15/16
+ETF_PREFIXES = ('51', '56', '58', '15', '16')
+# 增量刷新ETF复权因子时，重叠日期的新旧因子相对误差在此范围内视为一致
+FACTOR_RTOL = 1e-6
+
+logger = logging.getLogger(__name__)
+
+
+def _exchange_prefix(symbol: str) -> str:
+    """A股代码对应的新浪交易所前缀"""
+    if symbol.startswith(('6', '9', '5')):
+        return 'sh'
+    if symbol.startswith(('4', '8')):
+        return 'bj'
+    return 'sz'
 
 
 class AkShareProvider(DataProvider):
@@ -18,18 +39,87 @@ class AkShareProvider(DataProvider):
     使用akshare库获取股票和ETF数据
     """
     
-    def __init__(self, retry_count: int = 5, retry_delay: list = None):
+    # akshare各接口返回数据的列名描述
+    schema = BarSchema(
+        column_mapping={
+            '日期': 'date',
+            '时间': 'date',  # 分钟数据使用'时间'列作为日期
+            'day': 'date',  # 分时数据中可能使用'day'列作为日期
+            '开盘': 'open',
+            '开盘价': 'open',
+            '最高': 'high',
+            '最高价': 'high',
+            '最低': 'low',
+            '最低价': 'low',
+            '收盘': 'close',
+            '收盘价': 'close',
+            '成交量': 'volume',
+            '成交额': 'amount'
+        }
+    )
+    
+    def __init__(self, retry_count: int = 5, retry_delay: list = None,
+                 scheduler: Optional[RequestScheduler] = None,
+                 instruments: Optional[InstrumentMaster] = None):
         """
         初始化AkShareProvider
         
         Args:
             retry_count: 重试次数
-            retry_delay: 重试延迟时间列表（秒）
+            retry_delay: 失败后重试前的退避时间列表（秒）
+            scheduler: 请求调度器，默认使用akshare后端共享的调度器
+            instruments: 证券主数据，默认使用akshare后端共享的主数据，保存在~/.qdata/instruments/akshare.json
         """
         self.retry_count = retry_count
         self.retry_delay = retry_delay or [1, 2, 4, 8, 10]
+        self.scheduler = scheduler or get_scheduler('akshare')
+        # 股票优先：fund_name_em包含场外基金，其代码可能与股票重复
+        self.instruments = instruments or get_instrument_master(
+            'akshare', {STOCK: self._download_stock_list, ETF: self._download_etf_list})
+    
+    def _call(self, fn, *args, **kwargs):
+        """
+        通过请求调度器调用akshare接口，受后端共享的限流和并发配额约束
+        """
+        return self.scheduler.submit(fn, *args, **kwargs)
     
-    def get_daily_data(self, symbol: str, start_date: str, end_date: str, **kwargs) -> pd.DataFrame:
+    def _endpoints(self, symbol: str, etf_fn: Callable, stock_fn: Callable,
+                   etf_type: str, stock_type: str) -> List[Tuple[Callable, str]]:
+        """
+        按证券类型选择akshare接口
+        
+        主数据中能查到的证券只请求对应的接口；查不到时按代码前缀猜测的顺序依次尝试两个接口
+        """
+        etf = (etf_fn, etf_type)
+        stock = (stock_fn, stock_type)
+        kind = self.instruments.kind(symbol)
+        if kind == ETF:
+            return [etf]
+        if kind == STOCK:
+            return [stock]
+        return [etf, stock] if symbol.startswith(ETF_PREFIXES) else [stock, etf]
+    
+    def _fetch_first(self, endpoints: List[Tuple[Callable, str]], **params) -> pd.DataFrame:
+        """
+        依次调用接口，返回第一个非空结果；所有接口都返回空数据时（上市前、停牌）返回空的K线表，
+        都出错时抛出最后一个错误
+        """
+        last_err = None
+        for fn, data_type in endpoints:
+            try:
+                df = self._call(fn, **params)
+            except Exception as e:
+                last_err = e
+                continue
+            if not df.empty:
+                return self._format_akshare_data(df, data_type=data_type)
+            last_err = None
+        if last_err is not None:
+            raise last_err
+        return empty_bars(self.schema.columns)
+    
+    def get_daily_data(self, symbol: str, start_date: str, end_date: str,
+                       adjust: Optional[str] = 'qfq', **kwargs) -> pd.DataFrame:
         """
         获取日线数据
         
@@ -37,47 +127,32 @@ class AkShareProvider(DataProvider):
             symbol: 证券代码
             start_date: 开始日期，格式为'YYYY-MM-DD'
             end_date: 结束日期，格式为'YYYY-MM-DD'
+            adjust: 复权方式，'qfq'、'hfq'，None表示不复权
             **kwargs: 额外参数
             
         Returns:
             DataFrame: 包含开盘价、最高价、最低价、收盘价、成交量等数据的DataFrame
         """
-        # 尝试获取股票或ETF数据
+        # akshare用空字符串表示不复权
+        adjust = normalize_adjust(adjust) or ''
+        
+        # 格式化日期为akshare所需的格式
+        start_date_fmt = start_date.replace('-', '')
+        end_date_fmt = end_date.replace('-', '')
+        endpoints = self._endpoints(symbol, ak.fund_etf_hist_em, ak.stock_zh_a_hist, 'fund', 'stock')
         last_err = None
         
-        # 重试逻辑
+        # 只在出错时重试，区间内没有数据时直接返回空表
         for i in range(self.retry_count):
             try:
-                # 尝试获取ETF数据
-                try:
-                    # 格式化日期为akshare所需的格式
-                    start_date_fmt = start_date.replace('-', '')
-                    end_date_fmt = end_date.replace('-', '')
-                    
-                    df = ak.fund_etf_hist_em(
-                        symbol=symbol,
-                        period="daily",
-                        start_date=start_date_fmt,
-                        end_date=end_date_fmt,
-                        adjust="qfq"
-                    )
-                    
-                    # 检查数据是否有效
-                    if not df.empty:
-                        return self._format_akshare_data(df, data_type='fund')
-                except Exception:
-                    # 如果ETF数据获取失败，尝试获取股票数据
-                    df = ak.stock_zh_a_hist(
-                        symbol=symbol,
-                        period="daily",
-                        start_date=start_date_fmt,
-                        end_date=end_date_fmt,
-                        adjust="qfq"
-                    )
-                    
-                    if not df.empty:
-                        return self._format_akshare_data(df, data_type='stock')
-                
+                return self._fetch_first(
+                    endpoints,
+                    symbol=symbol,
+                    period="daily",
+                    start_date=start_date_fmt,
+                    end_date=end_date_fmt,
+                    adjust=adjust
+                )
             except Exception as e:
                 last_err = e
                 if i < self.retry_count - 1:
@@ -89,6 +164,59 @@ class AkShareProvider(DataProvider):
             f"获取数据失败: {symbol} (从 {start_date} 到 {end_date})"
         ) from last_err
     
+    def get_adj_factor(self, symbol: str, known: Optional[pd.DataFrame] = None, **kwargs) -> pd.DataFrame:
+        """
+        获取后复权因子表
+        
+        股票使用新浪的hfq-factor接口；ETF没有现成的因子接口，用后复权和不复权收盘价之比计算。
+        传入本地已保存的ETF因子表时只下载其最后一个日期之后的历史，
+        重叠日期的因子与本地不一致（后复权基准变化）时才重新下载全部历史
+        
+        Args:
+            symbol: 证券代码
+            known: 本地已保存的因子表
+            **kwargs: 额外参数
+            
+        Returns:
+            DataFrame: 以日期为索引、包含factor列的后复权因子表
+        """
+        kind = self.instruments.kind(symbol)
+        if kind == ETF or (kind is None and symbol.startswith(ETF_PREFIXES)):
+            if known is not None and not known.empty:
+                known = known.sort_index()
+                last = known.index[-1]
+                recent = self._etf_factors(symbol, start=last)
+                if last in recent.index and np.isclose(recent.at[last, FACTOR_COLUMN],
+                                                       known[FACTOR_COLUMN].iloc[-1], rtol=FACTOR_RTOL):
+                    return pd.concat([known[[FACTOR_COLUMN]], recent.loc[recent.index > last]])
+                logger.info(f"{symbol}的复权因子与本地不一致，重新下载全部历史")
+            return self._etf_factors(symbol)
+        
+        df = self._call(ak.stock_zh_a_daily, symbol=_exchange_prefix(symbol) + symbol, adjust="hfq-factor")
+        index = pd.DatetimeIndex(pd.to_datetime(df['date']), name='date')
+        factors = pd.DataFrame({FACTOR_COLUMN: pd.to_numeric(df['hfq_factor'], errors='coerce').to_numpy()},
+                               index=index)
+        return factors.dropna().sort_index()
+    
+    def _etf_factors(self, symbol: str, start: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+        """
+        用后复权和不复权收盘价之比计算ETF的后复权因子
+        
+        Args:
+            symbol: ETF代码
+            start: 开始日期（含），None表示全部历史
+            
+        Returns:
+            DataFrame: 以日期为索引、包含factor列的后复权因子表
+        """
+        window = {} if start is None else {'start_date': start.strftime('%Y%m%d')}
+        hfq = self._call(ak.fund_etf_hist_em, symbol=symbol, period="daily", adjust="hfq", **window)
+        raw = self._call(ak.fund_etf_hist_em, symbol=symbol, period="daily", adjust="", **window)
+        hfq = self._format_akshare_data(hfq, data_type='fund')
+        raw = self._format_akshare_data(raw, data_type='fund')
+        factor = (hfq['close'] / raw['close']).dropna()
+        return pd.DataFrame({FACTOR_COLUMN: factor.to_numpy()}, index=factor.index)
+    
     def get_minute_data(self, symbol: str, start_time: str, end_time: str, frequency: str = '1', **kwargs) -> pd.DataFrame:
         """
         获取分时数据
@@ -103,36 +231,21 @@ class AkShareProvider(DataProvider):
         Returns:
             DataFrame: 包含开盘价、最高价、最低价、收盘价、成交量等数据的DataFrame
         """
+        endpoints = self._endpoints(symbol, ak.fund_etf_hist_min_em, ak.stock_zh_a_hist_min_em,
+                                    'fund_minute', 'stock_minute')
         last_err = None
         
-        # 重试逻辑
+        # 只在出错时重试，区间内没有数据时直接返回空表
         for i in range(self.retry_count):
             try:
-                # 尝试获取ETF分钟数据
-                try:
-                    df = ak.fund_etf_hist_min_em(
-                        symbol=symbol,
-                        period=frequency,
-                        start_date=start_time,
-                        end_date=end_time,
-                        adjust=""
-                    )
-                    
-                    if not df.empty:
-                        return self._format_akshare_data(df, data_type='fund_minute')
-                except Exception:
-                    # 如果ETF分钟数据获取失败，尝试获取股票分钟数据
-                    df = ak.stock_zh_a_hist_min_em(
-                        symbol=symbol,
-                        period=frequency,
-                        start_date=start_time,
-                        end_date=end_time,
-                        adjust=""
-                    )
-                    
-                    if not df.empty:
-                        return self._format_akshare_data(df, data_type='stock_minute')
-                
+                return self._fetch_first(
+                    endpoints,
+                    symbol=symbol,
+                    period=frequency,
+                    start_date=start_time,
+                    end_date=end_time,
+                    adjust=""
+                )
             except Exception as e:
                 last_err = e
                 if i < self.retry_count - 1:
@@ -162,7 +275,7 @@ class AkShareProvider(DataProvider):
         for i in range(self.retry_count):
             try:
                 # 调用ak.stock_zh_a_minute获取A股分时数据
-                df = ak.stock_zh_a_minute(symbol=symbol, period=period, adjust=adjust)
+                df = self._call(ak.stock_zh_a_minute, symbol=symbol, period=period, adjust=adjust)
                 
                 if not df.empty:
                     # 对A股分时数据进行标准化处理
@@ -197,7 +310,7 @@ class AkShareProvider(DataProvider):
         for i in range(self.retry_count):
             try:
                 # 由于akshare的美股分钟数据API可能有特定参数要求，这里先使用简单调用
-                df = ak.stock_us_hist_min_em(symbol=symbol)
+                df = self._call(ak.stock_us_hist_min_em, symbol=symbol)
                 
                 if not df.empty:
                     # 美股数据可能有特殊的列名或格式，需要进行额外处理
@@ -237,7 +350,7 @@ class AkShareProvider(DataProvider):
                 end_date_fmt = end_date.replace('-', '')
                 
                 # 调用akshare获取美股日线数据
-                df = ak.stock_us_daily(symbol=symbol, start_date=start_date_fmt, end_date=end_date_fmt)
+                df = self._call(ak.stock_us_daily, symbol=symbol, start_date=start_date_fmt, end_date=end_date_fmt)
                 
                 if not df.empty:
                     # 对美股数据进行标准化处理
@@ -255,7 +368,25 @@ class AkShareProvider(DataProvider):
     
     def get_stock_list(self, **kwargs) -> pd.DataFrame:
         """
-        获取股票列表
+        获取股票列表，同一天内直接使用本地的证券主数据
+        
+        Returns:
+            DataFrame: 包含股票代码、名称的DataFrame
+        """
+        return self.instruments.list(STOCK)
+    
+    def get_etf_list(self, **kwargs) -> pd.DataFrame:
+        """
+        获取ETF列表，同一天内直接使用本地的证券主数据
+        
+        Returns:
+            DataFrame: 包含ETF代码、名称的DataFrame
+        """
+        return self.instruments.list(ETF)
+    
+    def _download_stock_list(self) -> pd.DataFrame:
+        """
+        下载股票列表
         
         Returns:
             DataFrame: 包含股票代码、名称等信息的DataFrame
@@ -263,7 +394,7 @@ class AkShareProvider(DataProvider):
         # 重试逻辑
         for i in range(self.retry_count):
             try:
-                df = ak.stock_zh_a_spot_em()
+                df = self._call(ak.stock_zh_a_spot_em)
                 # 选择主要列并标准化列名
                 if not df.empty:
                     # 确保列名正确
@@ -278,9 +409,9 @@ class AkShareProvider(DataProvider):
         
         raise RuntimeError("获取股票列表失败")
     
-    def get_etf_list(self, **kwargs) -> pd.DataFrame:
+    def _download_etf_list(self) -> pd.DataFrame:
         """
-        获取ETF列表
+        下载ETF列表
         
         Returns:
             DataFrame: 包含ETF代码、名称等信息的DataFrame
@@ -288,7 +419,7 @@ class AkShareProvider(DataProvider):
         # 重试逻辑
         for i in range(self.retry_count):
             try:
-                df = ak.fund_name_em()
+                df = self._call(ak.fund_name_em)
                 # 选择主要列并标准化列名
                 if not df.empty:
                     # 确保列名正确
@@ -305,7 +436,7 @@ class AkShareProvider(DataProvider):
     
     def _format_akshare_data(self, df: pd.DataFrame, data_type: str) -> pd.DataFrame:
         """
-        格式化akshare返回的数据为统一格式
+        按akshare的数据描述把原始数据规范化为统一格式
         
         Args:
             df: akshare返回的原始数据
@@ -314,42 +445,7 @@ class AkShareProvider(DataProvider):
         Returns:
             DataFrame: 格式化后的数据
         """
-        # 定义列名映射
-        column_mapping = {
-            '日期': 'date',
-            '时间': 'date',  # 分钟数据使用'时间'列作为日期
-            'day': 'date',  # 分时数据中可能使用'day'列作为日期
-            '开盘': 'open',
-            '开盘价': 'open',
-            '最高': 'high',
-            '最高价': 'high',
-            '最低': 'low',
-            '最低价': 'low',
-            '收盘': 'close',
-            '收盘价': 'close',
-            '成交量': 'volume',
-            '成交额': 'amount'
-        }
-        
-        # 重命名列
-        df = df.rename(columns={k: v for k, v in column_mapping.items() if k in df.columns})
-        
-        # 确保'date'列为datetime类型
-        if 'date' in df.columns:
-            df['date'] = pd.to_datetime(df['date'])
-            df = df.set_index('date')
-        
-        # 确保必要的列存在
-        required_columns = ['open', 'high', 'low', 'close', 'volume']
-        for col in required_columns:
-            if col not in df.columns:
-                # 尝试从其他可能的列名中获取或设置默认值
-                # 这里可以根据实际情况添加更多的逻辑
-                pass
-        
-        # 只返回需要的列
-        available_columns = [col for col in required_columns if col in df.columns]
-        return df[available_columns]
+        return normalize(df, self.schema)
 
 # 注册后端
 register_backend('akshare', AkShareProvider)
@@ -2,13 +2,19 @@
 CSV数据源后端
 从CSV文件读取股票和ETF数据
 """
+import logging
 import os
 import pandas as pd
 from typing import Optional, Dict, List
 
 from qdata.provider import DataProvider
+from qdata.core.csv_cache import CsvBinaryCache, default_cache_dir
+from qdata.core.csv_index import CsvIndex
+from qdata.core.schema import BAR_COLUMNS, BarSchema, normalize
 from qdata.backends import register_backend
 
+logger = logging.getLogger(__name__)
+
 
 class CSVProvider(DataProvider):
     """
@@ -16,16 +22,38 @@ class CSVProvider(DataProvider):
     从CSV文件读取股票和ETF数据
     """
     
-    def __init__(self, data_dir: str = './data', file_pattern: str = '{symbol}.csv'):
+    # CSV文件的列名不区分大小写，缺少的K线字段会被补齐，其余列（如symbol、turnover）原样保留
+    schema = BarSchema(
+        column_mapping={
+            'datetime': 'date',
+            'vol': 'volume',
+        },
+        columns=BAR_COLUMNS + ('amount',),
+        lowercase=True,
+        fill_missing=True,
+        keep_extra=True
+    )
+    
+    def __init__(self, data_dir: str = './data', file_pattern: str = '{symbol}.csv', use_index: bool = True,
+                 binary_cache: Optional[str] = None, cache_dir: Optional[str] = None):
         """
         初始化CSVProvider
         
         Args:
             data_dir: CSV数据文件存放目录
             file_pattern: 文件名模式，使用{symbol}作为占位符
+            use_index: 是否使用按月字节偏移的边车索引，按日期区间读取时只解析相关的行
+            binary_cache: 转换缓存格式，'parquet'或'feather'（需要pyarrow）；
+                设置后每个CSV文件第一次读取时转换为二进制文件，之后直接读取二进制文件，None表示不使用
+            cache_dir: 转换缓存目录，默认为data_dir下的.qdata_cache
         """
         self.data_dir = data_dir
         self.file_pattern = file_pattern
+        self.use_index = use_index
+        self._indexes: Dict[str, CsvIndex] = {}
+        self._binary_cache = None
+        if binary_cache is not None:
+            self._binary_cache = CsvBinaryCache(cache_dir or default_cache_dir(data_dir), binary_cache)
         
         # 确保数据目录存在
         if not os.path.exists(data_dir):
@@ -51,19 +79,11 @@ class CSVProvider(DataProvider):
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"找不到数据文件: {file_path}")
         
-        # 读取CSV文件
-        df = pd.read_csv(file_path)
-        
-        # 格式化数据
-        df = self._format_csv_data(df)
+        # 读取并格式化日期范围内的数据
+        df = self._load(file_path, start_date, end_date)
         
-        # 筛选日期范围
-        if 'date' in df.columns:
-            df['date'] = pd.to_datetime(df['date'])
-            df = df[(df['date'] >= start_date) & (df['date'] <= end_date)]
-            df = df.set_index('date')
-        elif isinstance(df.index, pd.DatetimeIndex):
-            df = df[(df.index >= start_date) & (df.index <= end_date)]
+        # 筛选日期范围，索引已排序，直接按切片取
+        df = df.loc[start_date:end_date]
         
         return df
     
@@ -92,19 +112,11 @@ class CSVProvider(DataProvider):
             if not os.path.exists(file_path):
                 raise FileNotFoundError(f"找不到分钟数据文件: {file_path}")
         
-        # 读取CSV文件
-        df = pd.read_csv(file_path)
-        
-        # 格式化数据
-        df = self._format_csv_data(df)
+        # 读取并格式化时间范围内的数据
+        df = self._load(file_path, start_time, end_time)
         
-        # 筛选时间范围
-        if 'date' in df.columns:
-            df['date'] = pd.to_datetime(df['date'])
-            df = df[(df['date'] >= start_time) & (df['date'] <= end_time)]
-            df = df.set_index('date')
-        elif isinstance(df.index, pd.DatetimeIndex):
-            df = df[(df.index >= start_time) & (df.index <= end_time)]
+        # 筛选时间范围，索引已排序，直接按切片取
+        df = df.loc[start_time:end_time]
         
         return df
     
@@ -194,6 +206,55 @@ class CSVProvider(DataProvider):
         
         raise ValueError("ETF列表文件必须包含code列")
     
+    def _load(self, file_path: str, start: Optional[str] = None, end: Optional[str] = None) -> pd.DataFrame:
+        """
+        读取并规范化CSV文件的数据，启用转换缓存时读取二进制文件
+        
+        Args:
+            file_path: CSV文件路径
+            start: 开始日期或时间
+            end: 结束日期或时间
+            
+        Returns:
+            DataFrame: 至少覆盖[start, end]、以日期为索引的数据
+        """
+        if self._binary_cache is not None:
+            return self._binary_cache.load(file_path, lambda: self._format_csv_data(pd.read_csv(file_path)))
+        return self._format_csv_data(self._read_csv(file_path, start, end))
+    
+    def _read_csv(self, file_path: str, start: Optional[str] = None, end: Optional[str] = None) -> pd.DataFrame:
+        """
+        读取CSV文件中[start, end]所在月份的原始数据
+        
+        有可用的边车索引时直接定位到相关的字节范围；索引过期时自动重建，
+        文件缺少日期列或未按日期排序时退化为读取整个文件
+        
+        Args:
+            file_path: CSV文件路径
+            start: 开始日期或时间
+            end: 结束日期或时间
+            
+        Returns:
+            DataFrame: 从CSV文件读取的原始数据，仍需按精确日期筛选
+        """
+        if self.use_index:
+            index = self._indexes.get(file_path)
+            if index is None:
+                index = CsvIndex(file_path, date_columns=self._date_columns())
+                self._indexes[file_path] = index
+            try:
+                df = index.read_range(start, end)
+                if df is not None:
+                    return df
+            except (OSError, ValueError) as e:
+                logger.warning(f"使用CSV索引读取{file_path}失败，改为读取整个文件: {e}")
+        return pd.read_csv(file_path)
+    
+    def _date_columns(self) -> List[str]:
+        """schema中映射为日期的原始列名"""
+        return [self.schema.date_column] + [raw for raw, target in self.schema.column_mapping.items()
+                                            if target == self.schema.date_column]
+    
     def _format_csv_data(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         格式化CSV文件中的数据为统一格式
@@ -202,50 +263,9 @@ class CSVProvider(DataProvider):
             df: 从CSV文件读取的原始数据
             
         Returns:
-            DataFrame: 格式化后的数据
+            DataFrame: 以日期为索引、按日期排序的数据
         """
-        # 定义列名映射
-        column_mapping = {
-            'date': 'date',
-            'datetime': 'date',
-            'open': 'open',
-            'high': 'high',
-            'low': 'low',
-            'close': 'close',
-            'volume': 'volume',
-            'vol': 'volume',
-            'amount': 'amount'
-        }
-        
-        # 转换列名为小写，以便统一处理
-        df.columns = [col.lower() for col in df.columns]
-        
-        # 重命名列
-        df = df.rename(columns={k: v for k, v in column_mapping.items() if k in df.columns})
-        
-        # 确保'date'列为datetime类型
-        if 'date' in df.columns:
-            df['date'] = pd.to_datetime(df['date'])
-        
-        # 确保必要的列存在
-        required_columns = ['open', 'high', 'low', 'close', 'volume']
-        for col in required_columns:
-            if col not in df.columns:
-                # 如果缺少必要的列，尝试设置默认值
-                if col == 'volume':
-                    df[col] = 0
-                else:
-                    # 对于价格相关的列，使用close列的值
-                    if 'close' in df.columns:
-                        df[col] = df['close']
-                    else:
-                        df[col] = 0
-        
-        # 按日期排序
-        if 'date' in df.columns:
-            df = df.sort_values('date')
-        
-        return df
+        return normalize(df, self.schema)
 
 # 注册后端
 register_backend('csv', CSVProvider)
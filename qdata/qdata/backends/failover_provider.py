@@ -0,0 +1,203 @@
+"""
+故障转移数据源后端
+按后端配置中的优先级依次尝试各个数据源，失败时自动切换到下一个；
+可选的对冲请求在主数据源超过延迟阈值仍未返回时并行请求下一个数据源，取先返回的结果
+"""
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from qdata.provider import DataProvider
+from qdata.backends import create_provider, get_backends_by_priority, register_backend
+
+logger = logging.getLogger(__name__)
+
+# 返回None或空DataFrame时也切换到下一个后端的K线方法
+_BAR_METHODS = ('get_daily_data', 'get_minute_data')
+
+
+class _FailoverState:
+    """同一组后端配置共享的线程池、后端实例和请求统计"""
+
+    def __init__(self, backends: List[str], max_workers: int):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='qdata-failover')
+        self.providers: Dict[str, DataProvider] = {}
+        self.lock = threading.Lock()
+        self.stats = {
+            name: {'requests': 0, 'errors': 0, 'empty': 0, 'wins': 0, 'hedges': 0,
+                   'latency_total': 0.0, 'latency_max': 0.0}
+            for name in backends
+        }
+
+
+# 按后端配置共享的状态，qdata.get_daily_data(backend='failover')每次创建的实例不会各自新建线程池
+_states: Dict[tuple, _FailoverState] = {}
+_states_lock = threading.Lock()
+
+
+def _get_state(backends: List[str], provider_kwargs: Dict[str, Dict[str, Any]], max_workers: int) -> _FailoverState:
+    key = (tuple(backends), repr(sorted(provider_kwargs.items())), max_workers)
+    with _states_lock:
+        state = _states.get(key)
+        if state is None:
+            state = _FailoverState(backends, max_workers)
+            _states[key] = state
+        return state
+
+
+class FailoverProvider(DataProvider):
+    """
+    组合数据源提供者
+    各后端共享同一组证券代码格式时使用，例如akshare与本地CSV；
+    相同配置的实例共享线程池、后端实例和请求统计
+    """
+
+    def __init__(
+        self,
+        backends: Optional[List[str]] = None,
+        hedge_after: Optional[float] = None,
+        provider_kwargs: Optional[Dict[str, Dict[str, Any]]] = None,
+        max_workers: int = 8
+    ):
+        """
+        初始化FailoverProvider
+
+        Args:
+            backends: 按优先级排列的后端名称，默认使用后端配置中已启用的后端并按priority排序
+            hedge_after: 对冲阈值（秒），当前请求超过该时间未返回时并行请求下一个后端；None表示只在失败时切换
+            provider_kwargs: 各后端构造函数的参数，如{'csv': {'data_dir': './data'}}
+            max_workers: 执行后端请求的线程数
+        """
+        self.backends = [name for name in (backends or get_backends_by_priority()) if name != 'failover']
+        if not self.backends:
+            raise ValueError("故障转移至少需要一个后端")
+        self.hedge_after = hedge_after
+        self.provider_kwargs = provider_kwargs or {}
+        state = _get_state(self.backends, self.provider_kwargs, max_workers)
+        self._providers = state.providers
+        self._executor = state.executor
+        self._lock = state.lock
+        self._stats = state.stats
+
+    def _provider(self, name: str) -> DataProvider:
+        with self._lock:
+            provider = self._providers.get(name)
+        if provider is None:
+            provider = create_provider(name, **self.provider_kwargs.get(name, {}))
+            with self._lock:
+                provider = self._providers.setdefault(name, provider)
+        return provider
+
+    def _timed_call(self, name: str, method: str, *args, **kwargs) -> Any:
+        start = time.monotonic()
+        try:
+            return getattr(self._provider(name), method)(*args, **kwargs)
+        except Exception:
+            with self._lock:
+                self._stats[name]['errors'] += 1
+            raise
+        finally:
+            elapsed = time.monotonic() - start
+            with self._lock:
+                stats = self._stats[name]
+                stats['requests'] += 1
+                stats['latency_total'] += elapsed
+                stats['latency_max'] = max(stats['latency_max'], elapsed)
+
+    def _call(self, method: str, *args, **kwargs) -> Any:
+        """
+        按优先级调用各后端的同名方法，返回最先成功的结果；
+        K线方法返回None或空DataFrame时同样切换到下一个后端
+
+        Returns:
+            Any: 最先成功的结果；K线方法没有后端返回数据、但至少有一个后端返回空结果时返回该空结果
+
+        Raises:
+            RuntimeError: 所有后端都失败时抛出，__cause__为最后一个错误
+        """
+        remaining = list(self.backends)
+        pending: Dict[Future, str] = {}
+        last_err: Optional[BaseException] = None
+        empty_result: Any = None
+        got_empty = False
+
+        def _launch(hedge: bool = False) -> None:
+            name = remaining.pop(0)
+            if hedge:
+                with self._lock:
+                    self._stats[name]['hedges'] += 1
+                logger.info(f"{method}等待超过{self.hedge_after}秒，对冲请求后端{name}")
+            # 在调用方的上下文副本中执行，批量请求的优先级在对冲请求中同样生效
+            ctx = contextvars.copy_context()
+            pending[self._executor.submit(ctx.run, self._timed_call, name, method, *args, **kwargs)] = name
+
+        _launch()
+        while pending:
+            timeout = self.hedge_after if remaining and self.hedge_after is not None else None
+            done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                _launch(hedge=True)
+                continue
+            for future in done:
+                name = pending.pop(future)
+                err = future.exception()
+                if err is None:
+                    result = future.result()
+                    if method in _BAR_METHODS and (result is None or result.empty):
+                        with self._lock:
+                            self._stats[name]['empty'] += 1
+                        logger.warning(f"后端{name}调用{method}没有返回数据")
+                        empty_result, got_empty = result, True
+                        if remaining:
+                            _launch()
+                        continue
+                    with self._lock:
+                        self._stats[name]['wins'] += 1
+                    # 仍在执行的慢请求让其自然结束，结果直接丢弃
+                    return result
+                logger.warning(f"后端{name}调用{method}失败: {err}")
+                last_err = err
+                if remaining:
+                    _launch()
+
+        if got_empty:
+            return empty_result
+        raise RuntimeError(f"所有后端调用{method}均失败: {', '.join(self.backends)}") from last_err
+
+    def get_daily_data(self, symbol: str, start_date: str, end_date: str, **kwargs) -> pd.DataFrame:
+        return self._call('get_daily_data', symbol, start_date, end_date, **kwargs)
+
+    def get_minute_data(self, symbol: str, start_time: str, end_time: str, frequency: str = '1', **kwargs) -> pd.DataFrame:
+        return self._call('get_minute_data', symbol, start_time, end_time, frequency, **kwargs)
+
+    def get_stock_list(self, **kwargs) -> pd.DataFrame:
+        return self._call('get_stock_list', **kwargs)
+
+    def get_etf_list(self, **kwargs) -> pd.DataFrame:
+        return self._call('get_etf_list', **kwargs)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        各后端的请求统计
+
+        Returns:
+            Dict[str, Dict[str, float]]: 后端名称 -> 请求数、错误数、空结果数、胜出次数、对冲次数、
+                平均和最大延迟（秒）
+        """
+        with self._lock:
+            result = {}
+            for name, stats in self._stats.items():
+                result[name] = dict(stats)
+                result[name]['latency_avg'] = stats['latency_total'] / stats['requests'] if stats['requests'] else 0.0
+            return result
+
+
+# 注册后端
+register_backend('failover', FailoverProvider)
+
+__all__ = ['FailoverProvider']
@@ -0,0 +1,342 @@
+"""
+回放数据源后端
+从录制的数据文件提供K线，并按配置模拟上游的延迟、错误率和限流，
+不访问网络即可稳定复现缓存、调度和批量获取各层的性能表现
+"""
+import logging
+import os
+import random
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+import pandas as pd
+
+from qdata.provider import DataProvider
+from qdata.core.schema import BAR_COLUMNS, BarSchema, normalize
+from qdata.backends import register_backend
+from qdata.backends.scheduler import RequestScheduler, TokenBucket, get_scheduler
+
+logger = logging.getLogger(__name__)
+
+# 支持的录制文件格式，按顺序查找
+FIXTURE_EXTENSIONS = ('.parquet', '.pkl', '.csv')
+
+
+def _fixture_kind(frequency: Optional[str] = None) -> str:
+    """录制文件所在的子目录：日线为daily，分钟线为minute_{频率}"""
+    return 'daily' if frequency is None else f'minute_{frequency}'
+
+
+class ReplayServer:
+    """
+    回放服务
+    模拟一个上游行情服务：录制文件按{fixture_dir}/{daily|minute_N}/{symbol}.{parquet|pkl|csv}存放，
+    首次使用时读入内存；每次请求按配置被限流拒绝、等待延迟或失败。
+    qdata每次按后端名称获取数据都会创建新的数据源实例，延迟和失败序列、限流状态和统计因此放在服务中共享
+    """
+
+    def __init__(
+        self,
+        fixture_dir: str = './fixtures',
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit: Optional[float] = None,
+        burst: float = 1,
+        seed: Optional[int] = 0
+    ):
+        """
+        初始化ReplayServer
+
+        Args:
+            fixture_dir: 录制文件目录
+            latency: 每次请求的基础延迟（秒）
+            jitter: 延迟的随机抖动幅度（秒），实际延迟在[latency - jitter, latency + jitter]内均匀分布
+            error_rate: 请求失败的概率，失败时抛出ConnectionError
+            rate_limit: 模拟上游每秒允许的请求数，超出时请求被拒绝并抛出ConnectionError，None表示不限流
+            burst: 模拟上游允许的突发请求数
+            seed: 随机数种子，相同的种子和请求顺序产生相同的延迟和失败序列
+        """
+        self.fixture_dir = fixture_dir
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self._throttle = TokenBucket(rate_limit, burst) if rate_limit else None
+        self._random = random.Random(seed)
+        self._fixtures: Dict[tuple, pd.DataFrame] = {}
+        self._lock = threading.Lock()
+        self._stats = {'requests': 0, 'errors': 0, 'throttled': 0, 'bars': 0}
+
+    def _fixture_path(self, kind: str, symbol: str) -> str:
+        for ext in FIXTURE_EXTENSIONS:
+            path = os.path.join(self.fixture_dir, kind, f'{symbol}{ext}')
+            if os.path.exists(path):
+                return path
+        raise FileNotFoundError(f"找不到录制文件: {os.path.join(self.fixture_dir, kind, symbol)}")
+
+    def fixture(self, kind: str, symbol: str) -> pd.DataFrame:
+        """
+        读取并缓存录制文件，回放时不计入文件读取的开销
+
+        Args:
+            kind: 'daily'或'minute_{频率}'
+            symbol: 证券代码
+
+        Returns:
+            pd.DataFrame: 规范化后的全部录制数据
+        """
+        key = (kind, symbol)
+        df = self._fixtures.get(key)
+        if df is None:
+            path = self._fixture_path(kind, symbol)
+            if path.endswith('.parquet'):
+                raw = pd.read_parquet(path)
+            elif path.endswith('.pkl'):
+                raw = pd.read_pickle(path)
+            else:
+                raw = pd.read_csv(path)
+            df = normalize(raw, ReplayProvider.schema)
+            self._fixtures[key] = df
+        return df
+
+    def _simulate(self) -> None:
+        """按配置模拟上游的限流、延迟和失败"""
+        with self._lock:
+            self._stats['requests'] += 1
+            if self._throttle is not None:
+                if self._throttle.time_until_available() > 0:
+                    self._stats['throttled'] += 1
+                    raise ConnectionError("回放数据源: 请求过于频繁")
+                self._throttle.consume()
+            delay = self.latency
+            if self.jitter:
+                delay += self._random.uniform(-self.jitter, self.jitter)
+            failed = self.error_rate > 0 and self._random.random() < self.error_rate
+        if delay > 0:
+            time.sleep(delay)
+        if failed:
+            with self._lock:
+                self._stats['errors'] += 1
+            raise ConnectionError("回放数据源: 模拟的上游错误")
+
+    def serve(self, kind: str, symbol: str, start: str, end: str) -> pd.DataFrame:
+        """
+        处理一次请求
+
+        Args:
+            kind: 'daily'或'minute_{频率}'
+            symbol: 证券代码
+            start: 开始日期或时间
+            end: 结束日期或时间
+
+        Returns:
+            pd.DataFrame: 区间内的数据副本，调用方修改结果不会影响录制数据
+        """
+        self._simulate()
+        df = self.fixture(kind, symbol).loc[start:end]
+        with self._lock:
+            self._stats['bars'] += len(df)
+        return df.copy()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        回放统计：请求数、模拟失败数、被限流拒绝的请求数和返回的K线数
+
+        Returns:
+            Dict[str, int]: 统计信息
+        """
+        with self._lock:
+            return dict(self._stats)
+
+    def reset_stats(self) -> None:
+        """清零统计，便于分别统计各个压测场景"""
+        with self._lock:
+            self._stats = dict.fromkeys(self._stats, 0)
+
+
+# 按录制目录共享的回放服务
+_servers: Dict[str, ReplayServer] = {}
+_servers_lock = threading.Lock()
+
+
+def get_replay_server(fixture_dir: str = './fixtures') -> ReplayServer:
+    """
+    获取录制目录对应的回放服务，首次调用时以不模拟延迟和失败的默认配置创建
+
+    Args:
+        fixture_dir: 录制文件目录
+
+    Returns:
+        ReplayServer: 回放服务
+    """
+    key = os.path.abspath(fixture_dir)
+    with _servers_lock:
+        server = _servers.get(key)
+        if server is None:
+            server = ReplayServer(fixture_dir)
+            _servers[key] = server
+        return server
+
+
+def set_replay_server(server: ReplayServer) -> None:
+    """
+    设置录制目录对应的回放服务，之后以该目录创建的ReplayProvider都使用这个服务
+
+    Args:
+        server: 回放服务
+    """
+    with _servers_lock:
+        _servers[os.path.abspath(server.fixture_dir)] = server
+
+
+class ReplayProvider(DataProvider):
+    """
+    回放数据源提供者
+    每次请求先经过replay后端共享的请求调度器，再交给录制目录对应的回放服务
+    """
+
+    schema = BarSchema(
+        column_mapping={
+            'datetime': 'date',
+            'vol': 'volume',
+        },
+        columns=BAR_COLUMNS + ('amount',),
+        lowercase=True,
+        fill_missing=True
+    )
+
+    def __init__(
+        self,
+        fixture_dir: str = './fixtures',
+        server: Optional[ReplayServer] = None,
+        scheduler: Optional[RequestScheduler] = None
+    ):
+        """
+        初始化ReplayProvider
+
+        Args:
+            fixture_dir: 录制文件目录
+            server: 回放服务，默认使用get_replay_server(fixture_dir)
+            scheduler: 请求调度器，默认使用replay后端共享的调度器
+        """
+        self.server = server or get_replay_server(fixture_dir)
+        self.fixture_dir = self.server.fixture_dir
+        self.scheduler = scheduler or get_scheduler('replay')
+
+    def get_daily_data(self, symbol: str, start_date: str, end_date: str, **kwargs) -> pd.DataFrame:
+        """
+        回放日线数据
+
+        Args:
+            symbol: 证券代码
+            start_date: 开始日期，格式为'YYYY-MM-DD'
+            end_date: 结束日期，格式为'YYYY-MM-DD'
+            **kwargs: 额外参数，录制数据已经是最终的复权方式，adjust等参数被忽略
+
+        Returns:
+            DataFrame: 区间内的日线数据
+        """
+        return self.scheduler.submit(self.server.serve, _fixture_kind(), symbol, start_date, end_date)
+
+    def get_minute_data(self, symbol: str, start_time: str, end_time: str, frequency: str = '1', **kwargs) -> pd.DataFrame:
+        """
+        回放分钟数据
+
+        Args:
+            symbol: 证券代码
+            start_time: 开始时间，格式为'YYYY-MM-DD HH:MM:SS'或'YYYY-MM-DD'
+            end_time: 结束时间，格式为'YYYY-MM-DD HH:MM:SS'或'YYYY-MM-DD'
+            frequency: 时间频率，例如'1'表示1分钟
+            **kwargs: 额外参数
+
+        Returns:
+            DataFrame: 区间内的分钟数据
+        """
+        return self.scheduler.submit(self.server.serve, _fixture_kind(frequency), symbol, start_time, end_time)
+
+    def _list(self, name: str) -> pd.DataFrame:
+        path = os.path.join(self.fixture_dir, f'{name}.csv')
+        if os.path.exists(path):
+            return pd.read_csv(path, dtype={'code': str})[['code', 'name']]
+        return pd.DataFrame(columns=['code', 'name'])
+
+    def get_stock_list(self, **kwargs) -> pd.DataFrame:
+        """
+        股票列表，读取stock_list.csv；没有该文件时返回录制了日线数据的全部代码
+
+        Returns:
+            DataFrame: 包含code、name列的DataFrame
+        """
+        df = self._list('stock_list')
+        if df.empty:
+            daily_dir = os.path.join(self.fixture_dir, _fixture_kind())
+            if os.path.isdir(daily_dir):
+                codes = sorted({os.path.splitext(name)[0] for name in os.listdir(daily_dir)
+                                if name.endswith(FIXTURE_EXTENSIONS)})
+                df = pd.DataFrame({'code': codes, 'name': codes})
+        return df
+
+    def get_etf_list(self, **kwargs) -> pd.DataFrame:
+        """
+        ETF列表，读取etf_list.csv，没有该文件时返回空列表
+
+        Returns:
+            DataFrame: 包含code、name列的DataFrame
+        """
+        return self._list('etf_list')
+
+
+def record_fixtures(
+    provider: DataProvider,
+    fixture_dir: str,
+    symbols: Iterable[str],
+    start: str,
+    end: str,
+    frequency: Optional[str] = None,
+    **kwargs
+) -> Dict[str, str]:
+    """
+    从真实数据源录制回放用的数据文件，以CSV格式保存以便纳入版本管理
+
+    Args:
+        provider: 数据源提供者
+        fixture_dir: 录制文件目录
+        symbols: 证券代码
+        start: 开始日期或时间
+        end: 结束日期或时间
+        frequency: 分钟频率，None表示录制日线
+        **kwargs: 传给数据源的额外参数
+
+    Returns:
+        Dict[str, str]: 证券代码到录制文件路径的映射，获取失败的证券不在其中
+    """
+    kind_dir = os.path.join(fixture_dir, _fixture_kind(frequency))
+    os.makedirs(kind_dir, exist_ok=True)
+    paths = {}
+    for symbol in symbols:
+        try:
+            if frequency is None:
+                df = provider.get_daily_data(symbol, start, end, **kwargs)
+            else:
+                df = provider.get_minute_data(symbol, start, end, frequency, **kwargs)
+        except Exception as e:
+            logger.warning(f"录制{symbol}失败: {e}")
+            continue
+        path = os.path.join(kind_dir, f'{symbol}.csv')
+        df.to_csv(path, index_label='date')
+        paths[symbol] = path
+    return paths
+
+
+# 注册后端
+register_backend('replay', ReplayProvider)
+
+__all__ = [
+    'ReplayProvider',
+    'ReplayServer',
+    'get_replay_server',
+    'set_replay_server',
+    'record_fixtures',
+    'FIXTURE_EXTENSIONS',
+]
@@ -0,0 +1,259 @@
+"""
+请求调度模块
+为各个数据源后端提供共享的令牌桶限流、在途请求数限制、相同请求合并和优先级调度，
+保证批量任务用满后端允许的吞吐量而不超限
+"""
+import contextlib
+import contextvars
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional
+
+from qdata.backends import get_backend_config
+from qdata.core.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# 请求优先级，数值越小越先执行
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 10
+
+_current_priority: contextvars.ContextVar = contextvars.ContextVar(
+    'qdata_request_priority', default=PRIORITY_INTERACTIVE
+)
+
+
+@contextlib.contextmanager
+def request_priority(priority: int) -> Iterator[None]:
+    """
+    在当前上下文中设置后端请求的优先级
+
+    Args:
+        priority: 优先级，如PRIORITY_INTERACTIVE或PRIORITY_BATCH
+    """
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+class TokenBucket:
+    """
+    令牌桶
+    以rate个/秒的速度补充令牌，最多积累capacity个
+    """
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        """
+        初始化TokenBucket
+
+        Args:
+            rate: 每秒补充的令牌数
+            capacity: 桶容量，即允许的突发请求数
+            clock: 时钟函数，测试时可以替换为假时钟
+        """
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("令牌桶的速率和容量必须大于0")
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = capacity
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def time_until_available(self) -> float:
+        """返回距离下一个令牌可用还需等待的秒数，0表示立即可用"""
+        self._refill()
+        if self._tokens >= 1:
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    def consume(self) -> None:
+        """取走一个令牌，调用前应确认time_until_available()为0"""
+        self._refill()
+        self._tokens -= 1
+
+
+class RequestScheduler:
+    """
+    后端请求调度器
+    所有对同一后端的调用都经过submit()，由令牌桶控制速率、由max_in_flight控制并发，
+    等待中的请求按优先级（交互请求先于批量请求）和到达顺序获得执行许可，
+    完全相同的在途请求只会真正调用一次上游
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rate: float,
+        burst: float = 1,
+        max_in_flight: int = 4,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        """
+        初始化RequestScheduler
+
+        Args:
+            name: 后端名称
+            rate: 每秒允许的请求数
+            burst: 允许的突发请求数
+            max_in_flight: 同时在途的最大请求数
+            clock: 时钟函数，测试时可以替换为假时钟
+            sleep: 等待函数，测试时可以替换为推进假时钟的函数
+        """
+        self.name = name
+        self.max_in_flight = max(1, max_in_flight)
+        self._bucket = TokenBucket(rate, burst, clock=clock)
+        self._sleep = sleep
+        self._cond = threading.Condition()
+        self._waiters: list = []
+        self._seq = itertools.count()
+        self._in_flight = 0
+        self._flight = SingleFlight()
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """统计信息：实际执行的上游调用数和被合并的请求数"""
+        return {'executed': self._flight.stats['executed'], 'coalesced': self._flight.stats['shared']}
+
+    @property
+    def in_flight(self) -> int:
+        """当前在途的请求数"""
+        return self._in_flight
+
+    def _acquire(self, priority: int) -> None:
+        ticket = (priority, next(self._seq))
+        with self._cond:
+            heapq.heappush(self._waiters, ticket)
+            try:
+                while True:
+                    if self._waiters[0] == ticket and self._in_flight < self.max_in_flight:
+                        wait = self._bucket.time_until_available()
+                        if wait <= 0:
+                            self._bucket.consume()
+                            heapq.heappop(self._waiters)
+                            self._in_flight += 1
+                            self._cond.notify_all()
+                            return
+                        # 队首请求等待令牌时释放锁，其余请求仍在条件变量上排队
+                        self._cond.release()
+                        try:
+                            self._sleep(wait)
+                        finally:
+                            self._cond.acquire()
+                    else:
+                        self._cond.wait()
+            except BaseException:
+                if ticket in self._waiters:
+                    self._waiters.remove(ticket)
+                    heapq.heapify(self._waiters)
+                self._cond.notify_all()
+                raise
+
+    def _release(self) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def submit(
+        self,
+        fn: Callable[..., Any],
+        *args,
+        priority: Optional[int] = None,
+        coalesce_key: Optional[Hashable] = None,
+        **kwargs
+    ) -> Any:
+        """
+        在限流和并发约束下执行一次上游调用
+
+        Args:
+            fn: 上游调用函数
+            *args: 传给fn的位置参数
+            priority: 优先级，默认使用当前上下文的优先级（见request_priority）
+            coalesce_key: 请求合并键，默认由函数和参数生成；相同键的在途请求共享同一个结果
+            **kwargs: 传给fn的关键字参数
+
+        Returns:
+            Any: fn的返回值
+        """
+        if priority is None:
+            priority = _current_priority.get()
+        if coalesce_key is None:
+            coalesce_key = (getattr(fn, '__module__', None), getattr(fn, '__qualname__', repr(fn)),
+                            args, tuple(sorted(kwargs.items())))
+            try:
+                hash(coalesce_key)
+            except TypeError:
+                # 参数不可哈希时不做合并
+                coalesce_key = object()
+
+        def _run() -> Any:
+            self._acquire(priority)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._release()
+
+        result, _ = self._flight.do(coalesce_key, _run)
+        return result
+
+
+# 各后端共享的调度器
+_schedulers: Dict[str, RequestScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_scheduler(name: str) -> RequestScheduler:
+    """
+    获取后端共享的请求调度器，首次调用时按后端配置中的配额创建
+
+    Args:
+        name: 后端名称
+
+    Returns:
+        RequestScheduler: 请求调度器
+    """
+    with _schedulers_lock:
+        scheduler = _schedulers.get(name)
+        if scheduler is None:
+            config = get_backend_config(name)
+            scheduler = RequestScheduler(
+                name,
+                rate=config.get('rate_limit', 5),
+                burst=config.get('burst', 5),
+                max_in_flight=config.get('max_concurrency', 4)
+            )
+            _schedulers[name] = scheduler
+        return scheduler
+
+
+def set_scheduler(name: str, scheduler: RequestScheduler) -> None:
+    """
+    替换后端的请求调度器，例如调整配额或在测试中注入假时钟
+
+    Args:
+        name: 后端名称
+        scheduler: 新的请求调度器
+    """
+    with _schedulers_lock:
+        _schedulers[name] = scheduler
+
+
+__all__ = [
+    'TokenBucket',
+    'RequestScheduler',
+    'get_scheduler',
+    'set_scheduler',
+    'request_priority',
+    'PRIORITY_INTERACTIVE',
+    'PRIORITY_BATCH',
+]
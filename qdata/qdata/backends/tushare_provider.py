@@ -8,7 +8,10 @@ import pandas as pd
 import tushare as ts
 
 from qdata.provider import DataProvider
+from qdata.core.adjust import FACTOR_COLUMN, normalize_adjust
+from qdata.core.schema import BarSchema, empty_bars, normalize
 from qdata.backends import register_backend
+from qdata.backends.scheduler import RequestScheduler, get_scheduler
 
 
 class TuShareProvider(DataProvider):
@@ -17,17 +20,32 @@ class TuShareProvider(DataProvider):
     使用tushare库获取股票和ETF数据
     """
     
-    def __init__(self, token: str = None, retry_count: int = 3, retry_delay: list = None):
+    # pro_bar日线数据的列名描述，trade_date为YYYYMMDD格式
+    schema = BarSchema(
+        column_mapping={
+            'trade_date': 'date',
+            'vol': 'volume',
+        },
+        date_format='%Y%m%d'
+    )
+    
+    # get_k_data分钟数据的列名描述
+    minute_schema = BarSchema()
+    
+    def __init__(self, token: str = None, retry_count: int = 3, retry_delay: list = None,
+                 scheduler: Optional[RequestScheduler] = None):
         """
         初始化TuShareProvider
         
         Args:
             token: TuShare API token
             retry_count: 重试次数
-            retry_delay: 重试延迟时间列表（秒）
+            retry_delay: 失败后重试前的退避时间列表（秒）
+            scheduler: 请求调度器，默认使用tushare后端共享的调度器
         """
         self.retry_count = retry_count
         self.retry_delay = retry_delay or [1, 2, 3]
+        self.scheduler = scheduler or get_scheduler('tushare')
         
         # 初始化tushare
         if token:
@@ -36,7 +54,14 @@ class TuShareProvider(DataProvider):
         # 初始化pro接口
         self.pro = ts.pro_api()
     
-    def get_daily_data(self, symbol: str, start_date: str, end_date: str, **kwargs) -> pd.DataFrame:
+    def _call(self, fn, *args, **kwargs):
+        """
+        通过请求调度器调用tushare接口，受后端共享的限流和并发配额约束
+        """
+        return self.scheduler.submit(fn, *args, **kwargs)
+    
+    def get_daily_data(self, symbol: str, start_date: str, end_date: str,
+                       adjust: Optional[str] = 'qfq', **kwargs) -> pd.DataFrame:
         """
         获取日线数据
         
@@ -44,6 +69,7 @@ class TuShareProvider(DataProvider):
             symbol: 证券代码
             start_date: 开始日期，格式为'YYYY-MM-DD'
             end_date: 结束日期，格式为'YYYY-MM-DD'
+            adjust: 复权方式，'qfq'、'hfq'，None表示不复权
             **kwargs: 额外参数
             
         Returns:
@@ -60,7 +86,7 @@ class TuShareProvider(DataProvider):
         for i in range(self.retry_count):
             try:
                 # 尝试获取股票数据
-                df = ts.pro_bar(ts_code=symbol, adj='qfq', 
+                df = self._call(ts.pro_bar, ts_code=symbol, adj=normalize_adjust(adjust), 
                                 start_date=start_date_fmt, end_date=end_date_fmt)
                 
                 if not df.empty:
@@ -71,6 +97,8 @@ class TuShareProvider(DataProvider):
                     else:
                         # 股票数据处理
                         return self._format_tushare_data(df, data_type='stock')
+                # 区间内没有K线（上市前或停牌）不是错误，不再重试
+                return empty_bars(self.schema.columns)
                 
             except Exception as e:
                 last_err = e
@@ -83,6 +111,22 @@ class TuShareProvider(DataProvider):
             f"获取数据失败: {symbol} (从 {start_date} 到 {end_date})"
         ) from last_err
     
+    def get_adj_factor(self, symbol: str, **kwargs) -> pd.DataFrame:
+        """
+        获取后复权因子表
+        
+        Args:
+            symbol: 证券代码，如'600000.SH'
+            **kwargs: 额外参数
+            
+        Returns:
+            DataFrame: 以日期为索引、包含factor列的后复权因子表
+        """
+        df = self._call(self.pro.adj_factor, ts_code=symbol)
+        index = pd.DatetimeIndex(pd.to_datetime(df['trade_date'], format='%Y%m%d'), name='date')
+        factors = pd.DataFrame({FACTOR_COLUMN: df['adj_factor'].to_numpy()}, index=index)
+        return factors.sort_index()
+    
     def get_minute_data(self, symbol: str, start_time: str, end_time: str, frequency: str = '1', **kwargs) -> pd.DataFrame:
         """
         获取分时数据
@@ -103,7 +147,7 @@ class TuShareProvider(DataProvider):
         for i in range(self.retry_count):
             try:
                 # 使用tushare的get_k_data获取分钟数据
-                df = ts.get_k_data(symbol, start=start_time, end=end_time, ktype=frequency)
+                df = self._call(ts.get_k_data, symbol, start=start_time, end=end_time, ktype=frequency)
                 
                 if not df.empty:
                     return self._format_tushare_data(df, data_type='minute')
@@ -129,7 +173,7 @@ class TuShareProvider(DataProvider):
         for i in range(self.retry_count):
             try:
                 # 获取A股列表
-                df = self.pro.stock_basic(exchange='', list_status='L', 
+                df = self._call(self.pro.stock_basic, exchange='', list_status='L', 
                                          fields='ts_code,symbol,name,area,industry,list_date')
                 
                 if not df.empty:
@@ -157,7 +201,7 @@ class TuShareProvider(DataProvider):
         for i in range(self.retry_count):
             try:
                 # 获取ETF列表
-                df = self.pro.fund_basic(market='E', 
+                df = self._call(self.pro.fund_basic, market='E', 
                                         fields='ts_code,name,fund_type,issue_date,list_date')
                 
                 if not df.empty:
@@ -176,65 +220,17 @@ class TuShareProvider(DataProvider):
     
     def _format_tushare_data(self, df: pd.DataFrame, data_type: str) -> pd.DataFrame:
         """
-        格式化tushare返回的数据为统一格式
+        按tushare的数据描述把原始数据规范化为统一格式
         
         Args:
             df: tushare返回的原始数据
             data_type: 数据类型，如'stock', 'fund', 'minute'
             
         Returns:
-            DataFrame: 格式化后的数据
+            DataFrame: 格式化后的数据（tushare按日期倒序返回，规范化时会排序）
         """
-        # 定义列名映射
-        column_mapping = {
-            'trade_date': 'date',
-            'open': 'open',
-            'high': 'high',
-            'low': 'low',
-            'close': 'close',
-            'vol': 'volume',
-            'amount': 'amount'
-        }
-        
-        # 对于分钟数据，列名可能不同
-        if data_type == 'minute':
-            column_mapping = {
-                'date': 'date',
-                'open': 'open',
-                'high': 'high',
-                'low': 'low',
-                'close': 'close',
-                'volume': 'volume'
-            }
-        
-        # 重命名列
-        df = df.rename(columns={k: v for k, v in column_mapping.items() if k in df.columns})
-        
-        # 确保'date'列为datetime类型
-        if 'date' in df.columns:
-            # 处理tushare的日期格式
-            if data_type != 'minute' and isinstance(df['date'].iloc[0], str) and len(df['date'].iloc[0]) == 8:
-                # 如果是YYYYMMDD格式
-                df['date'] = pd.to_datetime(df['date'], format='%Y%m%d')
-            else:
-                df['date'] = pd.to_datetime(df['date'])
-            
-            df = df.set_index('date')
-        
-        # 确保必要的列存在
-        required_columns = ['open', 'high', 'low', 'close', 'volume']
-        for col in required_columns:
-            if col not in df.columns:
-                # 尝试从其他可能的列名中获取或设置默认值
-                pass
-        
-        # 对于tushare的数据，需要按日期排序
-        if not df.empty:
-            df = df.sort_index()
-        
-        # 只返回需要的列
-        available_columns = [col for col in required_columns if col in df.columns]
-        return df[available_columns]
+        schema = self.minute_schema if data_type == 'minute' else self.schema
+        return normalize(df, schema)
 
 # 注册后端
 register_backend('tushare', TuShareProvider)
@@ -0,0 +1,354 @@
+"""
+交易日历模块
+预先计算A股和美股的交易日序列，并为每个自然日建立到交易日位置的映射，
+"n个交易日前"、区间交易日数等查询都是O(1)的数组下标运算
+"""
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+from datetime import datetime
+from typing import Dict, Optional, Union
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.holiday import (
+    AbstractHolidayCalendar,
+    GoodFriday,
+    Holiday,
+    USLaborDay,
+    USMartinLutherKingJr,
+    USMemorialDay,
+    USPresidentsDay,
+    USThanksgivingDay,
+    nearest_workday,
+)
+
+logger = logging.getLogger(__name__)
+
+DateLike = Union[str, datetime, pd.Timestamp, np.datetime64]
+
+# A股交易日历的本地缓存，默认放在BarStore同级目录下
+DEFAULT_CALENDAR_DIR = os.path.join(os.path.expanduser('~'), '.qdata', 'calendar')
+# 本地缓存的A股交易日历超过该天数后重新下载
+CN_REFRESH_DAYS = 7
+# 无法下载A股交易日历时按工作日退化的起始日期
+FALLBACK_START = '2000-01-01'
+US_START = '1990-01-01'
+
+# A股代码：6位数字，可带sh/sz/bj前缀
+_CN_SYMBOL = re.compile(r'^(sh|sz|bj)?\d{6}$', re.IGNORECASE)
+# 美股代码：1~5个字母，可带.A/-B等股份类别后缀
+_US_SYMBOL = re.compile(r'^[A-Z]{1,5}([.-][A-Z])?$', re.IGNORECASE)
+# 无法判断所属市场的证券（港股、加密货币等）使用的日历名称
+UNKNOWN_MARKET = 'unknown'
+
+
+class NYSEHolidayCalendar(AbstractHolidayCalendar):
+    """纽约证券交易所休市规则"""
+    rules = [
+        Holiday('NewYearsDay', month=1, day=1, observance=nearest_workday),
+        USMartinLutherKingJr,
+        USPresidentsDay,
+        GoodFriday,
+        USMemorialDay,
+        Holiday('Juneteenth', month=6, day=19, start_date='2022-01-01', observance=nearest_workday),
+        Holiday('IndependenceDay', month=7, day=4, observance=nearest_workday),
+        USLaborDay,
+        USThanksgivingDay,
+        Holiday('Christmas', month=12, day=25, observance=nearest_workday),
+    ]
+
+
+class TradingCalendar:
+    """
+    交易日历
+    sessions为升序的交易日；_ordinal[i]表示第一个交易日之后第i个自然日（含）之前的交易日个数，
+    由此任何日期到交易日位置的换算都不需要二分查找
+    """
+
+    def __init__(self, name: str, sessions: pd.DatetimeIndex):
+        """
+        初始化TradingCalendar
+
+        Args:
+            name: 日历名称，如'CN'、'US'
+            sessions: 交易日序列
+        """
+        sessions = pd.DatetimeIndex(sessions).normalize().unique().sort_values()
+        if len(sessions) == 0:
+            raise ValueError(f"交易日历{name}没有任何交易日")
+        self.name = name
+        self.sessions = sessions
+        self._days = sessions.values.astype('datetime64[D]')
+        self._first = self._days[0]
+        self._last = self._days[-1]
+        offsets = (self._days - self._first).astype(np.int64)
+        flags = np.zeros(int(offsets[-1]) + 1, dtype=np.int64)
+        flags[offsets] = 1
+        self._ordinal = np.cumsum(flags)
+
+    @property
+    def first_session(self) -> pd.Timestamp:
+        return self.sessions[0]
+
+    @property
+    def last_session(self) -> pd.Timestamp:
+        return self.sessions[-1]
+
+    def _count_through(self, date: DateLike) -> int:
+        """截至date（含）的交易日个数，超出日历范围时截断到边界"""
+        day = np.datetime64(pd.Timestamp(date).date(), 'D')
+        if day < self._first:
+            return 0
+        if day > self._last:
+            return len(self._days)
+        return int(self._ordinal[int((day - self._first).astype(np.int64))])
+
+    def is_session(self, date: DateLike) -> bool:
+        """date是否为交易日"""
+        day = np.datetime64(pd.Timestamp(date).date(), 'D')
+        if day < self._first or day > self._last:
+            return False
+        count = self._count_through(day)
+        return self._days[count - 1] == day
+
+    def previous_session(self, date: DateLike) -> Optional[pd.Timestamp]:
+        """
+        date当天或之前最近的交易日
+
+        Returns:
+            Optional[pd.Timestamp]: 交易日，早于日历起点时返回None
+        """
+        count = self._count_through(date)
+        return self.sessions[count - 1] if count > 0 else None
+
+    def next_session(self, date: DateLike) -> Optional[pd.Timestamp]:
+        """
+        date当天或之后最近的交易日
+
+        Returns:
+            Optional[pd.Timestamp]: 交易日，晚于日历终点时返回None
+        """
+        day = pd.Timestamp(date).normalize()
+        count = self._count_through(day - pd.Timedelta(days=1))
+        return self.sessions[count] if count < len(self.sessions) else None
+
+    def sessions_back(self, date: DateLike, n: int) -> pd.Timestamp:
+        """
+        n个交易日前的交易日，n=1时为date当天或之前最近的交易日
+
+        Args:
+            date: 参考日期
+            n: 交易日个数
+
+        Returns:
+            pd.Timestamp: 窗口的第一个交易日，超出日历起点时返回第一个交易日
+        """
+        count = self._count_through(date)
+        return self.sessions[max(count - max(n, 1), 0)]
+
+    def count_sessions(self, start: DateLike, end: DateLike) -> int:
+        """[start, end]之间的交易日个数"""
+        start_day = pd.Timestamp(start).normalize()
+        return max(self._count_through(end) - self._count_through(start_day - pd.Timedelta(days=1)), 0)
+
+    def sessions_in_range(self, start: DateLike, end: DateLike) -> pd.DatetimeIndex:
+        """[start, end]之间的交易日"""
+        start_day = pd.Timestamp(start).normalize()
+        return self.sessions[self._count_through(start_day - pd.Timedelta(days=1)):self._count_through(end)]
+
+    def clamp(self, start: DateLike, end: DateLike) -> Optional[tuple]:
+        """
+        把[start, end]收缩到首尾都是交易日
+
+        Returns:
+            Optional[tuple]: (第一个交易日, 最后一个交易日)，区间内没有交易日时返回None
+        """
+        first = self.next_session(start)
+        last = self.previous_session(end)
+        if first is None or last is None or first > last:
+            return None
+        return first, last
+
+
+def _extend_with_weekdays(sessions: pd.DatetimeIndex, until: pd.Timestamp) -> pd.DatetimeIndex:
+    """日历数据源没有覆盖到的未来日期按工作日补齐"""
+    if len(sessions) and sessions[-1] >= until:
+        return sessions
+    start = sessions[-1] + pd.Timedelta(days=1) if len(sessions) else pd.Timestamp(FALLBACK_START)
+    return sessions.append(pd.bdate_range(start, until))
+
+
+def _calendar_horizon() -> pd.Timestamp:
+    """日历至少覆盖到明年年底"""
+    return pd.Timestamp(year=datetime.now().year + 1, month=12, day=31)
+
+
+def _load_cn_cache(path: str) -> Optional[pd.DatetimeIndex]:
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            raw = json.load(f)
+    except (OSError, ValueError):
+        return None
+    updated = pd.Timestamp(raw.get('updated', '1970-01-01'))
+    if (pd.Timestamp(datetime.now()) - updated).days > CN_REFRESH_DAYS:
+        return None
+    return pd.DatetimeIndex(raw.get('sessions', []))
+
+
+def _save_cn_cache(path: str, sessions: pd.DatetimeIndex) -> None:
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        payload = {
+            'updated': datetime.now().strftime('%Y-%m-%d'),
+            'sessions': [day.strftime('%Y-%m-%d') for day in sessions],
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.debug(f"无法写入交易日历缓存{path}: {e}")
+
+
+def build_cn_calendar(cache_dir: Optional[str] = None) -> TradingCalendar:
+    """
+    构建A股交易日历
+
+    优先使用本地缓存，缓存过期时通过akshare的tool_trade_date_hist_sina重新下载；
+    akshare不可用时退化为工作日日历
+
+    Args:
+        cache_dir: 本地缓存目录，默认为~/.qdata/calendar
+
+    Returns:
+        TradingCalendar: A股交易日历
+    """
+    path = os.path.join(cache_dir or DEFAULT_CALENDAR_DIR, 'cn.json')
+    sessions = _load_cn_cache(path)
+    if sessions is None or len(sessions) == 0:
+        try:
+            import akshare as ak
+            raw = ak.tool_trade_date_hist_sina()
+            sessions = pd.DatetimeIndex(pd.to_datetime(raw['trade_date']))
+            _save_cn_cache(path, sessions)
+        except Exception as e:
+            logger.warning(f"获取A股交易日历失败，按工作日计算: {e}")
+            sessions = pd.DatetimeIndex([])
+    return TradingCalendar('CN', _extend_with_weekdays(sessions.sort_values(), _calendar_horizon()))
+
+
+def build_us_calendar() -> TradingCalendar:
+    """
+    按规则构建美股交易日历（工作日去掉纽交所休市日）
+
+    Returns:
+        TradingCalendar: 美股交易日历
+    """
+    horizon = _calendar_horizon()
+    holidays = NYSEHolidayCalendar().holidays(start=US_START, end=horizon)
+    sessions = pd.bdate_range(US_START, horizon)
+    return TradingCalendar('US', sessions[~sessions.isin(holidays)])
+
+
+def build_continuous_calendar() -> TradingCalendar:
+    """
+    构建每个自然日都是交易日的日历，用于无法判断所属市场的证券：
+    收缩区间时不改变首尾，"n个交易日前"按自然日计算
+
+    Returns:
+        TradingCalendar: 连续日历
+    """
+    return TradingCalendar(UNKNOWN_MARKET.upper(), pd.date_range(US_START, _calendar_horizon()))
+
+
+_builders = {
+    'CN': build_cn_calendar,
+    'US': build_us_calendar,
+    UNKNOWN_MARKET.upper(): build_continuous_calendar,
+}
+_calendars: Dict[str, TradingCalendar] = {}
+_calendars_lock = threading.Lock()
+
+
+def get_calendar(market: str = 'CN') -> TradingCalendar:
+    """
+    获取市场的交易日历，首次调用时构建并在进程内复用
+
+    Args:
+        market: 市场，'CN'、'US'或'unknown'
+
+    Returns:
+        TradingCalendar: 交易日历
+    """
+    market = market.upper()
+    if market not in _builders:
+        raise ValueError(f"不支持的交易日历: {market}")
+    with _calendars_lock:
+        calendar = _calendars.get(market)
+        if calendar is None:
+            calendar = _builders[market]()
+            _calendars[market] = calendar
+        return calendar
+
+
+def set_calendar(market: str, calendar: TradingCalendar) -> None:
+    """
+    替换市场的交易日历，例如在离线环境或测试中注入固定的交易日
+
+    Args:
+        market: 市场，'CN'、'US'或'unknown'
+        calendar: 交易日历
+    """
+    with _calendars_lock:
+        _calendars[market.upper()] = calendar
+
+
+def market_of(symbol: str) -> str:
+    """
+    根据证券代码判断所属市场：6位数字（可带sh/sz/bj前缀）为A股，1~5个字母为美股，
+    其余（如港股00700、加密货币BTCUSDT）无法判断
+
+    Args:
+        symbol: 证券代码
+
+    Returns:
+        str: 'CN'、'US'或'unknown'；'unknown'对应每个自然日都是交易日的连续日历，不会收缩日期区间
+    """
+    symbol = str(symbol)
+    if _CN_SYMBOL.match(symbol):
+        return 'CN'
+    if _US_SYMBOL.match(symbol):
+        return 'US'
+    return UNKNOWN_MARKET
+
+
+def calendar_for(symbol: str) -> TradingCalendar:
+    """
+    获取证券所属市场的交易日历
+
+    Args:
+        symbol: 证券代码
+
+    Returns:
+        TradingCalendar: 交易日历
+    """
+    return get_calendar(market_of(symbol))
+
+
+__all__ = [
+    'TradingCalendar',
+    'NYSEHolidayCalendar',
+    'build_cn_calendar',
+    'build_us_calendar',
+    'build_continuous_calendar',
+    'get_calendar',
+    'set_calendar',
+    'market_of',
+    'calendar_for',
+]
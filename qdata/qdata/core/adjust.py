@@ -0,0 +1,70 @@
+"""
+复权模块
+本地只保存不复权K线和后复权因子，前复权/后复权/不复权的价格在读取时按因子向量化计算，
+一次下载即可满足三种复权方式，分红送转后只需刷新很小的因子表
+"""
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+# 需要复权的价格字段，成交量和成交额不复权
+PRICE_COLUMNS = ('open', 'high', 'low', 'close')
+# 因子表中的因子列名
+FACTOR_COLUMN = 'factor'
+
+
+def normalize_adjust(adjust: Optional[str]) -> Optional[str]:
+    """
+    统一复权方式的写法
+
+    Args:
+        adjust: 'qfq'（前复权）、'hfq'（后复权），None、''或'none'表示不复权
+
+    Returns:
+        Optional[str]: 'qfq'、'hfq'或None
+    """
+    if adjust is None or adjust == '' or str(adjust).lower() == 'none':
+        return None
+    adjust = str(adjust).lower()
+    if adjust not in ('qfq', 'hfq'):
+        raise ValueError(f"不支持的复权方式: {adjust}")
+    return adjust
+
+
+def apply_adjustment(df: pd.DataFrame, factors: pd.DataFrame, adjust: Optional[str]) -> pd.DataFrame:
+    """
+    用后复权因子把不复权K线换算为指定的复权方式
+
+    后复权价格 = 不复权价格 × 当日因子；前复权价格 = 不复权价格 × 当日因子 / 最新因子
+
+    Args:
+        df: 以日期为索引、按日期排序的不复权K线
+        factors: 以日期为索引的后复权因子表，因子在除权日变化，其余日期沿用之前的因子
+        adjust: 复权方式，'qfq'、'hfq'或None
+
+    Returns:
+        pd.DataFrame: 复权后的K线，不复权时原样返回；价格列保持原来的数据类型
+    """
+    adjust = normalize_adjust(adjust)
+    if adjust is None or df is None or df.empty:
+        return df
+    if factors is None or factors.empty:
+        raise ValueError("缺少复权因子，无法计算复权价格")
+
+    factor = factors[FACTOR_COLUMN].sort_index()
+    factor = factor[~factor.index.duplicated(keep='last')]
+    aligned = factor.reindex(df.index.normalize(), method='ffill')
+    # 早于因子表第一天的K线使用第一个因子
+    scale = aligned.fillna(factor.iloc[0]).to_numpy(dtype=np.float64)
+    if adjust == 'qfq':
+        scale = scale / factor.iloc[-1]
+
+    result = df.copy(deep=False)
+    for col in PRICE_COLUMNS:
+        if col in df.columns:
+            result[col] = (df[col].to_numpy(dtype=np.float64) * scale).astype(df[col].dtype, copy=False)
+    return result
+
+
+__all__ = ['normalize_adjust', 'apply_adjustment', 'PRICE_COLUMNS', 'FACTOR_COLUMN']
@@ -0,0 +1,484 @@
+"""
+本地K线存储模块
+将已下载的K线按证券代码和年份分区持久化到本地磁盘，
+再次请求时只根据覆盖索引向远端后端获取缺失的日期区间
+"""
+import contextlib
+import importlib.util
+import logging
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from qdata.calendar import UNKNOWN_MARKET, calendar_for, market_of
+from qdata.core.coverage import CoverageIndex
+from qdata.core.schema import apply_dtype_profile, empty_bars
+
+try:
+    import fcntl
+except ImportError:  # Windows平台没有fcntl，退化为无锁写入
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# 默认存储目录，可以通过环境变量QDATA_STORE_DIR覆盖
+DEFAULT_STORE_DIR = os.path.join(os.path.expanduser('~'), '.qdata', 'bars')
+# 合并各年分区的内存映射快照文件
+MMAP_FILE = '_mmap.arrow'
+# 复权因子表目录，位于各后端目录下；因子表默认每天刷新一次以获取新的除权信息
+FACTOR_DIR = 'adj_factor'
+FACTOR_MAX_AGE = 24 * 60 * 60
+
+
+def _range_bounds(start: Optional[str], end: Optional[str]) -> Tuple[Optional[pd.Timestamp], Optional[pd.Timestamp]]:
+    """把请求的起止时间转换为闭区间边界，只给出日期的结束时间包含当天的全部K线"""
+    start_ts = pd.Timestamp(start) if start is not None else None
+    end_ts = pd.Timestamp(end) if end is not None else None
+    if end_ts is not None and end_ts == end_ts.normalize():
+        end_ts = end_ts + timedelta(days=1) - pd.Timedelta(1, unit='ns')
+    return start_ts, end_ts
+
+
+def _trim_to_sessions(symbol: str, ranges: List[Tuple[pd.Timestamp, pd.Timestamp]]) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+    """按交易日历收缩缺口的首尾，并去掉只包含周末和节假日的缺口；无法判断所属市场的证券不收缩"""
+    if market_of(symbol) == UNKNOWN_MARKET:
+        return ranges
+    try:
+        calendar = calendar_for(symbol)
+    except Exception as e:
+        logger.debug(f"交易日历不可用，按自然日计算缺口: {e}")
+        return ranges
+    trimmed = []
+    for start, end in ranges:
+        bounds = calendar.clamp(start, end)
+        if bounds is not None:
+            trimmed.append(bounds)
+    return trimmed
+
+
+def _has_pyarrow() -> bool:
+    """检查是否安装了pyarrow（Parquet读写依赖），不实际导入"""
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+class BarStore:
+    """
+    本地列式K线存储
+    目录结构为 {root_dir}/{backend}/{freq}/{symbol}/{year}.{ext}，
+    同一目录下的_coverage.json记录已覆盖的日期区间，
+    安装了pyarrow时使用Parquet格式，否则退化为pickle格式
+    """
+
+    def __init__(self, root_dir: Optional[str] = None, file_format: Optional[str] = None):
+        """
+        初始化BarStore
+
+        Args:
+            root_dir: 存储根目录，默认为环境变量QDATA_STORE_DIR或~/.qdata/bars
+            file_format: 文件格式，'parquet'或'pickle'，默认根据pyarrow是否可用自动选择
+        """
+        self.root_dir = root_dir or os.environ.get('QDATA_STORE_DIR') or DEFAULT_STORE_DIR
+        if file_format is None:
+            file_format = 'parquet' if _has_pyarrow() else 'pickle'
+        if file_format not in ('parquet', 'pickle'):
+            raise ValueError(f"不支持的存储格式: {file_format}")
+        self.file_format = file_format
+        self._ext = 'parquet' if file_format == 'parquet' else 'pkl'
+
+    def _symbol_dir(self, backend: str, symbol: str, freq: str) -> str:
+        return os.path.join(self.root_dir, backend, freq, symbol)
+
+    def _partition_path(self, backend: str, symbol: str, freq: str, year: int) -> str:
+        return os.path.join(self._symbol_dir(backend, symbol, freq), f'{year}.{self._ext}')
+
+    def _list_years(self, backend: str, symbol: str, freq: str) -> List[int]:
+        symbol_dir = self._symbol_dir(backend, symbol, freq)
+        if not os.path.isdir(symbol_dir):
+            return []
+        years = []
+        for name in os.listdir(symbol_dir):
+            stem, ext = os.path.splitext(name)
+            if ext == f'.{self._ext}' and stem.isdigit():
+                years.append(int(stem))
+        return sorted(years)
+
+    @contextlib.contextmanager
+    def _locked(self, backend: str, symbol: str, freq: str) -> Iterator[None]:
+        """对单个证券目录加文件锁，保证多进程读改写分区时互斥"""
+        symbol_dir = self._symbol_dir(backend, symbol, freq)
+        os.makedirs(symbol_dir, exist_ok=True)
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(symbol_dir, '.lock'), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_file(self, path: str) -> pd.DataFrame:
+        if self.file_format == 'parquet':
+            return pd.read_parquet(path)
+        return pd.read_pickle(path)
+
+    def _write_file(self, df: pd.DataFrame, path: str) -> None:
+        # 先写临时文件再原子替换，避免其他进程读到写了一半的文件
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        os.close(fd)
+        try:
+            if self.file_format == 'parquet':
+                df.to_parquet(tmp_path)
+            else:
+                df.to_pickle(tmp_path)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def read(self, backend: str, symbol: str, freq: str,
+             start: Optional[str] = None, end: Optional[str] = None,
+             dtype_profile: Optional[str] = None) -> pd.DataFrame:
+        """
+        读取本地存储的K线
+
+        Args:
+            backend: 数据源后端名称
+            symbol: 证券代码
+            freq: 数据频率，如'daily'
+            start: 开始日期，None表示不限制
+            end: 结束日期，None表示不限制
+            dtype_profile: 数据类型方案，如'compact'，在合并各年分区前逐个转换以降低峰值内存
+
+        Returns:
+            DataFrame: 以日期为索引的K线数据，没有数据时返回只有K线字段的空DataFrame
+        """
+        start_ts, end_ts = _range_bounds(start, end)
+
+        frames = []
+        for year in self._list_years(backend, symbol, freq):
+            if start_ts is not None and year < start_ts.year:
+                continue
+            if end_ts is not None and year > end_ts.year:
+                continue
+            part = self._read_file(self._partition_path(backend, symbol, freq, year))
+            frames.append(apply_dtype_profile(part, dtype_profile))
+
+        if not frames:
+            return empty_bars()
+
+        df = pd.concat(frames) if len(frames) > 1 else frames[0]
+        if start_ts is not None:
+            df = df[df.index >= start_ts]
+        if end_ts is not None:
+            df = df[df.index <= end_ts]
+        return df
+
+    def _mmap_path(self, backend: str, symbol: str, freq: str) -> str:
+        return os.path.join(self._symbol_dir(backend, symbol, freq), MMAP_FILE)
+
+    def _build_snapshot(self, backend: str, symbol: str, freq: str) -> None:
+        """把各年分区合并写成一个未压缩的Arrow IPC文件，供内存映射读取；调用方需持有证券目录的锁"""
+        import pyarrow as pa
+
+        path = self._mmap_path(backend, symbol, freq)
+        df = self.read(backend, symbol, freq)
+        if df.empty:
+            return
+        # 合并为单个record batch，读取时每列都是一块连续的缓冲区
+        table = pa.Table.from_pandas(df, preserve_index=True).combine_chunks()
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        os.close(fd)
+        try:
+            with pa.OSFile(tmp_path, 'wb') as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def read_mapped(self, backend: str, symbol: str, freq: str,
+                    start: Optional[str] = None, end: Optional[str] = None) -> pd.DataFrame:
+        """
+        以内存映射方式读取本地存储的K线
+
+        返回的DataFrame直接引用映射文件中的缓冲区（只读），
+        同一台机器上的多个回测进程共享同一份物理内存；
+        没有pyarrow时退化为普通读取
+
+        Args:
+            backend: 数据源后端名称
+            symbol: 证券代码
+            freq: 数据频率，如'daily'
+            start: 开始日期，None表示不限制
+            end: 结束日期，None表示不限制
+
+        Returns:
+            DataFrame: 以日期为索引的只读K线数据，没有数据时返回只有K线字段的空DataFrame
+        """
+        if not _has_pyarrow():
+            logger.debug("未安装pyarrow，内存映射读取退化为普通读取")
+            return self.read(backend, symbol, freq, start, end)
+        import pyarrow as pa
+
+        # 在锁内检查、重建并打开快照，write()只在持有同一把锁时删除快照；
+        # 打开后的映射在文件被删除或替换后仍然有效
+        path = self._mmap_path(backend, symbol, freq)
+        with self._locked(backend, symbol, freq):
+            if not os.path.exists(path):
+                self._build_snapshot(backend, symbol, freq)
+                if not os.path.exists(path):
+                    return empty_bars()
+            source = pa.memory_map(path, 'r')
+
+        table = pa.ipc.open_file(source).read_all()
+
+        # 在Arrow表上按位置切片，切片不复制数据
+        start_ts, end_ts = _range_bounds(start, end)
+        index_name = table.schema.pandas_metadata['index_columns'][0]
+        dates = table.column(index_name).to_numpy()
+        lo = dates.searchsorted(start_ts.to_datetime64()) if start_ts is not None else 0
+        hi = dates.searchsorted(end_ts.to_datetime64(), side='right') if end_ts is not None else len(dates)
+        table = table.slice(lo, max(hi - lo, 0))
+
+        # split_blocks避免把同类型的列合并成一个二维块，无缺失值的数值列保持零拷贝
+        return table.to_pandas(split_blocks=True)
+
+    def write(self, backend: str, symbol: str, freq: str, df: pd.DataFrame) -> None:
+        """
+        写入K线，与已存储的分区按日期合并，新数据覆盖旧数据
+
+        Args:
+            backend: 数据源后端名称
+            symbol: 证券代码
+            freq: 数据频率，如'daily'
+            df: 以日期为索引的K线数据
+        """
+        if df is None or df.empty:
+            return
+        if not isinstance(df.index, pd.DatetimeIndex):
+            raise ValueError("写入BarStore的数据必须以DatetimeIndex为索引")
+
+        with self._locked(backend, symbol, freq):
+            changed = False
+            for year, part in df.groupby(df.index.year):
+                path = self._partition_path(backend, symbol, freq, int(year))
+                if os.path.exists(path):
+                    stored = self._read_file(path)
+                    part = pd.concat([stored, part])
+                    part = part[~part.index.duplicated(keep='last')].sort_index()
+                    # 重复写入相同的K线（如盘后反复请求当天）不改动分区，也不使快照失效
+                    if part.equals(stored):
+                        continue
+                else:
+                    part = part.sort_index()
+                self._write_file(part, path)
+                changed = True
+            # 分区已变化，内存映射快照在下次读取时重建
+            snapshot = self._mmap_path(backend, symbol, freq)
+            if changed and os.path.exists(snapshot):
+                os.remove(snapshot)
+
+    def stored_span(self, backend: str, symbol: str, freq: str) -> Optional[Tuple[pd.Timestamp, pd.Timestamp]]:
+        """
+        返回本地已存储数据的首尾日期
+
+        Returns:
+            (first, last)元组，没有数据时返回None
+        """
+        years = self._list_years(backend, symbol, freq)
+        if not years:
+            return None
+        first = self._read_file(self._partition_path(backend, symbol, freq, years[0])).index
+        last = self._read_file(self._partition_path(backend, symbol, freq, years[-1])).index
+        if len(first) == 0 or len(last) == 0:
+            return None
+        return first.min(), last.max()
+
+    def coverage(self, backend: str, symbol: str, freq: str) -> CoverageIndex:
+        """
+        获取单个证券/频率的覆盖索引
+
+        Returns:
+            CoverageIndex: 与数据存放在同一目录的覆盖索引
+        """
+        return CoverageIndex(self._symbol_dir(backend, symbol, freq))
+
+    def mark_covered(self, backend: str, symbol: str, freq: str,
+                     start: pd.Timestamp, end: pd.Timestamp) -> None:
+        """
+        记录[start, end]已被本地覆盖（即使该区间内没有K线，如停牌或上市前）
+
+        Args:
+            backend: 数据源后端名称
+            symbol: 证券代码
+            freq: 数据频率，如'daily'
+            start: 开始日期
+            end: 结束日期
+        """
+        with self._locked(backend, symbol, freq):
+            self.coverage(backend, symbol, freq).add(start, end)
+
+    def missing_ranges(self, backend: str, symbol: str, freq: str, start: str, end: str,
+                       trim_sessions: bool = True) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+        """
+        根据覆盖索引计算请求区间中本地尚未覆盖的日期区间
+
+        当天及以后的K线在收盘前仍会变化，因此始终视为缺失；
+        没有覆盖索引的旧数据目录以已存储数据的首尾日期作为覆盖范围；
+        缺口按交易日历收缩，只包含周末和节假日的缺口不会请求后端
+
+        Args:
+            backend: 数据源后端名称
+            symbol: 证券代码
+            freq: 数据频率，如'daily'
+            start: 开始日期
+            end: 结束日期
+            trim_sessions: 是否按交易日历收缩缺口，为False时不构建交易日历（离线后端不需要联网）
+
+        Returns:
+            List[Tuple]: 缺失的(开始, 结束)日期区间列表
+        """
+        start_ts = pd.Timestamp(start).normalize()
+        end_ts = pd.Timestamp(end).normalize()
+        today = pd.Timestamp(datetime.now().date())
+        closed_end = min(end_ts, today - timedelta(days=1))
+
+        ranges = []
+        if start_ts <= closed_end:
+            index = self.coverage(backend, symbol, freq)
+            if not index.exists():
+                span = self.stored_span(backend, symbol, freq)
+                if span is not None:
+                    self.mark_covered(backend, symbol, freq, span[0].normalize(),
+                                      min(span[1].normalize(), today - timedelta(days=1)))
+            ranges.extend(index.missing(start_ts, closed_end))
+
+        if end_ts >= today:
+            open_start = max(start_ts, today)
+            if ranges and ranges[-1][1] == open_start - timedelta(days=1):
+                ranges[-1] = (ranges[-1][0], end_ts)
+            else:
+                ranges.append((open_start, end_ts))
+        return _trim_to_sessions(symbol, ranges) if trim_sessions else ranges
+
+    def _factor_path(self, backend: str, symbol: str) -> str:
+        return os.path.join(self.root_dir, backend, FACTOR_DIR, f'{symbol}.{self._ext}')
+
+    def read_factors(self, backend: str, symbol: str) -> pd.DataFrame:
+        """
+        读取本地保存的后复权因子表
+
+        Returns:
+            DataFrame: 以日期为索引、包含factor列的因子表，没有时返回空DataFrame
+        """
+        path = self._factor_path(backend, symbol)
+        if not os.path.exists(path):
+            return pd.DataFrame()
+        return self._read_file(path)
+
+    def write_factors(self, backend: str, symbol: str, factors: pd.DataFrame) -> None:
+        """
+        整体替换本地保存的后复权因子表
+
+        Args:
+            backend: 数据源后端名称
+            symbol: 证券代码
+            factors: 以日期为索引、包含factor列的因子表
+        """
+        path = self._factor_path(backend, symbol)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._write_file(factors.sort_index(), path)
+
+    def get_factors(self, backend: str, symbol: str, fetcher: Callable[[pd.DataFrame], pd.DataFrame],
+                    max_age: float = FACTOR_MAX_AGE) -> pd.DataFrame:
+        """
+        读取后复权因子表，本地没有或超过max_age秒未刷新时调用fetcher重新获取
+
+        Args:
+            backend: 数据源后端名称
+            symbol: 证券代码
+            fetcher: 获取完整因子表的函数，参数为本地已保存的因子表（没有时为空DataFrame），
+                后端可以据此只下载最后一个日期之后的部分
+            max_age: 因子表的最长使用时间（秒）
+
+        Returns:
+            DataFrame: 以日期为索引、包含factor列的因子表
+        """
+        path = self._factor_path(backend, symbol)
+        if os.path.exists(path) and time.time() - os.path.getmtime(path) < max_age:
+            return self._read_file(path)
+        known = self._read_file(path) if os.path.exists(path) else pd.DataFrame()
+        try:
+            factors = fetcher(known)
+        except Exception as e:
+            # 刷新失败时继续使用旧的因子表
+            if not known.empty:
+                logger.warning(f"刷新{symbol}的复权因子失败，使用本地旧数据: {e}")
+                return known
+            raise
+        if factors is not None and not factors.empty:
+            self.write_factors(backend, symbol, factors)
+        return factors
+
+    def get_or_fetch(self, backend: str, symbol: str, freq: str, start: str, end: str,
+                     fetcher: Callable[[str, str], pd.DataFrame], intraday: bool = False,
+                     dtype_profile: Optional[str] = None, mmap: bool = False,
+                     trim_sessions: bool = True) -> pd.DataFrame:
+        """
+        优先从本地读取，只对缺失区间调用fetcher，并把新数据和覆盖范围写回本地
+
+        Args:
+            backend: 数据源后端名称
+            symbol: 证券代码
+            freq: 数据频率，如'daily'
+            start: 开始日期，格式为'YYYY-MM-DD'
+            end: 结束日期，格式为'YYYY-MM-DD'
+            fetcher: 远端获取函数，参数为(start, end)字符串，返回以日期为索引的DataFrame；
+                区间内没有K线（上市前、停牌）时应返回空DataFrame或None，只有真正的错误才抛出异常
+            intraday: 是否为分时数据，为True时传给fetcher的时间精确到秒并覆盖整天
+            dtype_profile: 返回数据使用的数据类型方案，本地文件始终按后端原始类型保存
+            mmap: 是否以内存映射方式返回只读数据，见read_mapped
+            trim_sessions: 是否按交易日历收缩缺口，见missing_ranges
+
+        Returns:
+            DataFrame: 请求区间内的完整数据
+        """
+        today = pd.Timestamp(datetime.now().date())
+        last_err = None
+        for gap_start, gap_end in self.missing_ranges(backend, symbol, freq, start, end, trim_sessions):
+            if intraday:
+                gap_start_str = gap_start.strftime('%Y-%m-%d 00:00:00')
+                gap_end_str = gap_end.strftime('%Y-%m-%d 23:59:59')
+            else:
+                gap_start_str = gap_start.strftime('%Y-%m-%d')
+                gap_end_str = gap_end.strftime('%Y-%m-%d')
+            try:
+                fetched = fetcher(gap_start_str, gap_end_str)
+            except Exception as e:
+                # 出错的缺口不记入覆盖索引，下次请求时重新获取
+                logger.warning(f"补齐{symbol}从{gap_start_str}到{gap_end_str}的数据失败: {e}")
+                last_err = e
+                continue
+            # 空结果表示该区间没有K线（上市前或停牌），同样记入覆盖索引，之后不再请求上游；
+            # 只把已收盘的日期记入覆盖索引，当天的K线下次仍会重新获取
+            self.write(backend, symbol, freq, fetched)
+            self.mark_covered(backend, symbol, freq, gap_start, min(gap_end, today - timedelta(days=1)))
+
+        if mmap:
+            df = apply_dtype_profile(self.read_mapped(backend, symbol, freq, start, end), dtype_profile)
+        else:
+            df = self.read(backend, symbol, freq, start, end, dtype_profile=dtype_profile)
+        if df.empty and last_err is not None:
+            raise last_err
+        return df
+
+
+__all__ = ['BarStore', 'DEFAULT_STORE_DIR', 'MMAP_FILE', 'FACTOR_DIR']
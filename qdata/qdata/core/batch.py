@@ -0,0 +1,97 @@
+"""
+批量获取模块
+在有界线程池上并发获取多个证券的数据，并按后端限制同时在途的请求数
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# 每个后端共享一个信号量，多个批量任务同时运行时也不会超过后端的并发上限
+_backend_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+_semaphores_lock = threading.Lock()
+
+
+class BatchResult(dict):
+    """
+    批量获取结果
+    以证券代码为键、DataFrame为值的字典，获取失败的证券记录在failed属性中
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.failed: Dict[str, Exception] = {}
+
+    @property
+    def succeeded(self) -> list:
+        """获取成功的证券代码列表"""
+        return list(self.keys())
+
+
+def get_backend_semaphore(backend_name: str, max_concurrency: int) -> threading.BoundedSemaphore:
+    """
+    获取后端的并发信号量，首次调用时按max_concurrency创建
+
+    Args:
+        backend_name: 后端名称
+        max_concurrency: 后端允许同时在途的最大请求数
+
+    Returns:
+        threading.BoundedSemaphore: 该后端共享的信号量
+    """
+    with _semaphores_lock:
+        semaphore = _backend_semaphores.get(backend_name)
+        if semaphore is None:
+            semaphore = threading.BoundedSemaphore(max(1, max_concurrency))
+            _backend_semaphores[backend_name] = semaphore
+        return semaphore
+
+
+def fetch_batch(
+    symbols: Iterable[str],
+    fetch_one: Callable[[str], pd.DataFrame],
+    semaphore: threading.BoundedSemaphore,
+    max_workers: Optional[int] = None
+) -> BatchResult:
+    """
+    并发获取多个证券的数据
+
+    Args:
+        symbols: 证券代码列表
+        fetch_one: 获取单个证券数据的函数
+        semaphore: 后端并发信号量
+        max_workers: 线程池大小，默认与证券数量和信号量上限相同量级
+
+    Returns:
+        BatchResult: 批量获取结果
+    """
+    symbols = list(dict.fromkeys(symbols))
+    result = BatchResult()
+    if not symbols:
+        return result
+
+    def _run(symbol: str) -> pd.DataFrame:
+        with semaphore:
+            return fetch_one(symbol)
+
+    if max_workers is None:
+        max_workers = min(len(symbols), 32)
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='qdata-batch') as executor:
+        futures = {symbol: executor.submit(_run, symbol) for symbol in symbols}
+        for symbol, future in futures.items():
+            try:
+                result[symbol] = future.result()
+            except Exception as e:
+                logger.warning(f"批量获取{symbol}失败: {e}")
+                result.failed[symbol] = e
+
+    logger.info(f"批量获取完成: 成功{len(result)}个，失败{len(result.failed)}个")
+    return result
+
+
+__all__ = ['BatchResult', 'fetch_batch', 'get_backend_semaphore']
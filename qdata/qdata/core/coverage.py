@@ -0,0 +1,143 @@
+"""
+数据覆盖索引模块
+按证券代码和频率记录本地已持有的日期区间，用于计算增量获取的缺口
+"""
+import json
+import os
+import tempfile
+from datetime import timedelta
+from typing import List, Tuple
+
+import pandas as pd
+
+Interval = Tuple[pd.Timestamp, pd.Timestamp]
+
+# 覆盖索引文件名，与K线分区文件放在同一目录
+COVERAGE_FILE = '_coverage.json'
+
+
+def merge_intervals(intervals: List[Interval]) -> List[Interval]:
+    """
+    合并重叠或相邻（相差一天以内）的日期区间
+
+    Args:
+        intervals: (开始, 结束)日期区间列表
+
+    Returns:
+        List[Interval]: 按开始日期排序且互不相交的区间列表
+    """
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1] + timedelta(days=1):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def subtract_intervals(start: pd.Timestamp, end: pd.Timestamp, covered: List[Interval]) -> List[Interval]:
+    """
+    从[start, end]中扣除已覆盖的区间，返回剩余的缺口
+
+    Args:
+        start: 开始日期
+        end: 结束日期
+        covered: 已合并的覆盖区间列表
+
+    Returns:
+        List[Interval]: 缺口区间列表
+    """
+    gaps: List[Interval] = []
+    cursor = start
+    for cov_start, cov_end in covered:
+        if cov_end < cursor:
+            continue
+        if cov_start > end:
+            break
+        if cov_start > cursor:
+            gaps.append((cursor, cov_start - timedelta(days=1)))
+        cursor = max(cursor, cov_end + timedelta(days=1))
+        if cursor > end:
+            break
+    if cursor <= end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+class CoverageIndex:
+    """
+    单个证券/频率的覆盖索引
+    以JSON文件与数据一起持久化，重启后仍然有效，并由同一主机上的所有进程共享；
+    并发写入时由调用方（BarStore）持有目录锁
+    """
+
+    def __init__(self, directory: str):
+        """
+        初始化CoverageIndex
+
+        Args:
+            directory: 证券数据目录
+        """
+        self.path = os.path.join(directory, COVERAGE_FILE)
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def load(self) -> List[Interval]:
+        """
+        读取已覆盖的日期区间
+
+        Returns:
+            List[Interval]: 覆盖区间列表，索引文件不存在或损坏时返回空列表
+        """
+        if not os.path.exists(self.path):
+            return []
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                raw = json.load(f)
+        except (OSError, ValueError):
+            return []
+        return [(pd.Timestamp(start), pd.Timestamp(end)) for start, end in raw.get('intervals', [])]
+
+    def save(self, intervals: List[Interval]) -> None:
+        """原子地写入覆盖区间"""
+        payload = {
+            'intervals': [
+                [start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d')]
+                for start, end in merge_intervals(intervals)
+            ]
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, self.path)
+
+    def add(self, start: pd.Timestamp, end: pd.Timestamp) -> None:
+        """
+        记录[start, end]已被本地覆盖
+
+        Args:
+            start: 开始日期
+            end: 结束日期
+        """
+        if start > end:
+            return
+        self.save(self.load() + [(start.normalize(), end.normalize())])
+
+    def missing(self, start: pd.Timestamp, end: pd.Timestamp) -> List[Interval]:
+        """
+        计算[start, end]中尚未覆盖的缺口
+
+        Args:
+            start: 开始日期
+            end: 结束日期
+
+        Returns:
+            List[Interval]: 缺口区间列表
+        """
+        if start > end:
+            return []
+        return subtract_intervals(start.normalize(), end.normalize(), merge_intervals(self.load()))
+
+
+__all__ = ['CoverageIndex', 'merge_intervals', 'subtract_intervals', 'COVERAGE_FILE']
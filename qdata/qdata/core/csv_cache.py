@@ -0,0 +1,132 @@
+"""
+CSV转换缓存模块
+第一次读取CSV文件时把规范化后的数据另存为带类型的Parquet或Feather文件，
+之后直接读取二进制文件，源文件的大小或修改时间变化后自动重新转换
+"""
+import importlib.util
+import json
+import logging
+import os
+import tempfile
+from typing import Callable, Dict
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# 支持的二进制格式及文件后缀
+CACHE_FORMATS = {'parquet': 'parquet', 'feather': 'feather'}
+# 默认缓存目录名，位于CSV数据目录下
+DEFAULT_CACHE_DIRNAME = '.qdata_cache'
+
+
+class CsvBinaryCache:
+    """
+    CSV文件的二进制转换缓存
+    每个CSV文件对应一个二进制文件和一个记录源文件大小、修改时间的.meta.json文件
+    """
+
+    def __init__(self, cache_dir: str, file_format: str = 'parquet'):
+        """
+        初始化CsvBinaryCache
+
+        Args:
+            cache_dir: 缓存目录
+            file_format: 二进制格式，'parquet'或'feather'，均依赖pyarrow
+        """
+        if file_format not in CACHE_FORMATS:
+            raise ValueError(f"不支持的缓存格式: {file_format}")
+        if importlib.util.find_spec('pyarrow') is None:
+            raise ImportError(f"CSV转换缓存使用{file_format}格式需要安装pyarrow: pip install pyarrow")
+        self.cache_dir = cache_dir
+        self.file_format = file_format
+
+    def _paths(self, csv_path: str):
+        name = os.path.basename(csv_path)
+        data_path = os.path.join(self.cache_dir, f'{name}.{CACHE_FORMATS[self.file_format]}')
+        return data_path, data_path + '.meta.json'
+
+    @staticmethod
+    def _source_meta(csv_path: str) -> Dict[str, int]:
+        stat = os.stat(csv_path)
+        return {'size': stat.st_size, 'mtime': stat.st_mtime_ns}
+
+    def _is_fresh(self, csv_path: str) -> bool:
+        data_path, meta_path = self._paths(csv_path)
+        if not os.path.exists(data_path) or not os.path.exists(meta_path):
+            return False
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return False
+        return meta == self._source_meta(csv_path)
+
+    def _read(self, data_path: str) -> pd.DataFrame:
+        if self.file_format == 'parquet':
+            return pd.read_parquet(data_path)
+        # feather只能保存默认索引，写入时把日期索引转成了列
+        df = pd.read_feather(data_path)
+        return df.set_index(df.columns[0])
+
+    def _write(self, df: pd.DataFrame, data_path: str) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        os.close(fd)
+        try:
+            if self.file_format == 'parquet':
+                df.to_parquet(tmp_path)
+            else:
+                df.reset_index().to_feather(tmp_path)
+            os.replace(tmp_path, data_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def load(self, csv_path: str, convert: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        """
+        读取CSV文件对应的二进制缓存，缓存不存在或已过期时调用convert重新转换
+
+        Args:
+            csv_path: CSV文件路径
+            convert: 读取并规范化整个CSV文件的无参函数
+
+        Returns:
+            pd.DataFrame: 规范化后的完整数据
+        """
+        data_path, meta_path = self._paths(csv_path)
+        if self._is_fresh(csv_path):
+            try:
+                return self._read(data_path)
+            except Exception as e:
+                logger.warning(f"读取CSV转换缓存{data_path}失败，重新转换: {e}")
+
+        # 先记录源文件状态再转换，转换期间源文件被修改时下次读取会重新转换
+        meta = self._source_meta(csv_path)
+        df = convert()
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self._write(df, data_path)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+            os.replace(tmp_path, meta_path)
+        except Exception as e:
+            logger.warning(f"写入CSV转换缓存{data_path}失败: {e}")
+        return df
+
+
+def default_cache_dir(data_dir: str) -> str:
+    """
+    CSV数据目录对应的默认缓存目录
+
+    Args:
+        data_dir: CSV数据目录
+
+    Returns:
+        str: 缓存目录路径
+    """
+    return os.path.join(data_dir, DEFAULT_CACHE_DIRNAME)
+
+
+__all__ = ['CsvBinaryCache', 'CACHE_FORMATS', 'default_cache_dir']
@@ -0,0 +1,187 @@
+"""
+CSV边车索引模块
+为按日期排序的K线CSV文件记录每个月数据行的字节偏移，
+按日期区间读取时直接定位到相关的字节范围，只解析这部分行
+"""
+import io
+import json
+import logging
+import os
+import re
+import tempfile
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# 边车索引文件的后缀，与CSV文件放在同一目录
+INDEX_SUFFIX = '.idx.json'
+INDEX_VERSION = 2
+
+# 日期字段的年月部分，兼容'2024-01-05'、'2024/1/5'和'20240105'
+_MONTH_PATTERN = re.compile(r'(\d{4})[-/]?(\d{1,2})')
+
+
+def _month_key(field: bytes) -> Optional[str]:
+    match = _MONTH_PATTERN.match(field.strip().strip(b'"').decode('ascii', errors='ignore'))
+    if match is None or not 1 <= int(match.group(2)) <= 12:
+        return None
+    return f'{match.group(1)}-{int(match.group(2)):02d}'
+
+
+class CsvIndex:
+    """
+    单个CSV文件的按月字节偏移索引
+    以JSON边车文件持久化，并记录源文件的大小和修改时间，源文件变化后索引自动失效
+    """
+
+    def __init__(self, csv_path: str, date_columns: Sequence[str] = ('date', 'datetime')):
+        """
+        初始化CsvIndex
+
+        Args:
+            csv_path: CSV文件路径
+            date_columns: 可能作为日期列的列名（不区分大小写），取表头中第一个匹配的列
+        """
+        self.csv_path = csv_path
+        self.path = csv_path + INDEX_SUFFIX
+        self.date_columns = [col.lower() for col in date_columns]
+        self._data: Optional[Dict] = None
+
+    def _source_stat(self) -> Tuple[int, int]:
+        stat = os.stat(self.csv_path)
+        return stat.st_size, stat.st_mtime_ns
+
+    def _is_fresh(self, data: Optional[Dict]) -> bool:
+        if not data or data.get('version') != INDEX_VERSION:
+            return False
+        size, mtime = self._source_stat()
+        return data.get('size') == size and data.get('mtime') == mtime
+
+    def build(self) -> Dict:
+        """
+        扫描CSV文件建立索引并写入边车文件
+
+        Returns:
+            Dict: 索引内容；文件没有可识别的日期列、有无法识别的日期（如MM/DD/YYYY格式）
+                或未按日期排序时months为None，读取时退化为解析整个文件
+        """
+        size, mtime = self._source_stat()
+        months: Optional[List[List]] = []
+        with open(self.csv_path, 'rb') as f:
+            header = f.readline()
+            names = [name.strip().strip('"').lower()
+                     for name in header.decode('utf-8-sig', errors='ignore').split(',')]
+            date_pos = next((names.index(col) for col in self.date_columns if col in names), None)
+            if date_pos is None:
+                months = None
+            else:
+                offset = len(header)
+                for line in f:
+                    if not line.strip():
+                        offset += len(line)
+                        continue
+                    fields = line.split(b',')
+                    key = _month_key(fields[date_pos]) if len(fields) > date_pos else None
+                    if key is None or (months and months[-1][0] > key):
+                        # 日期无法识别或文件未按日期排序，不能按字节区间读取
+                        months = None
+                        break
+                    if months and months[-1][0] == key:
+                        months[-1][2] = offset + len(line)
+                    else:
+                        months.append([key, offset, offset + len(line)])
+                    offset += len(line)
+                if not months:
+                    months = None
+
+        data = {
+            'version': INDEX_VERSION,
+            'size': size,
+            'mtime': mtime,
+            'header_size': len(header),
+            'months': months,
+        }
+        self._save(data)
+        self._data = data
+        return data
+
+    def _save(self, data: Dict) -> None:
+        """原子地写入边车文件，目录不可写时只保留在内存中"""
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path) or '.', suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.debug(f"无法写入CSV索引{self.path}: {e}")
+
+    def load(self) -> Dict:
+        """
+        读取索引，边车文件不存在或已过期时重新建立
+
+        Returns:
+            Dict: 与源文件一致的索引内容
+        """
+        if self._is_fresh(self._data):
+            return self._data
+        data = None
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                data = None
+        if self._is_fresh(data):
+            self._data = data
+            return data
+        return self.build()
+
+    def byte_range(self, start: Optional[str], end: Optional[str]) -> Optional[Tuple[int, int]]:
+        """
+        计算[start, end]所在月份的数据行字节范围
+
+        Args:
+            start: 开始日期或时间，None表示不限制
+            end: 结束日期或时间，None表示不限制
+
+        Returns:
+            Optional[Tuple[int, int]]: (起始偏移, 结束偏移)，索引不可用时返回None
+        """
+        months = self.load().get('months')
+        if months is None:
+            return None
+        start_key = pd.Timestamp(start).strftime('%Y-%m') if start is not None else None
+        end_key = pd.Timestamp(end).strftime('%Y-%m') if end is not None else None
+        selected = [(lo, hi) for key, lo, hi in months
+                    if (start_key is None or key >= start_key) and (end_key is None or key <= end_key)]
+        if not selected:
+            return (0, 0)
+        return selected[0][0], selected[-1][1]
+
+    def read_range(self, start: Optional[str], end: Optional[str], **read_csv_kwargs) -> Optional[pd.DataFrame]:
+        """
+        只解析[start, end]所在月份的数据行
+
+        Args:
+            start: 开始日期或时间
+            end: 结束日期或时间
+            **read_csv_kwargs: 传给pd.read_csv的额外参数
+
+        Returns:
+            Optional[pd.DataFrame]: 解析出的原始数据（仍需按精确日期筛选），索引不可用时返回None
+        """
+        span = self.byte_range(start, end)
+        if span is None:
+            return None
+        lo, hi = span
+        header_size = self._data['header_size']
+        with open(self.csv_path, 'rb') as f:
+            header = f.read(header_size)
+            f.seek(lo)
+            body = f.read(max(hi - lo, 0))
+        return pd.read_csv(io.BytesIO(header + body), **read_csv_kwargs)
+
+
+__all__ = ['CsvIndex', 'INDEX_SUFFIX']
@@ -0,0 +1,69 @@
+"""
+异步执行器模块
+管理qdata异步接口共用的线程池，把阻塞的数据源调用放到线程池中执行，
+事件循环线程本身不会被akshare/tushare等同步接口阻塞
+"""
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+# 默认线程数，上游的实际并发仍由各后端的请求调度器限制
+DEFAULT_MAX_WORKERS = 16
+
+_executor: Optional[Executor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> Executor:
+    """
+    获取异步接口共用的线程池，首次调用时创建
+
+    Returns:
+        Executor: 线程池
+    """
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=DEFAULT_MAX_WORKERS, thread_name_prefix='qdata-async')
+        return _executor
+
+
+def set_executor(executor: Optional[Executor]) -> None:
+    """
+    替换异步接口共用的线程池，传入None时在下次使用时重新创建默认线程池
+
+    Args:
+        executor: 线程池或进程池
+    """
+    global _executor
+
+    with _executor_lock:
+        _executor = executor
+
+
+async def run_blocking(fn: Callable[..., Any], *args, executor: Optional[Executor] = None, **kwargs) -> Any:
+    """
+    在线程池中执行阻塞调用并等待结果
+
+    调用在当前上下文的副本中执行，request_priority等上下文变量对线程池中的调用同样生效
+
+    Args:
+        fn: 阻塞函数
+        *args: 传给fn的位置参数
+        executor: 线程池，默认使用get_executor()
+        **kwargs: 传给fn的关键字参数
+
+    Returns:
+        Any: fn的返回值
+    """
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    call = functools.partial(ctx.run, fn, *args, **kwargs)
+    return await loop.run_in_executor(executor or get_executor(), call)
+
+
+__all__ = ['get_executor', 'set_executor', 'run_blocking', 'DEFAULT_MAX_WORKERS']
@@ -0,0 +1,326 @@
+"""
+证券主数据模块
+股票和ETF列表保存在本地并每天刷新一次，同一天内获取列表不再访问网络；
+内存中按代码、名称和拼音首字母建立前缀索引和三元组索引，证券搜索不需要遍历全部证券
+"""
+import importlib.util
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# 证券主数据的本地缓存目录
+DEFAULT_INSTRUMENT_DIR = os.path.join(os.path.expanduser('~'), '.qdata', 'instruments')
+# 刷新失败后至少间隔该秒数再重试，期间继续使用旧数据
+RETRY_INTERVAL = 10 * 60
+# 前缀索引覆盖的最大前缀长度，更长的查询走三元组索引
+PREFIX_LENGTH = 6
+
+STOCK = 'stock'
+ETF = 'etf'
+
+
+def _pinyin_initials(names: List[str]) -> List[str]:
+    """名称的拼音首字母，未安装pypinyin时返回空字符串"""
+    if importlib.util.find_spec('pypinyin') is None:
+        return [''] * len(names)
+    from pypinyin import Style, lazy_pinyin
+    return [''.join(lazy_pinyin(name, style=Style.FIRST_LETTER)).lower() for name in names]
+
+
+def _grams(text: str, n: int) -> Iterable[str]:
+    return (text[i:i + n] for i in range(len(text) - n + 1))
+
+
+class InstrumentIndex:
+    """
+    证券搜索索引
+    前缀索引把代码、名称、拼音首字母的前1~PREFIX_LENGTH个字符映射到证券编号；
+    三元组索引用于任意位置的子串匹配，中文名称另外建立二元组索引以支持两个字的查询
+    """
+
+    def __init__(self, records: List[Dict[str, str]]):
+        """
+        初始化InstrumentIndex
+
+        Args:
+            records: 按代码排序的证券，每项包含code、name、type、pinyin
+        """
+        self.records = records
+        self._keys = [(r['code'].lower(), r['name'].lower(), r['pinyin']) for r in records]
+        prefixes: Dict[str, List[int]] = defaultdict(list)
+        grams: Dict[str, set] = defaultdict(set)
+        for i, keys in enumerate(self._keys):
+            for key in keys:
+                for n in range(1, min(len(key), PREFIX_LENGTH) + 1):
+                    prefixes[key[:n]].append(i)
+                for gram in _grams(key, 3):
+                    grams[gram].add(i)
+            for gram in _grams(keys[1], 2):
+                grams[gram].add(i)
+        # 同一证券可能由多个字段命中同一前缀，去重并保持编号顺序
+        self._prefixes = {key: sorted(set(ids)) for key, ids in prefixes.items()}
+        self._grams = {key: frozenset(ids) for key, ids in grams.items()}
+
+    def _substring_matches(self, query: str) -> List[int]:
+        n = 3 if len(query) >= 3 else 2
+        sets = [self._grams.get(gram) for gram in set(_grams(query, n))]
+        if not sets or any(s is None for s in sets):
+            return []
+        sets.sort(key=len)
+        candidates = sets[0].intersection(*sets[1:])
+        # 三元组全部命中不代表子串一定连续，逐个确认
+        return sorted(i for i in candidates if any(query in key for key in self._keys[i]))
+
+    def search(self, query: str, limit: int = 10, kind: Optional[str] = None) -> List[Dict[str, str]]:
+        """
+        搜索证券，前缀匹配的结果排在子串匹配之前
+
+        Args:
+            query: 代码、名称或拼音首字母的片段
+            limit: 最多返回的条数
+            kind: 只返回该类型的证券，'stock'或'etf'
+
+        Returns:
+            List[Dict[str, str]]: 匹配的证券，包含code、name、type
+        """
+        query = query.strip().lower()
+        if not query or limit <= 0:
+            return []
+
+        if len(query) <= PREFIX_LENGTH:
+            prefix_ids = self._prefixes.get(query, [])
+        else:
+            prefix_ids = [i for i in self._substring_matches(query)
+                          if any(key.startswith(query) for key in self._keys[i])]
+
+        results = []
+        seen = set()
+
+        def _collect(ids: Iterable[int]) -> bool:
+            for i in ids:
+                record = self.records[i]
+                if i in seen or (kind is not None and record['type'] != kind):
+                    continue
+                seen.add(i)
+                results.append({'code': record['code'], 'name': record['name'], 'type': record['type']})
+                if len(results) >= limit:
+                    return True
+            return False
+
+        if not _collect(prefix_ids) and len(query) >= 2:
+            _collect(self._substring_matches(query))
+        return results
+
+
+class InstrumentMaster:
+    """
+    证券主数据
+    各类证券列表由loaders下载，本地文件记录下载日期，跨过零点后的第一次访问重新下载；
+    同一代码出现在多个列表中时，按loaders的顺序确定证券类型
+    """
+
+    def __init__(self, path: str, loaders: Dict[str, Callable[[], pd.DataFrame]]):
+        """
+        初始化InstrumentMaster
+
+        Args:
+            path: 本地文件路径
+            loaders: 证券类型到下载函数的映射，下载函数返回包含code、name列的DataFrame
+        """
+        self.path = path
+        self.loaders = loaders
+        self._lists: Optional[Dict[str, List[List[str]]]] = None
+        self._by_code: Dict[str, Dict[str, str]] = {}
+        self._index: Optional[InstrumentIndex] = None
+        # 本地数据过期的时间戳，未到期时访问只需要一次浮点比较
+        self._expires_at = 0.0
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _next_midnight(day: str) -> float:
+        return (datetime.strptime(day, '%Y-%m-%d') + timedelta(days=1)).timestamp()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                raw = json.load(f)
+            self._set(raw['instruments'], raw.get('pinyin', {}))
+            self._expires_at = self._next_midnight(raw['updated'])
+        except (OSError, ValueError, KeyError) as e:
+            logger.debug(f"无法读取证券主数据{self.path}: {e}")
+
+    def _save(self, pinyin: Dict[str, str]) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            payload = {
+                'updated': datetime.now().strftime('%Y-%m-%d'),
+                'instruments': self._lists,
+                'pinyin': pinyin,
+            }
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(payload, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.debug(f"无法写入证券主数据{self.path}: {e}")
+
+    def _set(self, lists: Dict[str, List[List[str]]], pinyin: Dict[str, str]) -> Dict[str, str]:
+        by_code: Dict[str, Dict[str, str]] = {}
+        records = []
+        for kind in self.loaders:
+            for code, name in lists.get(kind, []):
+                record = {'code': code, 'name': name, 'type': kind}
+                by_code.setdefault(code, record)
+                records.append(record)
+        records.sort(key=lambda r: r['code'])
+
+        # 拼音首字母只在下载后计算一次，随列表一起保存
+        missing = sorted({r['name'] for r in records} - pinyin.keys())
+        if missing:
+            pinyin = {**pinyin, **dict(zip(missing, _pinyin_initials(missing)))}
+        for record in records:
+            record['pinyin'] = pinyin.get(record['name'], '')
+
+        self._lists = lists
+        self._by_code = by_code
+        self._index = InstrumentIndex(records)
+        return pinyin
+
+    def refresh(self) -> None:
+        """
+        重新下载全部证券列表并写入本地文件
+
+        Raises:
+            Exception: 任意一个列表下载失败时抛出，原有数据保持不变
+        """
+        lists = {}
+        for kind, loader in self.loaders.items():
+            df = loader()
+            lists[kind] = [[str(code), str(name)] for code, name in zip(df['code'], df['name'])]
+        pinyin = self._set(lists, {})
+        self._save(pinyin)
+        self._expires_at = self._next_midnight(datetime.now().strftime('%Y-%m-%d'))
+
+    def _ensure(self, raise_on_error: bool = True) -> None:
+        now = time.time()
+        if now < self._expires_at:
+            return
+        with self._lock:
+            if self._lists is None:
+                self._load()
+            now = time.time()
+            if now >= self._expires_at and now >= self._retry_at:
+                try:
+                    self.refresh()
+                except Exception as e:
+                    self._retry_at = now + RETRY_INTERVAL
+                    if self._lists is None and raise_on_error:
+                        raise
+                    logger.warning(f"刷新证券主数据失败，继续使用本地数据: {e}")
+        if self._lists is None and raise_on_error:
+            raise RuntimeError(f"证券主数据不可用: {self.path}")
+
+    def list(self, kind: str) -> pd.DataFrame:
+        """
+        某一类证券的列表
+
+        Args:
+            kind: 证券类型，如'stock'、'etf'
+
+        Returns:
+            pd.DataFrame: 包含code、name列的证券列表
+        """
+        self._ensure()
+        return pd.DataFrame(self._lists.get(kind, []), columns=['code', 'name'])
+
+    def kind(self, symbol: str) -> Optional[str]:
+        """
+        查询证券类型，主数据不可用时返回None而不抛出异常
+
+        Args:
+            symbol: 证券代码
+
+        Returns:
+            Optional[str]: 证券类型，查不到时返回None
+        """
+        self._ensure(raise_on_error=False)
+        record = self._by_code.get(symbol)
+        return record['type'] if record else None
+
+    def get(self, symbol: str) -> Optional[Dict[str, str]]:
+        """
+        按代码精确查找证券
+
+        Args:
+            symbol: 证券代码
+
+        Returns:
+            Optional[Dict[str, str]]: 包含code、name、type的证券信息，查不到时返回None
+        """
+        self._ensure(raise_on_error=False)
+        record = self._by_code.get(symbol)
+        return {'code': record['code'], 'name': record['name'], 'type': record['type']} if record else None
+
+    def search(self, query: str, limit: int = 10, kind: Optional[str] = None) -> List[Dict[str, str]]:
+        """
+        按代码、名称或拼音首字母搜索证券
+
+        Args:
+            query: 查询字符串
+            limit: 最多返回的条数
+            kind: 只返回该类型的证券
+
+        Returns:
+            List[Dict[str, str]]: 匹配的证券，包含code、name、type
+        """
+        self._ensure()
+        return self._index.search(query, limit, kind)
+
+
+_masters: Dict[str, InstrumentMaster] = {}
+_masters_lock = threading.Lock()
+
+
+def get_instrument_master(name: str, loaders: Dict[str, Callable[[], pd.DataFrame]],
+                          cache_dir: Optional[str] = None) -> InstrumentMaster:
+    """
+    获取数据源的证券主数据，同一数据源在进程内共享一份
+
+    Args:
+        name: 数据源名称，用作本地文件名
+        loaders: 首次创建时使用的下载函数；主数据已存在时忽略，刷新仍使用第一次传入的下载函数
+        cache_dir: 本地缓存目录，默认为~/.qdata/instruments
+
+    Returns:
+        InstrumentMaster: 证券主数据
+    """
+    path = os.path.join(cache_dir or DEFAULT_INSTRUMENT_DIR, f'{name}.json')
+    with _masters_lock:
+        master = _masters.get(path)
+        if master is None:
+            master = InstrumentMaster(path, loaders)
+            _masters[path] = master
+        return master
+
+
+__all__ = [
+    'InstrumentMaster',
+    'InstrumentIndex',
+    'get_instrument_master',
+    'DEFAULT_INSTRUMENT_DIR',
+    'STOCK',
+    'ETF',
+]
@@ -0,0 +1,184 @@
+"""
+内存缓存模块
+进程内共享的LRU缓存，按近似字节数淘汰，
+已收盘的历史数据和仍在变化的当天数据使用不同的过期时间
+"""
+import sys
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, Optional
+
+import pandas as pd
+
+# 默认缓存上限256MB
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# 历史数据默认缓存12小时，包含当天K线的数据默认缓存60秒
+DEFAULT_HISTORICAL_TTL = 12 * 60 * 60
+DEFAULT_LIVE_TTL = 60
+
+
+def estimate_size(value: Any) -> int:
+    """
+    估算缓存值占用的字节数
+
+    Args:
+        value: 缓存值
+
+    Returns:
+        int: 近似字节数
+    """
+    # 只在有object列时才做deep统计，数值列直接按缓冲区大小计算
+    if isinstance(value, pd.DataFrame):
+        deep = bool((value.dtypes == object).any())
+        return int(value.memory_usage(index=True, deep=deep).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=value.dtype == object))
+    return sys.getsizeof(value)
+
+
+def is_live_range(end: Optional[str]) -> bool:
+    """
+    判断请求的结束时间是否包含当天（当天的K线在收盘前仍会变化）
+
+    Args:
+        end: 结束日期或时间，None表示不限制
+
+    Returns:
+        bool: 是否包含当天
+    """
+    if end is None:
+        return True
+    return pd.Timestamp(end).normalize() >= pd.Timestamp(datetime.now().date())
+
+
+class _Entry:
+    __slots__ = ('value', 'nbytes', 'expires_at')
+
+    def __init__(self, value: Any, nbytes: int, expires_at: float):
+        self.value = value
+        self.nbytes = nbytes
+        self.expires_at = expires_at
+
+
+class MemoryCache:
+    """
+    按字节数限制大小的LRU/TTL内存缓存
+    线程安全，可在同一进程的多个调用方之间共享
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        historical_ttl: float = DEFAULT_HISTORICAL_TTL,
+        live_ttl: float = DEFAULT_LIVE_TTL,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        初始化MemoryCache
+
+        Args:
+            max_bytes: 缓存占用的最大字节数
+            historical_ttl: 已收盘历史数据的过期时间（秒）
+            live_ttl: 包含当天K线的数据的过期时间（秒）
+            clock: 时钟函数
+        """
+        self.max_bytes = max_bytes
+        self.historical_ttl = historical_ttl
+        self.live_ttl = live_ttl
+        self._clock = clock
+        self._entries: 'OrderedDict[Hashable, _Entry]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._total_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        读取缓存
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            Optional[Any]: 缓存值，不存在或已过期时返回None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            if entry.expires_at <= self._clock():
+                self._remove(key)
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry.value
+
+    def put(self, key: Hashable, value: Any, live: bool = False, ttl: Optional[float] = None) -> None:
+        """
+        写入缓存，超出字节上限时按最近最少使用淘汰
+
+        Args:
+            key: 缓存键
+            value: 缓存值
+            live: 是否包含仍在变化的当天数据，决定使用哪个过期时间
+            ttl: 自定义过期时间（秒），优先于live
+        """
+        if ttl is None:
+            ttl = self.live_ttl if live else self.historical_ttl
+        nbytes = estimate_size(value)
+        if nbytes > self.max_bytes or ttl <= 0:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(value, nbytes, self._clock() + ttl)
+            self._total_bytes += nbytes
+            while self._total_bytes > self.max_bytes and self._entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._evictions += 1
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self._total_bytes -= entry.nbytes
+
+    def invalidate(self, key: Hashable) -> None:
+        """删除单个缓存项"""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        缓存统计信息
+
+        Returns:
+            Dict[str, int]: 条目数、占用字节数、命中/未命中/淘汰次数
+        """
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+__all__ = ['MemoryCache', 'estimate_size', 'is_live_range']
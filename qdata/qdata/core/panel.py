@@ -0,0 +1,137 @@
+"""
+面板数据模块
+把多个证券的K线对齐到同一个交易日历上，输出(date, symbol)多级索引的长表
+或者 时间 × 证券 × 字段 的三维NumPy数组
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from qdata.core.schema import DTYPE_PROFILES, apply_dtype_profile
+
+# 默认输出的字段
+DEFAULT_FIELDS = ['open', 'high', 'low', 'close', 'volume']
+
+
+@dataclass
+class PanelArray:
+    """
+    三维面板数组
+    values的形状为(len(dates), len(symbols), len(fields))，缺失的K线为NaN
+    """
+    values: np.ndarray
+    dates: pd.DatetimeIndex
+    symbols: List[str]
+    fields: List[str]
+
+    def field(self, name: str) -> pd.DataFrame:
+        """
+        取出单个字段的 时间 × 证券 二维表
+
+        Args:
+            name: 字段名，如'close'
+
+        Returns:
+            pd.DataFrame: 以日期为索引、证券代码为列的DataFrame
+        """
+        return pd.DataFrame(self.values[:, :, self.fields.index(name)],
+                            index=self.dates, columns=self.symbols)
+
+
+def to_panel(
+    frames: Dict[str, pd.DataFrame],
+    fields: Optional[List[str]] = None,
+    how: str = 'outer',
+    dtype_profile: Optional[str] = None
+) -> pd.DataFrame:
+    """
+    把多个证券的DataFrame合并为(date, symbol)多级索引的长表
+
+    Args:
+        frames: 以证券代码为键的DataFrame字典，索引为日期
+        fields: 需要保留的字段，默认为开高低收量
+        how: 日历对齐方式，'outer'保留任一证券有数据的日期，每个日期包含全部证券，缺失的K线为NaN行；
+             'inner'只保留所有证券都有数据的日期
+        dtype_profile: 数据类型方案，'compact'时字段按方案转换、symbol层使用category
+
+    Returns:
+        pd.DataFrame: 以(date, symbol)为索引、按日期排序的长表
+    """
+    if how not in ('outer', 'inner'):
+        raise ValueError(f"不支持的对齐方式: {how}")
+    fields = fields or DEFAULT_FIELDS
+    frames = {symbol: df for symbol, df in frames.items() if df is not None and not df.empty}
+    if not frames:
+        index = pd.MultiIndex.from_arrays([pd.DatetimeIndex([]), []], names=['date', 'symbol'])
+        return _apply_panel_profile(pd.DataFrame(columns=fields, index=index), dtype_profile)
+
+    if how == 'inner':
+        common = None
+        for df in frames.values():
+            common = df.index if common is None else common.intersection(df.index)
+        frames = {symbol: df.loc[df.index.isin(common)] for symbol, df in frames.items()}
+
+    # 一次concat生成长表，避免逐个证券循环拼接
+    panel = pd.concat(
+        [df.reindex(columns=fields) for df in frames.values()],
+        keys=list(frames.keys()),
+        names=['symbol', 'date']
+    )
+    panel = panel.swaplevel(0, 1)
+    if how == 'outer':
+        # 按 日期 × 证券 的完整笛卡尔积对齐，某个证券停牌或缺失的日期补NaN行
+        dates = panel.index.get_level_values('date').unique().sort_values()
+        symbols = sorted(frames.keys())
+        panel = panel.reindex(pd.MultiIndex.from_product([dates, symbols], names=['date', 'symbol']))
+        return _apply_panel_profile(panel, dtype_profile)
+    return _apply_panel_profile(panel.sort_index(level=['date', 'symbol']), dtype_profile)
+
+
+def _apply_panel_profile(panel: pd.DataFrame, profile: Optional[str]) -> pd.DataFrame:
+    """按数据类型方案转换长表的字段，方案要求时把symbol层转换为category"""
+    if profile is None or profile == 'default':
+        return panel
+    panel = apply_dtype_profile(panel, profile)
+    if DTYPE_PROFILES[profile].get('symbol') == 'category':
+        symbols = panel.index.levels[1]
+        if not isinstance(symbols, pd.CategoricalIndex):
+            panel.index = panel.index.set_levels(pd.CategoricalIndex(symbols), level='symbol')
+    return panel
+
+
+def to_array(
+    frames: Dict[str, pd.DataFrame],
+    fields: Optional[List[str]] = None,
+    how: str = 'outer',
+    dtype=np.float64
+) -> PanelArray:
+    """
+    把多个证券的DataFrame对齐为 时间 × 证券 × 字段 的三维数组
+
+    Args:
+        frames: 以证券代码为键的DataFrame字典，索引为日期
+        fields: 需要保留的字段，默认为开高低收量
+        how: 日历对齐方式，'outer'或'inner'
+        dtype: 数组的数据类型
+
+    Returns:
+        PanelArray: 三维面板数组
+    """
+    fields = fields or DEFAULT_FIELDS
+    symbols = [symbol for symbol, df in frames.items() if df is not None and not df.empty]
+    panel = to_panel(frames, fields=fields, how=how)
+    dates = panel.index.get_level_values('date').unique().sort_values()
+
+    values = np.full((len(dates), len(symbols), len(fields)), np.nan, dtype=dtype)
+    if len(panel):
+        # 根据日期和证券的位置直接散列写入，证券顺序与frames一致
+        date_pos = dates.get_indexer(panel.index.get_level_values('date'))
+        symbol_pos = pd.Index(symbols).get_indexer(panel.index.get_level_values('symbol'))
+        values[date_pos, symbol_pos, :] = panel.to_numpy(dtype=dtype)
+
+    return PanelArray(values=values, dates=pd.DatetimeIndex(dates), symbols=symbols, fields=list(fields))
+
+
+__all__ = ['PanelArray', 'to_panel', 'to_array', 'DEFAULT_FIELDS']
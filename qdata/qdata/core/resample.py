@@ -0,0 +1,102 @@
+"""
+K线重采样模块
+由细粒度的分钟K线一次向量化聚合出5/15/30/60分钟、日线、周线和月线，
+分钟级别的K线按交易时段切分，不跨越午间休市，并以结束时间标注
+"""
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# A股交易时段（开始, 结束），K线以结束时间标注，如09:31~11:30、13:01~15:00
+A_SHARE_SESSIONS: List[Tuple[str, str]] = [('09:30', '11:30'), ('13:00', '15:00')]
+# 美股常规交易时段
+US_SESSIONS: List[Tuple[str, str]] = [('09:30', '16:00')]
+
+# 各字段的聚合方式
+AGGREGATIONS = {
+    'open': 'first',
+    'high': 'max',
+    'low': 'min',
+    'close': 'last',
+    'volume': 'sum',
+    'amount': 'sum',
+}
+
+
+def _to_minutes(clock: str) -> int:
+    hour, minute = clock.split(':')
+    return int(hour) * 60 + int(minute)
+
+
+def _aggregate(df: pd.DataFrame, keys) -> pd.DataFrame:
+    aggregations = {col: how for col, how in AGGREGATIONS.items() if col in df.columns}
+    return df.groupby(keys, sort=True).agg(aggregations)
+
+
+def _session_labels(index: pd.DatetimeIndex, minutes: int, sessions: Sequence[Tuple[str, str]]) -> pd.DatetimeIndex:
+    """
+    计算每根K线所属的N分钟K线的结束时间
+
+    先把时间换算为当天已经过的交易分钟数（午休不计），按N分钟向上取整分组，
+    再把分组的结束分钟数换算回时钟时间；开盘集合竞价的K线并入第一根
+    """
+    opens = np.array([_to_minutes(start) for start, _ in sessions], dtype=np.int64)
+    lengths = np.array([_to_minutes(end) for _, end in sessions], dtype=np.int64) - opens
+    ends = np.cumsum(lengths)
+    total = int(ends[-1])
+
+    clock = index.hour.to_numpy() * 60 + index.minute.to_numpy() + index.second.to_numpy() / 60.0
+    elapsed = np.zeros(len(index))
+    for session_open, length in zip(opens, lengths):
+        elapsed += np.clip(clock - session_open, 0, length)
+
+    bucket = np.maximum(np.ceil(elapsed / minutes), 1)
+    label = np.minimum(bucket * minutes, total).astype(np.int64)
+
+    # 结束分钟数落在哪个交易时段，换算回当天的时钟分钟数
+    session = np.searchsorted(ends, label, side='left')
+    label_clock = opens[session] + label - (ends[session] - lengths[session])
+    return index.normalize() + pd.to_timedelta(label_clock, unit='m')
+
+
+def resample_bars(
+    df: pd.DataFrame,
+    to_freq: str,
+    sessions: Optional[Sequence[Tuple[str, str]]] = None
+) -> pd.DataFrame:
+    """
+    把分钟K线聚合为更粗的周期
+
+    Args:
+        df: 以时间为索引、按时间排序的分钟K线
+        to_freq: 目标周期，分钟数字符串如'5'、'15'、'30'、'60'，或'D'（日线）、'W'（周线）、'M'（月线）
+        sessions: 交易时段列表，默认为A股交易时段
+
+    Returns:
+        pd.DataFrame: 聚合后的K线，分钟K线以结束时间标注，日线、周线、月线以最后一个交易日标注
+    """
+    if df is None or df.empty:
+        return df
+    if not isinstance(df.index, pd.DatetimeIndex):
+        raise ValueError("数据索引必须是时间类型才能进行重采样")
+    sessions = sessions or A_SHARE_SESSIONS
+
+    if to_freq == 'D':
+        result = _aggregate(df, df.index.normalize())
+    elif to_freq in ('W', 'M'):
+        # 以周五结束的自然周或自然月分组，标注为该周期最后一个有数据的交易日
+        days = df.index.normalize()
+        periods = days.to_period('W-FRI' if to_freq == 'W' else 'M')
+        result = _aggregate(df, periods)
+        result.index = pd.Series(days, index=periods).groupby(level=0).max().reindex(result.index).to_numpy()
+    elif str(to_freq).isdigit():
+        result = _aggregate(df, _session_labels(df.index, int(to_freq), sessions))
+    else:
+        raise ValueError(f"不支持的重采样周期: {to_freq}")
+
+    result.index = pd.DatetimeIndex(result.index, name=df.index.name or 'date')
+    return result
+
+
+__all__ = ['resample_bars', 'A_SHARE_SESSIONS', 'US_SESSIONS', 'AGGREGATIONS']
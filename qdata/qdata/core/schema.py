@@ -0,0 +1,252 @@
+"""
+数据规范化模块
+用声明式的BarSchema描述各后端原始数据的列名和日期格式，
+由normalize()一次性完成重命名、日期索引、数值转换、去重和排序
+"""
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# 统一输出的K线字段
+BAR_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+
+class BarSchema:
+    """
+    后端原始K线数据的声明式描述
+    """
+
+    def __init__(
+        self,
+        column_mapping: Optional[Dict[str, str]] = None,
+        date_column: str = 'date',
+        date_format: Optional[str] = None,
+        columns: Sequence[str] = BAR_COLUMNS,
+        lowercase: bool = False,
+        fill_missing: bool = False,
+        keep_extra: bool = False
+    ):
+        """
+        初始化BarSchema
+
+        Args:
+            column_mapping: 原始列名到统一列名的映射
+            date_column: 映射后作为日期索引的列名
+            date_format: 日期格式，如'%Y%m%d'，None表示自动推断
+            columns: 需要输出的字段
+            lowercase: 映射前是否先把原始列名转为小写
+            fill_missing: 缺少的K线字段是否补齐（成交量补0，价格用收盘价补齐），否则直接省略
+            keep_extra: 是否在统一字段之后保留其余的原始列（按映射后的列名，不做类型转换），否则只输出columns
+        """
+        self.column_mapping = column_mapping or {}
+        self.date_column = date_column
+        self.date_format = date_format
+        self.columns = tuple(columns)
+        self.lowercase = lowercase
+        self.fill_missing = fill_missing
+        self.keep_extra = keep_extra
+
+
+# 通用的中英文列名映射，未声明schema的后端和DataManager使用
+DEFAULT_SCHEMA = BarSchema(
+    column_mapping={
+        'datetime': 'date',
+        '日期': 'date', '时间': 'date',
+        '开盘': 'open', '开盘价': 'open',
+        '最高': 'high', '最高价': 'high',
+        '最低': 'low', '最低价': 'low',
+        '收盘': 'close', '收盘价': 'close',
+        '成交量': 'volume', 'vol': 'volume',
+        '成交额': 'amount',
+    },
+    columns=BAR_COLUMNS + ('amount',),
+    lowercase=True
+)
+
+
+# 数据类型方案：字段 -> 目标类型，'default'保持后端原始的float64
+# 'compact'使用float32价格和uint32成交量（超出范围时退回int64），内存约为默认方案的一半
+DTYPE_PROFILES: Dict[str, Dict[str, str]] = {
+    'default': {},
+    'compact': {
+        'open': 'float32',
+        'high': 'float32',
+        'low': 'float32',
+        'close': 'float32',
+        'volume': 'uint32',
+        'symbol': 'category',
+    },
+}
+
+
+def _fit_integer(series: pd.Series, dtype: str) -> Optional[str]:
+    """
+    判断整数列能否转换为指定类型，超出范围时退回int64
+
+    Returns:
+        Optional[str]: 可用的整数类型，有缺失值或小数时返回None
+    """
+    values = series.to_numpy()
+    if len(values) == 0:
+        return dtype
+    if np.issubdtype(values.dtype, np.floating):
+        if np.isnan(values).any() or not np.array_equal(values, np.floor(values)):
+            return None
+    info = np.iinfo(dtype)
+    if values.min() >= info.min and values.max() <= info.max:
+        return dtype
+    return 'int64'
+
+
+def apply_dtype_profile(df: pd.DataFrame, profile: Optional[str] = None) -> pd.DataFrame:
+    """
+    按数据类型方案转换字段类型
+
+    Args:
+        df: 规范化后的数据
+        profile: DTYPE_PROFILES中的方案名，None或'default'表示不转换
+
+    Returns:
+        pd.DataFrame: 转换后的数据，类型已符合方案时原样返回
+    """
+    if profile is None or profile == 'default':
+        return df
+    if profile not in DTYPE_PROFILES:
+        raise ValueError(f"不支持的数据类型方案: {profile}")
+
+    changes: Dict[str, str] = {}
+    for col, dtype in DTYPE_PROFILES[profile].items():
+        if col not in df.columns:
+            continue
+        series = df[col]
+        if dtype == 'category':
+            if not isinstance(series.dtype, pd.CategoricalDtype):
+                changes[col] = dtype
+            continue
+        if np.issubdtype(np.dtype(dtype), np.integer):
+            if pd.api.types.is_integer_dtype(series.dtype) and np.iinfo(series.dtype).bits <= np.iinfo(dtype).bits:
+                continue
+            dtype = _fit_integer(series, dtype)
+            if dtype is None:
+                continue
+        if series.dtype != np.dtype(dtype):
+            changes[col] = dtype
+
+    return df.astype(changes) if changes else df
+
+
+def is_normalized(df: pd.DataFrame, columns: Sequence[str] = BAR_COLUMNS) -> bool:
+    """
+    判断数据是否已经是规范格式：
+    日期索引单调递增且无重复，列名为小写的统一字段且均为数值类型
+
+    Args:
+        df: 待检查的DataFrame
+        columns: 统一字段
+
+    Returns:
+        bool: 是否已规范化
+    """
+    if not isinstance(df.index, pd.DatetimeIndex):
+        return False
+    if not all(isinstance(col, str) and col == col.lower() for col in df.columns):
+        return False
+    for col in columns:
+        if col in df.columns and not pd.api.types.is_numeric_dtype(df[col].dtype):
+            return False
+    # is_monotonic_increasing和is_unique的结果会缓存在索引上，重复检查几乎没有开销
+    return df.index.is_monotonic_increasing and df.index.is_unique
+
+
+def normalize(df: pd.DataFrame, schema: BarSchema = DEFAULT_SCHEMA) -> pd.DataFrame:
+    """
+    按schema把原始数据一次性规范化为统一格式
+
+    已经规范化的数据原样返回，不做任何拷贝；
+    否则只构造一次结果DataFrame，并且只在索引不单调或有重复时才排序、去重
+
+    Args:
+        df: 原始数据
+        schema: 后端数据描述
+
+    Returns:
+        pd.DataFrame: 以日期为索引、包含统一字段（schema.keep_extra时还有其余原始列）的DataFrame
+    """
+    if df is None or df.empty:
+        return pd.DataFrame(columns=list(schema.columns), index=pd.DatetimeIndex([], name='date'))
+    if is_normalized(df, schema.columns):
+        return df
+
+    # 计算原始列到统一列的映射，不改动原始DataFrame
+    sources: Dict[str, str] = {}
+    for raw in df.columns:
+        name = raw.lower() if schema.lowercase and isinstance(raw, str) else raw
+        target = schema.column_mapping.get(name, name)
+        if isinstance(target, str) and target not in sources:
+            sources[target] = raw
+
+    # 日期索引
+    if isinstance(df.index, pd.DatetimeIndex):
+        index = df.index
+    elif schema.date_column in sources:
+        index = pd.DatetimeIndex(pd.to_datetime(df[sources[schema.date_column]], format=schema.date_format))
+    else:
+        index = pd.DatetimeIndex(pd.to_datetime(df.index, format=schema.date_format))
+    index = index.rename('date')
+
+    # 数值字段，已是数值类型的列直接复用底层数组
+    data: Dict[str, np.ndarray] = {}
+    for col in schema.columns:
+        if col in sources:
+            series = df[sources[col]]
+            if not pd.api.types.is_numeric_dtype(series.dtype):
+                series = pd.to_numeric(series, errors='coerce')
+            data[col] = series.to_numpy()
+        elif schema.fill_missing and col in BAR_COLUMNS:
+            if col == 'volume' or 'close' not in sources:
+                data[col] = np.zeros(len(df))
+            else:
+                data[col] = pd.to_numeric(df[sources['close']], errors='coerce').to_numpy()
+
+    columns = [col for col in schema.columns if col in data]
+
+    # 其余原始列原样保留，如symbol、turnover、open_interest
+    if schema.keep_extra:
+        for target, raw in sources.items():
+            if target != schema.date_column and target not in data:
+                data[target] = df[raw].to_numpy()
+                columns.append(target)
+
+    result = pd.DataFrame(data, index=index, columns=columns)
+
+    if not result.index.is_monotonic_increasing:
+        result = result.sort_index(kind='stable')
+    if not result.index.is_unique:
+        result = result[~result.index.duplicated(keep='last')]
+    return result
+
+
+def empty_bars(columns: Sequence[str] = BAR_COLUMNS) -> pd.DataFrame:
+    """
+    没有数据时返回的空K线表，与规范化后的数据有相同的字段和日期索引
+
+    Args:
+        columns: 字段
+
+    Returns:
+        pd.DataFrame: 空DataFrame
+    """
+    return pd.DataFrame(columns=list(columns), index=pd.DatetimeIndex([], name='date'))
+
+
+__all__ = [
+    'BarSchema',
+    'DEFAULT_SCHEMA',
+    'BAR_COLUMNS',
+    'DTYPE_PROFILES',
+    'normalize',
+    'empty_bars',
+    'is_normalized',
+    'apply_dtype_profile',
+]
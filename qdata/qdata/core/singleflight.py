@@ -0,0 +1,79 @@
+"""
+单飞（single-flight）模块
+并发的相同请求只执行一次，其余调用方等待并共享第一个请求的结果
+"""
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class _Call:
+    """一次在途的调用"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    单飞调用组
+    同一个键同时只有一个调用在执行，期间到达的相同键调用直接等待其结果；
+    调用结束后键即被移除，之后的调用会重新执行
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.stats = {'executed': 0, 'shared': 0}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        执行fn，若相同key的调用正在执行则等待并共享其结果
+
+        Args:
+            key: 请求键，必须可哈希
+            fn: 无参调用
+
+        Returns:
+            Tuple[Any, bool]: (结果, 是否为共享的结果)
+
+        Raises:
+            与fn相同的异常，等待中的调用方也会收到同一个异常
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+            else:
+                call.waiters += 1
+                self.stats['shared'] += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+            self.stats['executed'] += 1
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+        return call.result, False
+
+    def in_flight(self) -> int:
+        """当前在途的不同请求数"""
+        with self._lock:
+            return len(self._calls)
+
+
+__all__ = ['SingleFlight']
@@ -1,7 +1,13 @@
+import logging
 from abc import ABC, abstractmethod
 from typing import Dict, List, Optional, Protocol, Union
 import pandas as pd
-from abc import ABC, abstractmethod
+
+from qdata.core.adjust import apply_adjustment, normalize_adjust
+from qdata.core.executor import run_blocking
+from qdata.core.schema import BarSchema, DEFAULT_SCHEMA, normalize
+
+logger = logging.getLogger(__name__)
 
 
 class DataFrameLike(Protocol):
@@ -15,6 +21,9 @@ class DataProvider(ABC):
     所有数据源适配器都需要实现这个接口
     """
     
+    # 原始数据的列名描述，供format_data使用，None表示使用通用映射
+    schema: Optional[BarSchema] = None
+    
     @abstractmethod
     def get_daily_data(self, symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
         """
@@ -66,30 +75,211 @@ class DataProvider(ABC):
         """
         pass
     
+    def get_adj_factor(self, symbol: str, **kwargs) -> pd.DataFrame:
+        """
+        获取后复权因子表，支持的后端可以只下载不复权K线，由qdata在读取时计算各种复权价格
+        
+        Args:
+            symbol: 证券代码
+            **kwargs: 额外参数；经过本地存储刷新时known为本地已保存的因子表，后端可以只补齐之后的部分
+            
+        Returns:
+            DataFrame: 以日期为索引、包含factor列的后复权因子表
+        """
+        raise NotImplementedError(f"{self.__class__.__name__}不支持获取复权因子")
+    
     def format_data(self, df: pd.DataFrame, data_type: str = 'daily') -> pd.DataFrame:
         """
         格式化数据为统一格式
         
+        子类只需在schema类属性中声明原始数据的列名和日期格式，
+        未声明时使用通用的中英文列名映射
+        
         Args:
             df: 原始数据DataFrame
             data_type: 数据类型，'daily'或'minute'
             
         Returns:
-            DataFrame: 格式化后的DataFrame
+            DataFrame: 以日期为索引、包含date, open, high, low, close, volume的DataFrame
+        """
+        return normalize(df, self.schema or DEFAULT_SCHEMA)
+
+
+class IncrementalProvider(DataProvider):
+    """
+    增量获取数据源包装器
+    在任意DataProvider外层叠加本地K线存储和覆盖索引，
+    只把本地尚未覆盖的日期区间转发给被包装的数据源
+    """
+    
+    def __init__(self, provider: DataProvider, backend_name: str, store=None,
+                 dtype_profile: Optional[str] = None, mmap: bool = False, trim_sessions: bool = True):
         """
-        # 这里实现统一的数据格式化逻辑
-        # 确保返回的DataFrame包含以下列：date, open, high, low, close, volume
-        # 并设置date列为索引
+        初始化IncrementalProvider
         
-        # 默认实现，子类可以覆盖
-        if 'date' in df.columns:
-            df['date'] = pd.to_datetime(df['date'])
-            df = df.set_index('date')
+        Args:
+            provider: 被包装的数据源提供者
+            backend_name: 后端名称，用作本地存储的命名空间
+            store: BarStore实例，默认创建使用默认目录的BarStore
+            dtype_profile: 从本地存储读取时使用的数据类型方案，如'compact'
+            mmap: 是否以内存映射方式返回本地存储中的只读数据
+            trim_sessions: 是否按交易日历收缩缺失区间，离线后端关闭以免构建日历时联网
+        """
+        from qdata.core.bar_store import BarStore
         
-        # 确保列名符合规范
-        required_columns = {'open', 'high', 'low', 'close', 'volume'}
-        if not required_columns.issubset(df.columns):
-            # 尝试进行列名映射，子类应该根据具体数据源实现更精确的映射
-            pass
+        self.provider = provider
+        self.backend_name = backend_name
+        self.store = store if store is not None else BarStore()
+        self.dtype_profile = dtype_profile
+        self.mmap = mmap
+        self.trim_sessions = trim_sessions
+    
+    def _supports_adj_factor(self) -> bool:
+        return type(self.provider).get_adj_factor is not DataProvider.get_adj_factor
+    
+    def get_daily_data(self, symbol: str, start_date: str, end_date: str,
+                       adjust: Optional[str] = 'qfq', **kwargs) -> pd.DataFrame:
+        adjust = normalize_adjust(adjust)
         
+        if adjust is not None and self._supports_adj_factor():
+            # 本地只保存不复权K线和后复权因子，复权价格在读取时计算
+            try:
+                factors = self.store.get_factors(
+                    self.backend_name, symbol,
+                    lambda known: self.provider.get_adj_factor(symbol, known=known, **kwargs)
+                )
+            except Exception as e:
+                logger.warning(f"获取{symbol}的复权因子失败，改为直接下载{adjust}数据: {e}")
+            else:
+                if factors is not None and not factors.empty:
+                    raw = self.get_daily_data(symbol, start_date, end_date, adjust=None, **kwargs)
+                    return apply_adjustment(raw, factors, adjust)
+        
+        # 不复权数据和不支持复权因子的后端按复权方式分别存储
+        freq = 'daily_raw' if adjust is None else f'daily_{adjust}'
+        return self.store.get_or_fetch(
+            self.backend_name, symbol, freq, start_date, end_date,
+            lambda start, end: self.provider.get_daily_data(symbol, start, end, adjust=adjust, **kwargs),
+            dtype_profile=self.dtype_profile,
+            mmap=self.mmap,
+            trim_sessions=self.trim_sessions
+        )
+    
+    def get_adj_factor(self, symbol: str, **kwargs) -> pd.DataFrame:
+        return self.store.get_factors(
+            self.backend_name, symbol,
+            lambda known: self.provider.get_adj_factor(symbol, known=known, **kwargs)
+        )
+    
+    def get_minute_data(self, symbol: str, start_time: str, end_time: str, frequency: str = '1', **kwargs) -> pd.DataFrame:
+        df = self.store.get_or_fetch(
+            self.backend_name, symbol, f'minute_{frequency}', start_time[:10], end_time[:10],
+            lambda start, end: self.provider.get_minute_data(symbol, start, end, frequency, **kwargs),
+            intraday=True,
+            dtype_profile=self.dtype_profile,
+            mmap=self.mmap,
+            trim_sessions=self.trim_sessions
+        )
+        # 覆盖索引以整天为单位，这里再按请求的精确时间截取
+        # 索引已排序，按位置切片而不是布尔筛选，内存映射的数据不会被复制
+        if not df.empty and (len(start_time) > 10 or len(end_time) > 10):
+            lo = df.index.searchsorted(pd.Timestamp(start_time))
+            hi = df.index.searchsorted(pd.Timestamp(end_time), side='right') if len(end_time) > 10 else len(df)
+            df = df.iloc[lo:hi]
         return df
+    
+    def get_stock_list(self, **kwargs) -> pd.DataFrame:
+        return self.provider.get_stock_list(**kwargs)
+    
+    def get_etf_list(self, **kwargs) -> pd.DataFrame:
+        return self.provider.get_etf_list(**kwargs)
+    
+    def __getattr__(self, name):
+        if name == 'provider':
+            raise AttributeError(name)
+        # 其他后端特有的方法（如get_zh_a_minute_data）直接转发
+        return getattr(self.provider, name)
+
+
+class AsyncDataProvider(ABC):
+    """
+    异步数据源提供者的抽象基类
+    原生异步的数据源（如基于aiohttp的行情接口）直接实现这个接口，
+    注册为后端后由qdata.aget_daily_data等异步接口直接await，不占用线程
+    """
+    
+    # 原始数据的列名描述，None表示使用通用映射
+    schema: Optional[BarSchema] = None
+    
+    @abstractmethod
+    async def get_daily_data(self, symbol: str, start_date: str, end_date: str, **kwargs) -> pd.DataFrame:
+        """
+        获取日线数据
+        
+        Args:
+            symbol: 证券代码
+            start_date: 开始日期，格式为'YYYY-MM-DD'
+            end_date: 结束日期，格式为'YYYY-MM-DD'
+            
+        Returns:
+            DataFrame: 包含开盘价、最高价、最低价、收盘价、成交量等数据的DataFrame
+        """
+        pass
+    
+    @abstractmethod
+    async def get_minute_data(self, symbol: str, start_time: str, end_time: str,
+                              frequency: str = '1', **kwargs) -> pd.DataFrame:
+        """
+        获取分时数据
+        
+        Args:
+            symbol: 证券代码
+            start_time: 开始时间，格式为'YYYY-MM-DD HH:MM:SS'或'YYYY-MM-DD'
+            end_time: 结束时间，格式为'YYYY-MM-DD HH:MM:SS'或'YYYY-MM-DD'
+            frequency: 时间频率，例如'1'表示1分钟，'5'表示5分钟等
+            
+        Returns:
+            DataFrame: 包含开盘价、最高价、最低价、收盘价、成交量等数据的DataFrame
+        """
+        pass
+    
+    async def get_stock_list(self, **kwargs) -> pd.DataFrame:
+        """获取股票列表"""
+        raise NotImplementedError(f"{self.__class__.__name__}不支持获取股票列表")
+    
+    async def get_etf_list(self, **kwargs) -> pd.DataFrame:
+        """获取ETF列表"""
+        raise NotImplementedError(f"{self.__class__.__name__}不支持获取ETF列表")
+
+
+class ExecutorAsyncProvider(AsyncDataProvider):
+    """
+    同步数据源的异步包装器
+    把被包装数据源的阻塞调用放到qdata共用的线程池中执行
+    """
+    
+    def __init__(self, provider: DataProvider, executor=None):
+        """
+        初始化ExecutorAsyncProvider
+        
+        Args:
+            provider: 被包装的同步数据源提供者
+            executor: 线程池，默认使用qdata.core.executor中共用的线程池
+        """
+        self.provider = provider
+        self.executor = executor
+    
+    async def get_daily_data(self, symbol: str, start_date: str, end_date: str, **kwargs) -> pd.DataFrame:
+        return await run_blocking(self.provider.get_daily_data, symbol, start_date, end_date,
+                                  executor=self.executor, **kwargs)
+    
+    async def get_minute_data(self, symbol: str, start_time: str, end_time: str,
+                              frequency: str = '1', **kwargs) -> pd.DataFrame:
+        return await run_blocking(self.provider.get_minute_data, symbol, start_time, end_time, frequency,
+                                  executor=self.executor, **kwargs)
+    
+    async def get_stock_list(self, **kwargs) -> pd.DataFrame:
+        return await run_blocking(self.provider.get_stock_list, executor=self.executor, **kwargs)
+    
+    async def get_etf_list(self, **kwargs) -> pd.DataFrame:
+        return await run_blocking(self.provider.get_etf_list, executor=self.executor, **kwargs)
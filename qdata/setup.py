@@ -43,6 +43,12 @@ setup(
         'requests>=2.24.0',  # 网络请求依赖
     ],
     extras_require={
+        'store': [
+            'pyarrow>=6.0.0',  # 本地K线存储使用Parquet格式
+        ],
+        'search': [
+            'pypinyin>=0.40.0',  # 证券搜索支持拼音首字母
+        ],
         'dev': [
             'pytest>=6.0.0',
             'flake8>=3.8.0',
@@ -0,0 +1,8 @@
+"""
+qdata测试的公共配置
+"""
+import os
+import sys
+
+# 优先导入本目录下的qdata包，而不是仓库根目录的同名包装模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
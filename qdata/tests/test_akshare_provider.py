@@ -0,0 +1,85 @@
+"""
+AkShareProvider的接口选择和空结果处理，akshare接口用本地函数替换
+"""
+import pandas as pd
+import pytest
+
+pytest.importorskip('akshare')
+
+from qdata.backends import akshare_provider  # noqa: E402
+from qdata.backends.akshare_provider import AkShareProvider  # noqa: E402
+from qdata.core.instruments import ETF, STOCK  # noqa: E402
+
+
+class _DirectScheduler:
+    def submit(self, fn, *args, **kwargs):
+        return fn(*args, **kwargs)
+
+
+class _Instruments:
+    def __init__(self, kinds):
+        self.kinds = kinds
+
+    def kind(self, symbol):
+        return self.kinds.get(symbol)
+
+
+def _raw(days=2):
+    return pd.DataFrame({
+        '日期': pd.bdate_range('2024-01-02', periods=days).strftime('%Y-%m-%d'),
+        '开盘': 1.0, '收盘': 1.0, '最高': 1.0, '最低': 1.0, '成交量': 100,
+    })
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = []
+
+    def endpoint(name, result):
+        def fn(**params):
+            calls.append(name)
+            if isinstance(result, Exception):
+                raise result
+            return result
+        return fn
+
+    def install(etf=None, stock=None):
+        monkeypatch.setattr(akshare_provider.ak, 'fund_etf_hist_em', endpoint('etf', _raw() if etf is None else etf))
+        monkeypatch.setattr(akshare_provider.ak, 'stock_zh_a_hist', endpoint('stock', _raw() if stock is None else stock))
+        return calls
+
+    return install
+
+
+def _provider(kinds=None, retry_count=3):
+    return AkShareProvider(retry_count=retry_count, retry_delay=[0], scheduler=_DirectScheduler(),
+                           instruments=_Instruments(kinds or {}))
+
+
+def test_known_kind_uses_single_endpoint(calls):
+    log = calls()
+    _provider({'510300': ETF, '600000': STOCK}).get_daily_data('510300', '2024-01-01', '2024-01-31')
+    _provider({'510300': ETF, '600000': STOCK}).get_daily_data('600000', '2024-01-01', '2024-01-31')
+    assert log == ['etf', 'stock']
+
+
+def test_unknown_symbol_guesses_by_prefix(calls):
+    log = calls(etf=pd.DataFrame())
+    df = _provider().get_daily_data('159915', '2024-01-01', '2024-01-31')
+    assert log == ['etf', 'stock']
+    assert len(df) == 2
+
+
+def test_empty_range_returns_empty_frame_without_retry(calls):
+    log = calls(etf=pd.DataFrame(), stock=pd.DataFrame())
+    df = _provider(retry_count=5).get_daily_data('600000', '2024-01-01', '2024-01-31')
+    assert df.empty
+    assert isinstance(df.index, pd.DatetimeIndex)
+    assert log == ['stock', 'etf']
+
+
+def test_errors_are_retried(calls):
+    log = calls(etf=ConnectionError('down'), stock=ConnectionError('down'))
+    with pytest.raises(RuntimeError):
+        _provider({'600000': STOCK}, retry_count=3).get_daily_data('600000', '2024-01-01', '2024-01-31')
+    assert log == ['stock'] * 3
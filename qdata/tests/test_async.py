@@ -0,0 +1,83 @@
+"""
+异步接口：原生异步后端直接await，同步后端在线程池中执行
+"""
+import asyncio
+import threading
+
+import pandas as pd
+import pytest
+
+import qdata
+from qdata import backends
+from qdata.provider import AsyncDataProvider
+
+
+def _bars(day):
+    return pd.DataFrame({'open': [1.0], 'high': [1.0], 'low': [1.0], 'close': [1.0], 'volume': [100.0]},
+                        index=pd.DatetimeIndex([day], name='date'))
+
+
+class _AsyncProvider(AsyncDataProvider):
+    calls = []
+
+    def __init__(self, **kwargs):
+        self.init_kwargs = kwargs
+
+    async def get_daily_data(self, symbol, start_date, end_date, **kwargs):
+        self.calls.append(('daily', threading.get_ident(), self.init_kwargs, kwargs))
+        await asyncio.sleep(0)
+        return _bars(start_date)
+
+    async def get_minute_data(self, symbol, start_time, end_time, frequency='1', **kwargs):
+        self.calls.append(('minute', threading.get_ident(), self.init_kwargs, kwargs))
+        return _bars(start_time)
+
+
+@pytest.fixture
+def async_backend(monkeypatch):
+    _AsyncProvider.calls = []
+    monkeypatch.setitem(backends._registered_backends, 'async_stub', _AsyncProvider)
+    monkeypatch.setitem(backends._backend_config, 'async_stub', {'calendar': False})
+    return 'async_stub'
+
+
+def test_native_async_backend_is_awaited_directly(async_backend):
+    df = asyncio.run(qdata.aget_daily_data('600000', '2024-01-02', '2024-01-02', backend=async_backend,
+                                           adjust='qfq', use_store=False, dtype_profile='compact'))
+
+    assert len(_AsyncProvider.calls) == 1
+    kind, thread_id, init_kwargs, call_kwargs = _AsyncProvider.calls[0]
+    assert kind == 'daily'
+    # 在事件循环所在线程执行，不经过线程池
+    assert thread_id == threading.get_ident()
+    # qdata自身的选项不传给后端
+    assert init_kwargs == {'adjust': 'qfq'} and call_kwargs == {'adjust': 'qfq'}
+    assert df.index[0] == pd.Timestamp('2024-01-02')
+    assert df['close'].dtype == 'float32'
+
+
+def test_native_async_minute_data(async_backend):
+    df = asyncio.run(qdata.aget_minute_data('600000', '2024-01-02 09:31:00', '2024-01-02 15:00:00',
+                                            backend=async_backend))
+
+    assert [call[0] for call in _AsyncProvider.calls] == ['minute']
+    assert df.index[0] == pd.Timestamp('2024-01-02 09:31:00')
+
+
+def test_sync_backend_runs_in_executor(monkeypatch):
+    calls = []
+
+    def get_daily_data(symbol, start_date, end_date, backend=None, **kwargs):
+        calls.append((threading.get_ident(), backend, kwargs))
+        return _bars(start_date)
+
+    monkeypatch.setattr(qdata, 'get_daily_data', get_daily_data)
+    loop_thread = threading.get_ident()
+    df = asyncio.run(qdata.aget_daily_data('600000', '2024-01-02', '2024-01-02', backend='csv', use_store=False))
+
+    assert len(calls) == 1
+    thread_id, backend, kwargs = calls[0]
+    assert thread_id != loop_thread
+    # 同步路径保留qdata自身的选项，交给get_daily_data处理
+    assert backend == 'csv' and kwargs == {'use_store': False}
+    assert len(df) == 1
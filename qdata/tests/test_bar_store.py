@@ -0,0 +1,120 @@
+"""
+本地K线存储的测试
+"""
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from qdata.core.bar_store import MMAP_FILE, BarStore
+from qdata.core.schema import BAR_COLUMNS
+
+
+def _bars(start, periods):
+    index = pd.bdate_range(start, periods=periods, name='date')
+    values = np.arange(periods, dtype='float64')
+    return pd.DataFrame({col: values for col in BAR_COLUMNS}, index=index)
+
+
+def test_empty_reads_have_bar_columns(tmp_path):
+    store = BarStore(str(tmp_path), file_format='pickle')
+    for df in (store.read('test', 'X', 'daily'), store.read_mapped('test', 'X', 'daily')):
+        assert df.empty
+        assert list(df.columns) == list(BAR_COLUMNS)
+        assert isinstance(df.index, pd.DatetimeIndex)
+
+
+def test_rewriting_same_bars_keeps_snapshot(tmp_path):
+    pytest.importorskip('pyarrow')
+    store = BarStore(str(tmp_path))
+    bars = _bars('2024-01-02', 20)
+    store.write('test', 'X', 'daily', bars)
+
+    mapped = store.read_mapped('test', 'X', 'daily', '2024-01-05', '2024-01-10')
+    assert mapped.index.min() == pd.Timestamp('2024-01-05')
+    snapshot = os.path.join(store._symbol_dir('test', 'X', 'daily'), MMAP_FILE)
+    assert os.path.exists(snapshot)
+
+    store.write('test', 'X', 'daily', bars.tail(3))
+    assert os.path.exists(snapshot)
+
+    store.write('test', 'X', 'daily', _bars('2024-02-01', 3))
+    assert not os.path.exists(snapshot)
+    assert len(store.read_mapped('test', 'X', 'daily')) == 23
+
+
+def test_mapped_reads_survive_concurrent_writes(tmp_path):
+    pytest.importorskip('pyarrow')
+    store = BarStore(str(tmp_path))
+    store.write('test', 'X', 'daily', _bars('2020-01-01', 50))
+    errors = []
+
+    def reader():
+        try:
+            for _ in range(20):
+                assert len(store.read_mapped('test', 'X', 'daily')) >= 50
+        except Exception as e:  # noqa: BLE001 - 汇总到主线程断言
+            errors.append(e)
+
+    def writer():
+        for i in range(20):
+            store.write('test', 'X', 'daily', _bars('2021-01-01', 50 + i))
+
+    threads = [threading.Thread(target=reader) for _ in range(4)] + [threading.Thread(target=writer)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+
+def test_stale_factors_are_passed_to_fetcher(tmp_path):
+    store = BarStore(str(tmp_path), file_format='pickle')
+    index = pd.bdate_range('2024-01-02', periods=3, name='date')
+    stored = pd.DataFrame({'factor': [1.0, 1.0, 1.5]}, index=index)
+    store.write_factors('test', 'X', stored)
+
+    seen = []
+
+    def fetcher(known):
+        seen.append(known)
+        extra = pd.DataFrame({'factor': [1.5]}, index=pd.DatetimeIndex(['2024-01-05'], name='date'))
+        return pd.concat([known, extra])
+
+    factors = store.get_factors('test', 'X', fetcher, max_age=0)
+    pd.testing.assert_frame_equal(seen[0], stored, check_freq=False)
+    assert len(factors) == 4
+    assert len(store.read_factors('test', 'X')) == 4
+
+
+def test_empty_fetch_marks_range_covered(tmp_path):
+    store = BarStore(str(tmp_path), file_format='pickle')
+    calls = []
+
+    def fetcher(start, end):
+        calls.append((start, end))
+        return pd.DataFrame(columns=list(BAR_COLUMNS), index=pd.DatetimeIndex([], name='date'))
+
+    for _ in range(2):
+        df = store.get_or_fetch('test', 'X', 'daily', '2024-01-02', '2024-01-31', fetcher)
+        assert df.empty
+    assert len(calls) == 1
+
+
+def test_failed_fetch_leaves_range_open(tmp_path):
+    store = BarStore(str(tmp_path), file_format='pickle')
+    calls = []
+
+    def fetcher(start, end):
+        calls.append((start, end))
+        if len(calls) == 1:
+            raise ConnectionError('upstream down')
+        return _bars(start, 5)
+
+    with pytest.raises(ConnectionError):
+        store.get_or_fetch('test', 'X', 'daily', '2024-01-02', '2024-01-08', fetcher)
+    df = store.get_or_fetch('test', 'X', 'daily', '2024-01-02', '2024-01-08', fetcher)
+    assert len(calls) == 2
+    assert len(df) == 5
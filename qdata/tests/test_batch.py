@@ -0,0 +1,55 @@
+"""
+批量获取的并发上限和失败记录
+"""
+import threading
+import time
+
+import pandas as pd
+
+from qdata.core import batch
+from qdata.core.batch import fetch_batch, get_backend_semaphore
+
+
+def test_semaphore_limits_in_flight_requests():
+    semaphore = threading.BoundedSemaphore(2)
+    lock = threading.Lock()
+    active = [0]
+    peak = [0]
+
+    def fetch_one(symbol):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.02)
+        with lock:
+            active[0] -= 1
+        return pd.DataFrame({'close': [1.0]})
+
+    result = fetch_batch([f'{i:06d}' for i in range(8)], fetch_one, semaphore, max_workers=8)
+    assert len(result) == 8
+    assert peak[0] <= 2
+
+
+def test_duplicates_are_fetched_once_and_failures_recorded():
+    calls = []
+
+    def fetch_one(symbol):
+        calls.append(symbol)
+        if symbol == 'bad':
+            raise ValueError('no data')
+        return pd.DataFrame({'close': [1.0]})
+
+    result = fetch_batch(['a', 'b', 'a', 'bad'], fetch_one, threading.BoundedSemaphore(4))
+    assert sorted(calls) == ['a', 'b', 'bad']
+    assert result.succeeded == ['a', 'b']
+    assert isinstance(result.failed['bad'], ValueError)
+
+
+def test_backend_semaphore_is_shared(monkeypatch):
+    monkeypatch.setattr(batch, '_backend_semaphores', {})
+    first = get_backend_semaphore('stub', 3)
+    assert get_backend_semaphore('stub', 10) is first
+    assert get_backend_semaphore('other', 3) is not first
+    # 共享的信号量按首次创建时的上限计数
+    assert all(first.acquire(blocking=False) for _ in range(3))
+    assert not first.acquire(blocking=False)
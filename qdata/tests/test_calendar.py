@@ -0,0 +1,61 @@
+"""
+交易日历的查询
+"""
+import pandas as pd
+import pytest
+
+from qdata.calendar import TradingCalendar, market_of
+
+# 2024-01-01元旦休市，周末不交易
+SESSIONS = pd.DatetimeIndex(['2023-12-28', '2023-12-29', '2024-01-02', '2024-01-03', '2024-01-04', '2024-01-05',
+                             '2024-01-08'])
+
+
+@pytest.fixture
+def cal():
+    return TradingCalendar('TEST', SESSIONS)
+
+
+def test_previous_session(cal):
+    assert cal.previous_session('2024-01-02') == pd.Timestamp('2024-01-02')
+    assert cal.previous_session('2024-01-01') == pd.Timestamp('2023-12-29')
+    assert cal.previous_session('2024-01-07 15:00') == pd.Timestamp('2024-01-05')
+    assert cal.previous_session('2023-12-01') is None
+    assert cal.previous_session('2030-01-01') == pd.Timestamp('2024-01-08')
+
+
+def test_next_session(cal):
+    assert cal.next_session('2024-01-02') == pd.Timestamp('2024-01-02')
+    assert cal.next_session('2023-12-30') == pd.Timestamp('2024-01-02')
+    assert cal.next_session('2024-01-06') == pd.Timestamp('2024-01-08')
+    assert cal.next_session('2023-01-01') == pd.Timestamp('2023-12-28')
+    assert cal.next_session('2024-01-09') is None
+
+
+def test_sessions_back(cal):
+    assert cal.sessions_back('2024-01-05', 1) == pd.Timestamp('2024-01-05')
+    assert cal.sessions_back('2024-01-05', 4) == pd.Timestamp('2024-01-02')
+    # 非交易日从之前最近的交易日开始数
+    assert cal.sessions_back('2024-01-01', 2) == pd.Timestamp('2023-12-28')
+    assert cal.sessions_back('2024-01-08', 100) == pd.Timestamp('2023-12-28')
+
+
+def test_count_sessions(cal):
+    assert cal.count_sessions('2023-12-29', '2024-01-02') == 2
+    assert cal.count_sessions('2023-12-30', '2024-01-01') == 0
+    assert cal.count_sessions('2024-01-01', '2024-01-31') == 5
+    assert cal.count_sessions('2024-01-05', '2024-01-02') == 0
+
+
+def test_clamp(cal):
+    assert cal.clamp('2023-12-30', '2024-01-07') == (pd.Timestamp('2024-01-02'), pd.Timestamp('2024-01-05'))
+    assert cal.clamp('2023-12-30', '2024-01-01') is None
+
+
+def test_market_of():
+    assert market_of('600000') == 'CN'
+    assert market_of('sz000001') == 'CN'
+    assert market_of('AAPL') == 'US'
+    assert market_of('BRK.B') == 'US'
+    assert market_of('00700') == 'unknown'
+    assert market_of('BTCUSDT') == 'unknown'
@@ -0,0 +1,58 @@
+"""
+CSV边车索引的测试
+"""
+import pandas as pd
+
+from qdata.backends.csv_provider import CSVProvider
+from qdata.core.csv_index import CsvIndex
+
+
+def _write_csv(path, dates):
+    n = len(dates)
+    df = pd.DataFrame({
+        'date': dates,
+        'open': range(n),
+        'high': range(1, n + 1),
+        'low': range(n),
+        'close': range(n),
+        'volume': [100] * n,
+    })
+    df.to_csv(path, index=False)
+
+
+def test_index_selects_month_byte_range(tmp_path):
+    path = tmp_path / 'TEST.csv'
+    _write_csv(path, pd.bdate_range('2024-01-02', '2024-03-29').strftime('%Y-%m-%d'))
+
+    index = CsvIndex(str(path))
+    assert [month[0] for month in index.load()['months']] == ['2024-01', '2024-02', '2024-03']
+    lo, hi = index.byte_range('2024-02-05', '2024-02-20')
+    assert 0 < lo < hi < path.stat().st_size
+
+    df = CSVProvider(data_dir=str(tmp_path)).get_daily_data('TEST', '2024-02-05', '2024-02-20')
+    assert df.index.min() == pd.Timestamp('2024-02-05')
+    assert df.index.max() == pd.Timestamp('2024-02-20')
+
+
+def test_unrecognised_date_format_falls_back_to_whole_file(tmp_path):
+    path = tmp_path / 'TEST.csv'
+    dates = pd.bdate_range('2024-01-02', periods=21)
+    _write_csv(path, dates.strftime('%m/%d/%Y'))
+
+    index = CsvIndex(str(path))
+    assert index.load()['months'] is None
+    assert index.byte_range('2024-01-01', '2024-01-31') is None
+
+    with_index = CSVProvider(data_dir=str(tmp_path), use_index=True).get_daily_data('TEST', '2024-01-01', '2024-01-31')
+    without_index = CSVProvider(data_dir=str(tmp_path), use_index=False).get_daily_data('TEST', '2024-01-01', '2024-01-31')
+    assert len(with_index) == len(without_index) == 21
+    assert with_index.index.equals(pd.DatetimeIndex(dates, name='date'))
+
+
+def test_unparseable_row_disables_index(tmp_path):
+    path = tmp_path / 'TEST.csv'
+    dates = list(pd.bdate_range('2024-01-02', periods=5).strftime('%Y-%m-%d'))
+    dates[2] = 'n/a'
+    _write_csv(path, dates)
+
+    assert CsvIndex(str(path)).load()['months'] is None
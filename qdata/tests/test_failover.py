@@ -0,0 +1,99 @@
+"""
+故障转移数据源：空结果也切换到下一个后端
+"""
+import pandas as pd
+import pytest
+
+from qdata import backends
+from qdata.backends import failover_provider
+from qdata.backends.failover_provider import FailoverProvider
+from qdata.backends.scheduler import PRIORITY_BATCH, _current_priority, request_priority
+from qdata.provider import DataProvider
+
+BARS = pd.DataFrame({'close': [1.0, 2.0]}, index=pd.bdate_range('2024-01-02', periods=2, name='date'))
+
+
+class _StubProvider(DataProvider):
+    result = None
+
+    def get_daily_data(self, symbol, start_date, end_date, **kwargs):
+        return self.result
+
+    def get_minute_data(self, symbol, start_time, end_time, frequency='1', **kwargs):
+        return self.result
+
+    def get_stock_list(self, **kwargs):
+        return pd.DataFrame(columns=['code', 'name'])
+
+    def get_etf_list(self, **kwargs):
+        return pd.DataFrame(columns=['code', 'name'])
+
+
+class _NoneProvider(_StubProvider):
+    result = None
+
+
+class _EmptyProvider(_StubProvider):
+    result = BARS.iloc[:0]
+
+
+class _FullProvider(_StubProvider):
+    result = BARS
+
+
+class _PriorityProvider(_StubProvider):
+    seen = []
+
+    def get_daily_data(self, symbol, start_date, end_date, **kwargs):
+        self.seen.append(_current_priority.get())
+        return BARS
+
+
+@pytest.fixture(autouse=True)
+def stub_backends(monkeypatch):
+    for name, cls in (('none_stub', _NoneProvider), ('empty_stub', _EmptyProvider), ('full_stub', _FullProvider),
+                      ('priority_stub', _PriorityProvider)):
+        monkeypatch.setitem(backends._registered_backends, name, cls)
+    monkeypatch.setattr(failover_provider, '_states', {})
+
+
+def test_empty_results_fail_over_and_are_counted():
+    provider = FailoverProvider(backends=['none_stub', 'empty_stub', 'full_stub'])
+    df = provider.get_daily_data('600000', '2024-01-01', '2024-01-31')
+    assert df.equals(BARS)
+
+    stats = provider.stats()
+    assert stats['none_stub']['empty'] == 1
+    assert stats['empty_stub']['empty'] == 1
+    assert stats['full_stub']['wins'] == 1
+    assert all(s['errors'] == 0 for s in stats.values())
+
+
+def test_all_empty_returns_empty_frame():
+    provider = FailoverProvider(backends=['none_stub', 'empty_stub'])
+    df = provider.get_minute_data('600000', '2024-01-02', '2024-01-02')
+    assert df is not None and df.empty
+    assert provider.stats()['empty_stub']['wins'] == 0
+
+
+def test_empty_lists_are_not_failures():
+    provider = FailoverProvider(backends=['empty_stub', 'full_stub'])
+    provider.get_stock_list()
+    assert provider.stats()['empty_stub']['wins'] == 1
+
+
+def test_instances_share_executor_and_stats():
+    first = backends.create_provider('failover', backends=['empty_stub', 'full_stub'])
+    second = backends.create_provider('failover', backends=['empty_stub', 'full_stub'])
+    first.get_daily_data('600000', '2024-01-01', '2024-01-31')
+    second.get_daily_data('600000', '2024-01-01', '2024-01-31')
+    assert first._executor is second._executor
+    assert second.stats()['full_stub']['wins'] == 2
+    assert backends.get_backend_config('failover')['store'] is True
+
+
+def test_calls_keep_request_priority():
+    provider = FailoverProvider(backends=['priority_stub'])
+    with request_priority(PRIORITY_BATCH):
+        provider.get_daily_data('600000', '2024-01-01', '2024-01-31')
+    assert _PriorityProvider.seen[-1] == PRIORITY_BATCH
@@ -0,0 +1,56 @@
+"""
+证券搜索索引
+"""
+from qdata.core.instruments import ETF, STOCK, InstrumentIndex
+
+
+def _record(code, name, kind, pinyin):
+    return {'code': code, 'name': name, 'type': kind, 'pinyin': pinyin}
+
+
+RECORDS = sorted([
+    _record('000600', '测试股份', STOCK, 'csgf'),
+    _record('159915', '创业板ETF', ETF, 'cybetf'),
+    _record('510300', '沪深300ETF', ETF, 'hs300etf'),
+    _record('600000', '浦发银行', STOCK, 'pfyh'),
+    _record('600036', '招商银行', STOCK, 'zsyh'),
+    _record('601398', '工商银行', STOCK, 'gsyh'),
+], key=lambda r: r['code'])
+
+
+def _codes(results):
+    return [r['code'] for r in results]
+
+
+def test_code_prefix_before_substring():
+    index = InstrumentIndex(RECORDS)
+    # 前缀匹配按代码排序排在前面，随后是子串匹配
+    assert _codes(index.search('600')) == ['600000', '600036', '000600']
+    assert _codes(index.search('6013')) == ['601398']
+    assert index.search('600036')[0] == {'code': '600036', 'name': '招商银行', 'type': STOCK}
+
+
+def test_name_and_pinyin():
+    index = InstrumentIndex(RECORDS)
+    assert _codes(index.search('工商')) == ['601398']
+    # 两个字的中文查询走二元组索引
+    assert _codes(index.search('银行')) == ['600000', '600036', '601398']
+    assert _codes(index.search('ZSYH')) == ['600036']
+    assert _codes(index.search(' cyb ')) == ['159915']
+    # 超过前缀索引长度的查询
+    assert _codes(index.search('沪深300etf')) == ['510300']
+
+
+def test_kind_filter_and_limit():
+    index = InstrumentIndex(RECORDS)
+    assert _codes(index.search('etf', kind=ETF)) == ['159915', '510300']
+    assert index.search('etf', kind=STOCK) == []
+    assert _codes(index.search('60', limit=1)) == ['600000']
+    assert index.search('60', limit=0) == []
+
+
+def test_no_match():
+    index = InstrumentIndex(RECORDS)
+    assert index.search('') == []
+    assert index.search('不存在') == []
+    assert index.search('999') == []
@@ -0,0 +1,45 @@
+"""
+按窗口逐块获取分时数据：失败窗口的处理
+"""
+import pandas as pd
+import pytest
+
+import qdata
+
+
+@pytest.fixture
+def fake_minute_data(monkeypatch):
+    requested = []
+
+    def get_minute_data(symbol, start_time, end_time, frequency='1', backend=None, **kwargs):
+        day = start_time[:10]
+        requested.append(day)
+        if day == '2024-01-03':
+            raise ConnectionError('upstream down')
+        if day == '2024-01-04':
+            return pd.DataFrame()
+        return pd.DataFrame({'close': [1.0]}, index=pd.DatetimeIndex([f'{day} 09:31:00'], name='date'))
+
+    monkeypatch.setattr(qdata, 'get_minute_data', get_minute_data)
+    return requested
+
+
+def test_errors_raise_by_default(fake_minute_data):
+    chunks = qdata.iter_minute_data('600000', '2024-01-01', '2024-01-05', backend='csv')
+    assert len(next(chunks)) == 1
+    assert len(next(chunks)) == 1
+    with pytest.raises(ConnectionError):
+        next(chunks)
+
+
+def test_failed_windows_are_collected(fake_minute_data):
+    failed = []
+    chunks = list(qdata.iter_minute_data('600000', '2023-12-30', '2024-01-05', backend='csv', failed=failed))
+
+    # 周末窗口不请求后端，空窗口被跳过，失败窗口记录后继续
+    assert fake_minute_data == ['2024-01-01', '2024-01-02', '2024-01-03', '2024-01-04', '2024-01-05']
+    assert [chunk.index[0].strftime('%Y-%m-%d') for chunk in chunks] == ['2024-01-01', '2024-01-02', '2024-01-05']
+    assert len(failed) == 1
+    lo, hi, error = failed[0]
+    assert lo == pd.Timestamp('2024-01-03') and hi == pd.Timestamp('2024-01-03 23:59:59')
+    assert isinstance(error, ConnectionError)
@@ -0,0 +1,80 @@
+"""
+内存缓存的字节上限淘汰和过期时间
+"""
+import numpy as np
+import pandas as pd
+
+from qdata.core.memory_cache import MemoryCache, estimate_size
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _frame(rows):
+    return pd.DataFrame({'close': np.zeros(rows)})
+
+
+def test_lru_eviction_by_bytes():
+    size = estimate_size(_frame(100))
+    cache = MemoryCache(max_bytes=size * 2 + size // 2)
+    cache.put('a', _frame(100))
+    cache.put('b', _frame(100))
+    assert cache.get('a') is not None  # a成为最近使用
+
+    cache.put('c', _frame(100))
+    assert cache.get('b') is None
+    assert cache.get('a') is not None and cache.get('c') is not None
+    stats = cache.stats()
+    assert stats['entries'] == 2
+    assert stats['evictions'] == 1
+    assert stats['bytes'] == size * 2 <= stats['max_bytes']
+
+
+def test_oversized_values_are_not_cached():
+    cache = MemoryCache(max_bytes=estimate_size(_frame(10)))
+    cache.put('big', _frame(1000))
+    assert cache.get('big') is None
+    assert cache.stats()['bytes'] == 0
+
+
+def test_replacing_a_key_updates_bytes():
+    cache = MemoryCache()
+    cache.put('k', _frame(1000))
+    cache.put('k', _frame(10))
+    assert cache.stats()['bytes'] == estimate_size(_frame(10))
+    assert len(cache) == 1
+
+
+def test_live_and_historical_ttl():
+    clock = FakeClock()
+    cache = MemoryCache(historical_ttl=100, live_ttl=10, clock=clock)
+    cache.put('history', _frame(1))
+    cache.put('today', _frame(1), live=True)
+    cache.put('custom', _frame(1), ttl=50)
+
+    clock.now = 9
+    assert cache.get('today') is not None
+    clock.now = 10
+    assert cache.get('today') is None
+    clock.now = 49
+    assert cache.get('custom') is not None
+    clock.now = 99
+    assert cache.get('custom') is None
+    assert cache.get('history') is not None
+    clock.now = 100
+    assert cache.get('history') is None
+
+    stats = cache.stats()
+    assert stats['entries'] == 0 and stats['bytes'] == 0
+    assert stats['misses'] == 3
+
+
+def test_zero_ttl_disables_caching():
+    cache = MemoryCache(live_ttl=0)
+    cache.put('today', _frame(1), live=True)
+    assert cache.get('today') is None
@@ -0,0 +1,50 @@
+"""
+面板数据的数据类型方案
+"""
+import numpy as np
+import pandas as pd
+
+from qdata.core.panel import to_panel
+
+
+def _frames():
+    dates = pd.bdate_range('2023-01-02', periods=3)
+    return {
+        symbol: pd.DataFrame({field: np.arange(3, dtype='float64') + i
+                              for field in ('open', 'high', 'low', 'close', 'volume')}, index=dates)
+        for i, symbol in enumerate(['600000', '000001'])
+    }
+
+
+def test_compact_panel_uses_category_symbols():
+    panel = to_panel(_frames(), dtype_profile='compact')
+    assert isinstance(panel.index.levels[1], pd.CategoricalIndex)
+    assert panel['close'].dtype == np.float32
+    assert panel['volume'].dtype == np.uint32
+    assert panel.reset_index()['symbol'].dtype == 'category'
+
+
+def test_default_panel_keeps_types():
+    panel = to_panel(_frames())
+    assert not isinstance(panel.index.levels[1], pd.CategoricalIndex)
+    assert panel['close'].dtype == np.float64
+
+
+def test_outer_panel_fills_missing_pairs():
+    frames = _frames()
+    # 000001在第二个交易日停牌
+    frames['000001'] = frames['000001'].drop(frames['000001'].index[1])
+    panel = to_panel(frames, how='outer')
+
+    dates = pd.bdate_range('2023-01-02', periods=3)
+    assert panel.index.equals(pd.MultiIndex.from_product([dates, ['000001', '600000']], names=['date', 'symbol']))
+    assert panel.loc[(dates[1], '000001')].isna().all()
+    assert panel.loc[(dates[1], '600000'), 'close'] == 1.0
+
+
+def test_inner_panel_drops_missing_dates():
+    frames = _frames()
+    frames['000001'] = frames['000001'].drop(frames['000001'].index[1])
+    panel = to_panel(frames, how='inner')
+    assert len(panel) == 4
+    assert not panel.isna().any().any()
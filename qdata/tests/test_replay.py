@@ -0,0 +1,136 @@
+"""
+通过replay后端测试获取路径：本地存储的增量获取、单飞合并和内存缓存、批量获取的失败记录
+"""
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import qdata
+from qdata import BarStore, MemoryCache
+from qdata import calendar as calendar_module
+from qdata.backends import replay_provider
+from qdata.backends.replay_provider import ReplayServer, set_replay_server
+
+SYMBOLS = ['600000', '600001']
+DATES = pd.bdate_range('2023-01-02', '2023-12-29')
+
+
+def _make_fixtures(fixture_dir):
+    daily_dir = os.path.join(fixture_dir, 'daily')
+    os.makedirs(daily_dir)
+    for i, symbol in enumerate(SYMBOLS):
+        close = 10.0 + i + np.arange(len(DATES)) * 0.01
+        pd.DataFrame({
+            'date': DATES.strftime('%Y-%m-%d'),
+            'open': close,
+            'high': close + 0.1,
+            'low': close - 0.1,
+            'close': close,
+            'volume': np.full(len(DATES), 1000),
+        }).to_csv(os.path.join(daily_dir, f'{symbol}.csv'), index=False)
+
+
+@pytest.fixture
+def replay(tmp_path, monkeypatch):
+    """独立的录制目录、本地存储和内存缓存"""
+    fixture_dir = str(tmp_path / 'fixtures')
+    _make_fixtures(fixture_dir)
+    # replay是离线后端，不应构建需要联网下载的A股日历
+    monkeypatch.setattr(calendar_module, '_calendars', {})
+    monkeypatch.setattr(qdata, '_bar_store', BarStore(str(tmp_path / 'bars')))
+    monkeypatch.setattr(qdata, '_bar_store_enabled', True)
+    monkeypatch.setattr(qdata, '_memory_cache', MemoryCache())
+    monkeypatch.setattr(replay_provider, '_servers', {})
+
+    def install(**options):
+        server = ReplayServer(fixture_dir, **options)
+        set_replay_server(server)
+        return server
+
+    return install, {'backend': 'replay', 'fixture_dir': fixture_dir}
+
+
+def _sessions(start, end):
+    return len(DATES[(DATES >= start) & (DATES <= end)])
+
+
+def test_store_fetches_only_missing_ranges(replay):
+    install, options = replay
+    server = install()
+
+    first = qdata.get_daily_data('600000', '2023-01-01', '2023-03-31', use_cache=False, **options)
+    assert len(first) == _sessions('2023-01-01', '2023-03-31')
+    assert server.stats()['requests'] == 1
+
+    again = qdata.get_daily_data('600000', '2023-01-01', '2023-03-31', use_cache=False, **options)
+    pd.testing.assert_frame_equal(again, first, check_freq=False)
+    assert server.stats()['requests'] == 1
+
+    wider = qdata.get_daily_data('600000', '2023-01-01', '2023-06-30', use_cache=False, **options)
+    assert len(wider) == _sessions('2023-01-01', '2023-06-30')
+    stats = server.stats()
+    assert stats['requests'] == 2
+    # 第二次请求只覆盖4~6月的缺口
+    assert stats['bars'] == _sessions('2023-01-01', '2023-06-30')
+    np.testing.assert_allclose(wider['close'].to_numpy(), 10.0 + np.arange(len(wider)) * 0.01)
+
+
+def test_concurrent_identical_requests_hit_upstream_once(replay):
+    install, options = replay
+    server = install(latency=0.2)
+    barrier = threading.Barrier(5)
+    results = []
+
+    def fetch():
+        barrier.wait()
+        results.append(qdata.get_daily_data('600000', '2023-01-01', '2023-12-31', use_store=False, **options))
+
+    threads = [threading.Thread(target=fetch) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+
+    assert len(results) == 5
+    assert server.stats()['requests'] == 1
+    assert all(df.equals(results[0]) for df in results)
+
+    # 内存缓存命中，不再请求上游
+    qdata.get_daily_data('600000', '2023-01-01', '2023-12-31', use_store=False, **options)
+    assert server.stats()['requests'] == 1
+
+    qdata.get_daily_data('600000', '2023-01-01', '2023-12-31', use_store=False, use_cache=False, **options)
+    assert server.stats()['requests'] == 2
+
+
+def test_batch_reports_failed_symbols(replay):
+    install, options = replay
+    install()
+
+    result = qdata.get_daily_data_batch(SYMBOLS + ['999999'], '2023-01-01', '2023-03-31',
+                                        use_store=False, use_cache=False, **options)
+    assert sorted(result.succeeded) == SYMBOLS
+    assert list(result.failed) == ['999999']
+    assert isinstance(result.failed['999999'], FileNotFoundError)
+
+
+def test_batch_reports_upstream_errors(replay):
+    install, options = replay
+    server = install(error_rate=1.0)
+
+    result = qdata.get_daily_data_batch(SYMBOLS, '2023-01-01', '2023-03-31',
+                                        use_store=False, use_cache=False, **options)
+    assert result.succeeded == []
+    assert sorted(result.failed) == SYMBOLS
+    assert all(isinstance(err, ConnectionError) for err in result.failed.values())
+    assert server.stats()['errors'] == len(SYMBOLS)
+
+
+def test_offline_backend_skips_calendar(replay):
+    install, options = replay
+    install()
+    qdata.get_daily_data('600000', '2023-01-01', '2023-03-31', **options)
+    assert 'CN' not in calendar_module._calendars
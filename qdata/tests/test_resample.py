@@ -0,0 +1,63 @@
+"""
+分钟K线按交易时段重采样
+"""
+import numpy as np
+import pandas as pd
+
+from qdata.core.resample import resample_bars
+
+
+def _a_share_day(day):
+    """一个交易日的1分钟K线：09:25集合竞价、09:31~11:30、13:01~15:00"""
+    day = pd.Timestamp(day)
+    morning = pd.date_range(day + pd.Timedelta('09:31:00'), day + pd.Timedelta('11:30:00'), freq='1min')
+    afternoon = pd.date_range(day + pd.Timedelta('13:01:00'), day + pd.Timedelta('15:00:00'), freq='1min')
+    index = pd.DatetimeIndex([day + pd.Timedelta('09:25:00')]).append(morning).append(afternoon)
+    values = np.arange(len(index), dtype='float64')
+    return pd.DataFrame({'open': values, 'high': values + 0.5, 'low': values - 0.5, 'close': values,
+                         'volume': np.ones(len(index))}, index=index)
+
+
+def test_buckets_do_not_cross_lunch_break():
+    bars = resample_bars(_a_share_day('2024-01-02'), '60')
+    assert [t.strftime('%H:%M') for t in bars.index] == ['10:30', '11:30', '14:00', '15:00']
+    # 11:30的K线属于上午最后一根，13:01的K线属于下午第一根
+    assert bars.loc['2024-01-02 11:30', 'close'] == 120
+    assert bars.loc['2024-01-02 14:00', 'open'] == 121
+
+    labels = [t.strftime('%H:%M') for t in resample_bars(_a_share_day('2024-01-02'), '30').index]
+    assert labels == ['10:00', '10:30', '11:00', '11:30', '13:30', '14:00', '14:30', '15:00']
+
+
+def test_auction_bar_folds_into_first_bucket():
+    bars = resample_bars(_a_share_day('2024-01-02'), '5')
+    first = bars.iloc[0]
+    assert bars.index[0] == pd.Timestamp('2024-01-02 09:35')
+    # 09:25的集合竞价和09:31~09:35共6根
+    assert first['open'] == 0
+    assert first['close'] == 5
+    assert first['volume'] == 6
+
+
+def test_last_bar_is_labelled_15_00():
+    bars = resample_bars(_a_share_day('2024-01-02'), '15')
+    assert bars.index[-1] == pd.Timestamp('2024-01-02 15:00')
+    assert bars['volume'].iloc[-1] == 15
+    assert bars['volume'].sum() == 241
+    assert len(bars) == 16
+
+
+def test_weekly_and_monthly_labels_use_last_trading_day():
+    days = ['2024-01-29', '2024-01-30', '2024-01-31', '2024-02-01', '2024-02-02', '2024-02-05']
+    minutes = pd.concat([_a_share_day(day) for day in days])
+
+    weekly = resample_bars(minutes, 'W')
+    assert list(weekly.index) == [pd.Timestamp('2024-02-02'), pd.Timestamp('2024-02-05')]
+    assert weekly['volume'].iloc[0] == 241 * 5
+
+    monthly = resample_bars(minutes, 'M')
+    assert list(monthly.index) == [pd.Timestamp('2024-01-31'), pd.Timestamp('2024-02-05')]
+    assert monthly['volume'].tolist() == [241 * 3, 241 * 3]
+
+    daily = resample_bars(minutes, 'D')
+    assert list(daily.index) == list(pd.DatetimeIndex(days))
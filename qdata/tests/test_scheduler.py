@@ -0,0 +1,190 @@
+"""
+请求调度器的测试，使用假时钟，不实际等待
+"""
+import threading
+import time
+
+import pytest
+
+from qdata.backends.scheduler import (
+    PRIORITY_BATCH,
+    PRIORITY_INTERACTIVE,
+    RequestScheduler,
+    TokenBucket,
+    request_priority,
+)
+
+
+class FakeClock:
+    """假时钟，sleep只推进时间"""
+
+    def __init__(self):
+        self.now = 0.0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        with self._lock:
+            self.now += seconds
+
+
+def _wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("等待条件超时")
+        time.sleep(0.001)
+
+
+def _scheduler(clock, rate=1000, burst=1000, max_in_flight=1):
+    return RequestScheduler('test', rate=rate, burst=burst, max_in_flight=max_in_flight,
+                            clock=clock, sleep=clock.sleep)
+
+
+def test_token_bucket_burst_and_refill():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, capacity=3, clock=clock)
+
+    for _ in range(3):
+        assert bucket.time_until_available() == 0
+        bucket.consume()
+    assert bucket.time_until_available() == pytest.approx(0.5)
+
+    clock.now += 0.25
+    assert bucket.time_until_available() == pytest.approx(0.25)
+
+    # 长时间空闲后最多积累capacity个令牌
+    clock.now += 100
+    for _ in range(3):
+        assert bucket.time_until_available() == 0
+        bucket.consume()
+    assert bucket.time_until_available() > 0
+
+
+def test_token_bucket_rejects_invalid_config():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0, capacity=1)
+
+
+def test_scheduler_spaces_calls_at_rate():
+    clock = FakeClock()
+    scheduler = _scheduler(clock, rate=2, burst=1)
+    times = [scheduler.submit(lambda i: clock(), i) for i in range(5)]
+    assert times == pytest.approx([0.0, 0.5, 1.0, 1.5, 2.0])
+
+
+def test_scheduler_runs_interactive_before_batch():
+    clock = FakeClock()
+    scheduler = _scheduler(clock, max_in_flight=1)
+    gate = threading.Event()
+    started = threading.Event()
+    order = []
+
+    def blocker():
+        started.set()
+        gate.wait(5)
+
+    def record(label):
+        order.append(label)
+
+    threads = [threading.Thread(target=scheduler.submit, args=(blocker,))]
+    threads[0].start()
+    assert started.wait(5)
+
+    queued = [('batch-1', PRIORITY_BATCH), ('batch-2', PRIORITY_BATCH),
+              ('interactive-1', PRIORITY_INTERACTIVE), ('interactive-2', PRIORITY_INTERACTIVE)]
+    for count, (label, priority) in enumerate(queued, start=1):
+        thread = threading.Thread(target=scheduler.submit, args=(record, label), kwargs={'priority': priority})
+        thread.start()
+        threads.append(thread)
+        _wait_until(lambda: len(scheduler._waiters) == count)
+
+    gate.set()
+    for thread in threads:
+        thread.join(5)
+    assert order == ['interactive-1', 'interactive-2', 'batch-1', 'batch-2']
+
+
+def test_request_priority_context():
+    clock = FakeClock()
+    scheduler = _scheduler(clock, max_in_flight=1)
+    gate = threading.Event()
+    started = threading.Event()
+    order = []
+
+    def blocker():
+        started.set()
+        gate.wait(5)
+
+    def batch_job():
+        with request_priority(PRIORITY_BATCH):
+            scheduler.submit(order.append, 'batch')
+
+    holder = threading.Thread(target=scheduler.submit, args=(blocker,))
+    holder.start()
+    assert started.wait(5)
+    batch = threading.Thread(target=batch_job)
+    batch.start()
+    _wait_until(lambda: len(scheduler._waiters) == 1)
+    interactive = threading.Thread(target=scheduler.submit, args=(order.append, 'interactive'))
+    interactive.start()
+    _wait_until(lambda: len(scheduler._waiters) == 2)
+
+    gate.set()
+    for thread in (holder, batch, interactive):
+        thread.join(5)
+    assert order == ['interactive', 'batch']
+
+
+def test_identical_requests_are_coalesced():
+    clock = FakeClock()
+    scheduler = _scheduler(clock, max_in_flight=4)
+    gate = threading.Event()
+    calls = []
+
+    def fetch(symbol):
+        calls.append(symbol)
+        gate.wait(5)
+        return f'bars-{symbol}'
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(scheduler.submit(fetch, '600000')))
+               for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    _wait_until(lambda: scheduler.stats['coalesced'] == 4)
+    gate.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert calls == ['600000']
+    assert results == ['bars-600000'] * 5
+    assert scheduler.stats == {'executed': 1, 'coalesced': 4}
+
+
+def test_max_in_flight_is_respected():
+    clock = FakeClock()
+    scheduler = _scheduler(clock, max_in_flight=2)
+    lock = threading.Lock()
+    running = [0]
+    peak = [0]
+
+    def fetch(i):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.01)
+        with lock:
+            running[0] -= 1
+        return i
+
+    threads = [threading.Thread(target=scheduler.submit, args=(fetch, i)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert peak[0] <= 2
+    assert scheduler.stats['executed'] == 8
+    assert scheduler.in_flight == 0
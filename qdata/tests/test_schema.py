@@ -0,0 +1,43 @@
+"""
+数据规范化的测试
+"""
+import pandas as pd
+
+from qdata.backends.csv_provider import CSVProvider
+from qdata.core.schema import BAR_COLUMNS, BarSchema, normalize
+
+
+def _raw():
+    return pd.DataFrame({
+        'Date': ['2024-01-03', '2024-01-02'],
+        'Open': [10.0, 9.0],
+        'High': [11.0, 10.0],
+        'Low': [9.5, 8.5],
+        'Close': [10.5, 9.5],
+        'Vol': [1000, 900],
+        'Symbol': ['TEST', 'TEST'],
+        'Turnover': [0.1, 0.2],
+    })
+
+
+def test_extra_columns_dropped_by_default():
+    schema = BarSchema(column_mapping={'vol': 'volume'}, lowercase=True)
+    df = normalize(_raw(), schema)
+    assert list(df.columns) == list(BAR_COLUMNS)
+    assert df.index.is_monotonic_increasing
+
+
+def test_keep_extra_preserves_other_columns():
+    schema = BarSchema(column_mapping={'vol': 'volume'}, lowercase=True, keep_extra=True)
+    df = normalize(_raw(), schema)
+    assert list(df.columns) == list(BAR_COLUMNS) + ['symbol', 'turnover']
+    assert df.loc['2024-01-02', 'symbol'] == 'TEST'
+    assert df.loc['2024-01-03', 'turnover'] == 0.1
+
+
+def test_csv_provider_keeps_extra_columns(tmp_path):
+    _raw().to_csv(tmp_path / 'TEST.csv', index=False)
+    df = CSVProvider(data_dir=str(tmp_path)).get_daily_data('TEST', '2024-01-01', '2024-01-31')
+    assert {'symbol', 'turnover', 'amount'} <= set(df.columns)
+    assert 'date' not in df.columns
+    assert len(df) == 2
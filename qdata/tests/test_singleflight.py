@@ -0,0 +1,127 @@
+"""
+单飞合并：并发的相同请求只执行一次
+"""
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+import qdata
+from qdata import backends
+from qdata.core.singleflight import SingleFlight
+from qdata.provider import DataProvider
+
+
+def _wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError('等待超时')
+        time.sleep(0.001)
+
+
+def _run_concurrently(group, key, fn, n):
+    results, errors = [], []
+
+    def call():
+        try:
+            results.append(group.do(key, fn))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(n)]
+    for thread in threads:
+        thread.start()
+    return threads, results, errors
+
+
+def test_concurrent_calls_share_one_execution():
+    group = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        release.wait(5)
+        return 'value'
+
+    threads, results, _ = _run_concurrently(group, 'k', fn, 5)
+    _wait_until(lambda: group.stats['shared'] == 4)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert sorted(shared for _, shared in results) == [False, True, True, True, True]
+    assert all(value == 'value' for value, _ in results)
+    assert group.in_flight() == 0
+
+    # 调用结束后相同的键重新执行
+    assert group.do('k', lambda: 'again') == ('again', False)
+
+
+def test_waiters_receive_the_leaders_error():
+    group = SingleFlight()
+    release = threading.Event()
+
+    def fn():
+        release.wait(5)
+        raise ConnectionError('upstream down')
+
+    threads, results, errors = _run_concurrently(group, 'k', fn, 3)
+    _wait_until(lambda: group.stats['shared'] == 2)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert results == []
+    assert len(errors) == 3 and all(isinstance(e, ConnectionError) for e in errors)
+
+
+class _SlowProvider(DataProvider):
+    calls = []
+
+    def get_daily_data(self, symbol, start_date, end_date, **kwargs):
+        self.calls.append(symbol)
+        time.sleep(0.2)
+        return pd.DataFrame({'close': [1.0]}, index=pd.DatetimeIndex(['2024-01-02'], name='date'))
+
+    def get_minute_data(self, symbol, start_time, end_time, frequency='1', **kwargs):
+        raise NotImplementedError
+
+    def get_stock_list(self, **kwargs):
+        return pd.DataFrame(columns=['code', 'name'])
+
+    def get_etf_list(self, **kwargs):
+        return pd.DataFrame(columns=['code', 'name'])
+
+
+@pytest.fixture
+def slow_backend(monkeypatch):
+    _SlowProvider.calls = []
+    monkeypatch.setitem(backends._registered_backends, 'slow_stub', _SlowProvider)
+    # 离线的测试后端，不构建交易日历
+    monkeypatch.setitem(backends._backend_config, 'slow_stub', {'calendar': False})
+    monkeypatch.setattr(qdata, '_single_flight', SingleFlight())
+    return 'slow_stub'
+
+
+def test_get_daily_data_coalesces_identical_requests(slow_backend):
+    barrier = threading.Barrier(4)
+    frames = []
+
+    def fetch(symbol):
+        barrier.wait()
+        frames.append(qdata.get_daily_data(symbol, '2024-01-01', '2024-01-31', backend=slow_backend,
+                                           use_store=False, use_cache=False))
+
+    threads = [threading.Thread(target=fetch, args=(symbol,)) for symbol in ['600000'] * 3 + ['600001']]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+
+    assert len(frames) == 4
+    # 相同的请求合并为一次，不同证券各自请求
+    assert sorted(_SlowProvider.calls) == ['600000', '600001']
@@ -5,7 +5,7 @@ qindicator - 一个可扩展的股票指标计算插件系统
 """
 
 import logging
-from typing import Optional
+from typing import TYPE_CHECKING, Any, Optional
 import pandas as pd
 
 # 设置日志配置
@@ -19,11 +19,11 @@ logger = logging.getLogger(__name__)
 __version__ = "0.1.0"
 __author__ = "AstockQuant Team"
 
-# 导入实际存在的模块
-from qindicator.backends.talib.indicator import TalibIndicator
+if TYPE_CHECKING:
+    from qindicator.backends.talib.indicator import TalibIndicator
 
 # 快捷工厂函数，用于获取指标计算器实例
-def get_indicator_calculator(calculator_type: str = "talib") -> Optional[TalibIndicator]:
+def get_indicator_calculator(calculator_type: str = "talib") -> Optional['TalibIndicator']:
     """
     获取指标计算器实例
     
@@ -34,14 +34,24 @@ def get_indicator_calculator(calculator_type: str = "talib") -> Optional[TalibIn
         指标计算器实例
     """
     if calculator_type.lower() == "talib":
+        # talib在首次创建计算器时才导入
+        from qindicator.backends.talib.indicator import TalibIndicator
         return TalibIndicator()
     else:
         logger.error(f"不支持的计算器类型: {calculator_type}")
         return None
 
 
+def __getattr__(name: str) -> Any:
+    # TalibIndicator在首次访问时才导入talib
+    if name == 'TalibIndicator':
+        from qindicator.backends.talib.indicator import TalibIndicator
+        return TalibIndicator
+    raise AttributeError(f"module 'qindicator' has no attribute '{name}'")
+
+
 # 定义模块导出列表
 __all__ = [
     'TalibIndicator',
     'get_indicator_calculator'
-]
\ No newline at end of file
+]
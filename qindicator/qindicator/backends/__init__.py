@@ -5,6 +5,7 @@
 
 from typing import Dict, Type, Optional
 import importlib
+import importlib.util
 import logging
 
 from qindicator.core.indicator import Indicator
@@ -111,18 +112,16 @@ def create_indicator(backend_name: str = None, **kwargs) -> Indicator:
     backend_class = get_backend(backend_name)
     return backend_class(**kwargs)
 
-# 自动注册配置中的后端
+# 检查配置中的后端
 def _auto_register_backends():
     """
-    自动注册配置中的后端
+    检查配置中后端的依赖包是否已安装
+
+    只查找包而不导入，talib等后端在首次调用get_backend时才导入
     """
-    for name in _backend_config:
-        try:
-            get_backend(name)
-        except ImportError:
-            logger.info(f"后端 {name} 的依赖包未安装，暂不注册")
-        except Exception as e:
-            logger.error(f"注册后端 {name} 时出错: {e}")
+    for name, config in _backend_config.items():
+        if importlib.util.find_spec(config['required_package']) is None:
+            logger.info(f"后端 {name} 的依赖包未安装，暂不可用")
 
-# 自动注册后端
-_auto_register_backends()
\ No newline at end of file
+# 检查后端
+_auto_register_backends()
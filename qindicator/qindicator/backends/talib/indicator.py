@@ -3,9 +3,45 @@
 """
 
 import talib
+import numpy as np
 import pandas as pd
+from typing import Any, Dict, Iterable, Tuple
 from qindicator.core.indicator import Indicator, DataManager
 
+
+class _ArrayFrame:
+    """
+    calculate_many传给calculate_*方法的数组视图
+    copy()返回自身，读取列时返回只转换一次的float64数组，写入列时只记录计算结果，
+    各指标因此直接在共享的NumPy数组上计算，不会复制输入数据
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self._df = df
+        self._arrays: Dict[str, np.ndarray] = {}
+        self._outputs: Dict[str, np.ndarray] = {}
+
+    def copy(self) -> '_ArrayFrame':
+        return self
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        array = self._arrays.get(column)
+        if array is None:
+            if column not in self._df.columns:
+                raise ValueError(f"输入数据缺少'{column}'列")
+            array = np.ascontiguousarray(self._df[column].to_numpy(dtype='float64'))
+            self._arrays[column] = array
+        return array
+
+    def __setitem__(self, column: str, value: np.ndarray) -> None:
+        self._outputs[column] = value
+
+    def pop_outputs(self) -> Dict[str, np.ndarray]:
+        """取出上一个指标写入的结果"""
+        outputs, self._outputs = self._outputs, {}
+        return outputs
+
+
 class TalibIndicator(Indicator):
     """
     基于TA-Lib库的指标计算实现
@@ -43,6 +79,82 @@ class TalibIndicator(Indicator):
         
         return indicator_method(df, **kwargs)
     
+    def calculate_many(self, data: pd.DataFrame, specs: Iterable, include_input: bool = True) -> pd.DataFrame:
+        """
+        一次计算多个指标
+        输入数据只准备一次并转换为NumPy数组，各指标直接在数组上计算，最后一次组装结果，
+        不会像逐个调用calculate_*那样为每个指标复制一次输入数据
+        
+        Args:
+            data: 包含股票数据的DataFrame
+            specs: 指标列表，每项为指标类型（如'rsi'）、(指标类型, 参数字典)或包含'type'键的参数字典，
+                例如['rsi', ('ma', {'timeperiod': 20}), {'type': 'macd', 'fastperiod': 6}]
+            include_input: 结果是否包含输入数据的列，默认为True，与calculate_*的返回一致
+        
+        Returns:
+            pd.DataFrame: 包含全部指标结果的DataFrame，列名与对应的calculate_*方法相同；
+                列名重复时（如不同周期的RSI）后出现的列名加上参数值，例如'RSI_6'；
+                没有参数或加上参数值后仍然重名时改为加上指标在specs中的位置，例如['rsi', 'rsi']得到'RSI'和'RSI_1'
+        """
+        # 验证数据
+        if not self._validate_data(data):
+            raise ValueError("输入数据无效，至少需要包含'close'列")
+        
+        # 准备数据
+        df = self.data_manager.prepare_data(data)
+        frame = _ArrayFrame(df)
+        
+        results = {}
+        
+        def taken(name: str) -> bool:
+            return name in results or (include_input and name in df.columns)
+        
+        for position, spec in enumerate(specs):
+            indicator_type, kwargs = self._parse_spec(spec)
+            indicator_method = getattr(self, f'calculate_{indicator_type}', None)
+            if indicator_method is None:
+                raise ValueError(f"不支持的指标类型: {indicator_type}")
+            indicator_method(frame, **kwargs)
+            
+            suffix = '_'.join(str(value) for value in kwargs.values())
+            for column, values in frame.pop_outputs().items():
+                if taken(column):
+                    # 先尝试加参数值，没有参数或仍然重名时加指标在specs中的位置
+                    candidates = ([f'{column}_{suffix}'] if suffix else []) + [f'{column}_{position}']
+                    unique = next((name for name in candidates if not taken(name)), None)
+                    if unique is None:
+                        raise ValueError(f"第{position}个指标的结果列{column}与已有列重名")
+                    column = unique
+                results[column] = values
+        
+        result = pd.DataFrame(results, index=df.index)
+        if include_input:
+            result = pd.concat([df, result], axis=1)
+        return result
+    
+    @staticmethod
+    def _parse_spec(spec: Any) -> Tuple[str, Dict[str, Any]]:
+        """
+        解析calculate_many的指标配置
+        
+        Args:
+            spec: 指标类型、(指标类型, 参数字典)或包含'type'键的参数字典
+        
+        Returns:
+            Tuple[str, Dict[str, Any]]: 指标类型和参数
+        """
+        if isinstance(spec, str):
+            return spec.lower(), {}
+        if isinstance(spec, dict):
+            kwargs = dict(spec)
+            indicator_type = kwargs.pop('type', None)
+        else:
+            indicator_type, kwargs = spec
+            kwargs = dict(kwargs or {})
+        if not isinstance(indicator_type, str):
+            raise ValueError(f"无效的指标配置: {spec}")
+        return indicator_type.lower(), kwargs
+    
     def calculate_ma(self, df: pd.DataFrame, timeperiod: int = 5) -> pd.DataFrame:
         """
         计算移动平均线（MA）
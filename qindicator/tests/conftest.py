@@ -0,0 +1,8 @@
+"""
+qindicator测试的公共配置
+"""
+import os
+import sys
+
+# 优先导入本目录下的qindicator包
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
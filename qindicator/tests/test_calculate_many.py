@@ -0,0 +1,65 @@
+"""
+TalibIndicator.calculate_many的测试
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('talib')
+
+from qindicator.backends.talib.indicator import TalibIndicator
+
+
+@pytest.fixture
+def ohlcv():
+    rng = np.random.default_rng(0)
+    close = 100 + np.cumsum(rng.normal(0, 1, 200))
+    return pd.DataFrame({
+        'open': close + rng.normal(0, 0.5, 200),
+        'high': close + np.abs(rng.normal(0, 1, 200)),
+        'low': close - np.abs(rng.normal(0, 1, 200)),
+        'close': close,
+        'volume': rng.integers(1000, 10000, 200),
+    }, index=pd.date_range('2024-01-01', periods=200, freq='D'))
+
+
+def test_matches_individual_calls(ohlcv):
+    calculator = TalibIndicator()
+    specs = [
+        ('ma', {'timeperiod': 20}),
+        ('ema', {'timeperiod': 12}),
+        'rsi',
+        ('bbands', {'timeperiod': 20}),
+        'macd',
+        'atr',
+        'cdldoji',
+    ]
+    many = calculator.calculate_many(ohlcv, specs)
+
+    for spec in specs:
+        indicator_type, kwargs = (spec, {}) if isinstance(spec, str) else spec
+        single = calculator.calculate(ohlcv, indicator_type, **kwargs)
+        for column in single.columns.difference(ohlcv.columns):
+            np.testing.assert_allclose(many[column].to_numpy(dtype=float), single[column].to_numpy(dtype=float),
+                                       equal_nan=True, err_msg=column)
+
+    pd.testing.assert_frame_equal(many[ohlcv.columns], ohlcv, check_freq=False)
+
+
+def test_duplicate_columns_are_made_unique(ohlcv):
+    calculator = TalibIndicator()
+    result = calculator.calculate_many(ohlcv, [('rsi', {'timeperiod': 6}), 'rsi', 'rsi'], include_input=False)
+
+    assert list(result.columns) == ['RSI', 'RSI_1', 'RSI_2']
+    np.testing.assert_allclose(result['RSI'], calculator.calculate_rsi(ohlcv, timeperiod=6)['RSI'], equal_nan=True)
+    np.testing.assert_allclose(result['RSI_1'], calculator.calculate_rsi(ohlcv)['RSI'], equal_nan=True)
+
+
+def test_parameter_suffix_for_repeated_indicator(ohlcv):
+    result = TalibIndicator().calculate_many(ohlcv, ['rsi', ('rsi', {'timeperiod': 6})], include_input=False)
+    assert list(result.columns) == ['RSI', 'RSI_6']
+
+
+def test_unknown_indicator_raises(ohlcv):
+    with pytest.raises(ValueError):
+        TalibIndicator().calculate_many(ohlcv, ['not_an_indicator'])
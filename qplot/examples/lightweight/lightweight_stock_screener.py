@@ -46,44 +46,67 @@ class StockScreener:
         try:
             logger.info(f"获取股票 {code} 的数据")
             df = qdata.get_daily_data(code, self.start_date, self.end_date, backend='akshare')
-            
-            # 处理数据格式
-            if 'date' not in df.columns and df.index.name == 'date':
-                df = df.reset_index()
-            
-            # 确保日期列正确
-            if 'date' in df.columns:
-                df['date'] = pd.to_datetime(df['date'])
-            elif 'trade_date' in df.columns:
-                df['date'] = pd.to_datetime(df['trade_date'])
-            
-            # 按日期排序
-            df = df.sort_values(by="date", ascending=True)
-            
-            # 重命名列
-            if 'vol' in df.columns and 'volume' not in df.columns:
-                df.rename(columns={"vol": "volume"}, inplace=True)
-            
-            # 选择需要的列
-            required_columns = [col for col in ["date", "open", "high", "low", "close", "volume"] if col in df.columns]
-            df = df[required_columns]
-            
-            # 计算一些基本指标用于筛选
-            if len(df) > 20:
-                df['ma20'] = df['close'].rolling(window=20).mean()
-                df['return_1m'] = df['close'].pct_change(20) * 100  # 1个月回报率
-                df['volatility'] = df['close'].pct_change().rolling(window=20).std() * 100 * np.sqrt(252)  # 年化波动率
-            
+            df = self._process_stock_data(df)
             self.stock_data[code] = df
             return df
         except Exception as e:
             logger.error(f"获取股票 {code} 数据失败: {e}")
             return None
     
+    def prefetch_stock_data(self, codes):
+        """并发批量获取多个股票的数据"""
+        codes = [code for code in codes if code not in self.stock_data]
+        if not codes:
+            return
+        
+        logger.info(f"批量获取 {len(codes)} 只股票的数据")
+        result = qdata.get_daily_data_batch(codes, self.start_date, self.end_date, backend='akshare')
+        for code, df in result.items():
+            try:
+                self.stock_data[code] = self._process_stock_data(df)
+            except Exception as e:
+                logger.error(f"处理股票 {code} 数据失败: {e}")
+        for code, err in result.failed.items():
+            logger.error(f"获取股票 {code} 数据失败: {err}")
+    
+    def _process_stock_data(self, df):
+        """整理数据格式并计算筛选用的基本指标"""
+        # 处理数据格式
+        if 'date' not in df.columns and df.index.name == 'date':
+            df = df.reset_index()
+        
+        # 确保日期列正确
+        if 'date' in df.columns:
+            df['date'] = pd.to_datetime(df['date'])
+        elif 'trade_date' in df.columns:
+            df['date'] = pd.to_datetime(df['trade_date'])
+        
+        # 按日期排序
+        df = df.sort_values(by="date", ascending=True)
+        
+        # 重命名列
+        if 'vol' in df.columns and 'volume' not in df.columns:
+            df.rename(columns={"vol": "volume"}, inplace=True)
+        
+        # 选择需要的列
+        required_columns = [col for col in ["date", "open", "high", "low", "close", "volume"] if col in df.columns]
+        df = df[required_columns]
+        
+        # 计算一些基本指标用于筛选
+        if len(df) > 20:
+            df['ma20'] = df['close'].rolling(window=20).mean()
+            df['return_1m'] = df['close'].pct_change(20) * 100  # 1个月回报率
+            df['volatility'] = df['close'].pct_change().rolling(window=20).std() * 100 * np.sqrt(252)  # 年化波动率
+        
+        return df
+    
     def screen_stocks(self, min_return=None, max_volatility=None, above_ma20=False):
         """根据条件筛选股票"""
         results = []
         
+        # 先并发获取所有股票的数据，再逐个筛选
+        self.prefetch_stock_data(self.sample_stocks)
+        
         for code in self.sample_stocks:
             df = self.fetch_stock_data(code)
             if df is None or len(df) < 20:
@@ -5,32 +5,158 @@
 
 import qdata
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime
+from importlib.util import find_spec
+from itertools import repeat
+import numpy as np
+import os
+import re
 import threading
 import time
 import logging
 
 logger = logging.getLogger(__name__)
 
+# 环形缓冲区的默认容量：日线约4年，分钟线约8个交易日
+DEFAULT_CAPACITY = {'daily': 1024, 'minute': 2048}
+
+
+class BarRingBuffer:
+    """
+    K线环形缓冲区
+    预先分配时间戳和各列的数组，按时间顺序原地追加K线，超出容量时覆盖最早的K线；
+    追加数据中与最后一根K线时间相同的K线原地替换，用于更新尚未收盘的K线
+    """
+
+    def __init__(self, capacity: int):
+        """
+        初始化环形缓冲区
+
+        Args:
+            capacity: 容量（K线条数）
+        """
+        self.capacity = max(int(capacity), 1)
+        self._ts = np.empty(self.capacity, dtype='int64')
+        self._columns = {}
+        self._index_name = 'date'
+        self._tz = None
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _position(self, offset: int) -> int:
+        return (self._start + offset) % self.capacity
+
+    def last_timestamp(self):
+        """
+        最后一根K线的时间
+
+        Returns:
+            pd.Timestamp: 最后一根K线的时间，缓冲区为空时返回None
+        """
+        if not self._size:
+            return None
+        ts = pd.Timestamp(int(self._ts[self._position(self._size - 1)]))
+        return ts.tz_localize('UTC').tz_convert(self._tz) if self._tz is not None else ts
+
+    def load(self, df: pd.DataFrame) -> None:
+        """
+        以df替换缓冲区的全部内容，按df的列分配数组，df超过容量时扩大容量
+
+        Args:
+            df: 以DatetimeIndex为索引并按时间排序的数据
+        """
+        self.capacity = max(self.capacity, len(df))
+        self._ts = np.empty(self.capacity, dtype='int64')
+        self._columns = {name: np.empty(self.capacity, dtype=df[name].to_numpy().dtype) for name in df.columns}
+        self._index_name = df.index.name or 'date'
+        self._tz = df.index.tz
+        self._start = 0
+        self._size = 0
+        self.extend(df)
+
+    def extend(self, df: pd.DataFrame) -> int:
+        """
+        追加df中不早于最后一根K线的数据，与最后一根K线时间相同的K线原地替换
+
+        Args:
+            df: 以DatetimeIndex为索引并按时间排序的数据，只保存load时已有的列
+
+        Returns:
+            int: 新增的K线条数（不含替换的K线）
+        """
+        ts = df.index.values.astype('datetime64[ns]').astype('int64')
+        last = int(self._ts[self._position(self._size - 1)]) if self._size else None
+        if last is not None:
+            keep = ts >= last
+            ts, df = ts[keep], df[keep]
+        if len(ts) > self.capacity:
+            ts, df = ts[-self.capacity:], df.iloc[-self.capacity:]
+        if not len(ts):
+            return 0
+
+        replace = int(last is not None and ts[0] == last)
+        positions = (self._start + self._size - replace + np.arange(len(ts))) % self.capacity
+        self._ts[positions] = ts
+        for name in list(self._columns):
+            self._write(name, positions, df[name].to_numpy() if name in df.columns else None)
+
+        size = self._size - replace + len(ts)
+        self._start = (self._start + max(size - self.capacity, 0)) % self.capacity
+        self._size = min(size, self.capacity)
+        return len(ts) - replace
+
+    def _write(self, name: str, positions: np.ndarray, values) -> None:
+        """写入一列，必要时提升数组类型；values为None表示新数据缺少该列"""
+        column = self._columns[name]
+        if values is None:
+            if column.dtype.kind in 'iub':
+                column = column.astype('float64')
+            values = {'O': None, 'M': np.datetime64('NaT'), 'm': np.timedelta64('NaT')}.get(column.dtype.kind, np.nan)
+        elif not np.can_cast(values.dtype, column.dtype, 'same_kind'):
+            column = column.astype(np.result_type(column.dtype, values.dtype))
+        column[positions] = values
+        self._columns[name] = column
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        按时间顺序复制出缓冲区的数据
+
+        Returns:
+            pd.DataFrame: 以DatetimeIndex为索引的数据
+        """
+        order = (self._start + np.arange(self._size)) % self.capacity
+        index = pd.DatetimeIndex(self._ts[order].view('datetime64[ns]'), name=self._index_name)
+        if self._tz is not None:
+            index = index.tz_localize('UTC').tz_convert(self._tz)
+        return pd.DataFrame({name: column[order] for name, column in self._columns.items()}, index=index)
+
+
 class DataManager:
     """
     数据管理器类
     负责管理股票数据的获取、缓存和更新
+    以DatetimeIndex为索引的数据保存在环形缓冲区中，update_data只获取最后一根K线之后的数据并原地追加
     """
     
-    def __init__(self, symbol: str, data_type: str = 'daily'):
+    def __init__(self, symbol: str, data_type: str = 'daily', capacity: int = None):
         """
         初始化数据管理器
         
         Args:
             symbol: 证券代码
             data_type: 数据类型，'daily'或'minute'
+            capacity: 环形缓冲区容量（K线条数），默认为None表示按数据类型使用DEFAULT_CAPACITY
         """
         self.symbol = symbol
         self.data_type = data_type
-        self.data = None
-        self.last_update_time = None
+        self.capacity = capacity or DEFAULT_CAPACITY.get(data_type, DEFAULT_CAPACITY['daily'])
         self.lock = threading.RLock()  # 使用可重入锁保护数据访问
+        self._buffer = BarRingBuffer(self.capacity)
+        self._frame = None  # 缓冲区数据的DataFrame副本，或无法放入缓冲区的原始数据
+        self.last_update_time = None
         
         # 尝试初始化qdata，但避免因qdata模块问题导致程序崩溃
         try:
@@ -40,10 +166,66 @@ class DataManager:
         except Exception as e:
             logger.warning(f"尝试初始化qdata时出错: {e}")
     
+    @property
+    def data(self):
+        """当前数据，缓冲区有变化后首次访问时生成新的DataFrame"""
+        with self.lock:
+            if self._frame is None and len(self._buffer):
+                self._frame = self._buffer.to_frame()
+            return self._frame
+    
+    @data.setter
+    def data(self, value):
+        with self.lock:
+            self._buffer = BarRingBuffer(self.capacity)
+            self._frame = value
+            # 没有时间索引的数据原样保存，之后的update_data按完整窗口获取
+            if value is not None and isinstance(value.index, pd.DatetimeIndex):
+                if not value.index.is_monotonic_increasing:
+                    value = self._frame = value.sort_index()
+                self._buffer.load(value)
+    
+    def _fetch_window(self):
+        """缓冲区为空时获取默认窗口的数据：日线为最近一个月，分钟线为当天"""
+        if self.data_type == 'daily':
+            # 按交易日历获取最近一个月（约22个交易日）的数据
+            calendar = qdata.calendar_for(self.symbol)
+            end = calendar.previous_session(datetime.now())
+            end_date = end.strftime('%Y-%m-%d')
+            start_date = calendar.sessions_back(end, 22).strftime('%Y-%m-%d')
+            return qdata.get_daily_data(self.symbol, start_date, end_date)
+        if self.data_type == 'minute':
+            # 获取当天的分时数据
+            today = datetime.now().strftime('%Y-%m-%d')
+            return qdata.get_minute_data(self.symbol, today, today, frequency='1')
+        raise ValueError(f"不支持的数据类型: {self.data_type}")
+    
+    def _fetch_since(self, last: pd.Timestamp):
+        """从qdata获取last（含）之后的数据，last所在的K线可能还未收盘，一并重新获取"""
+        now = datetime.now()
+        if self.data_type == 'daily':
+            end = qdata.calendar_for(self.symbol).previous_session(now)
+            if end is None or end < pd.Timestamp(last.date()):
+                return None
+            return qdata.get_daily_data(self.symbol, last.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d'))
+        if self.data_type == 'minute':
+            return qdata.get_minute_data(
+                self.symbol, last.strftime('%Y-%m-%d %H:%M:%S'), now.strftime('%Y-%m-%d %H:%M:%S'), frequency='1'
+            )
+        raise ValueError(f"不支持的数据类型: {self.data_type}")
+    
+    def _store(self, data: pd.DataFrame) -> None:
+        """
+        保存新获取或传入的数据（子类实现具体逻辑）
+        """
+        # 由具体的子类实现
+        pass
+    
     def update_data(self, data=None) -> None:
         """
         更新数据
-        获取最新数据或使用传入的数据更新现有数据
+        使用传入的数据替换现有数据；否则缓冲区为空时获取默认窗口的数据，
+        已有数据时只获取最后一根K线之后的数据追加到缓冲区，并替换可能还未收盘的最后一根K线
         
         Args:
             data: 可选，直接传入的数据，若为None则从qdata获取数据
@@ -52,27 +234,29 @@ class DataManager:
             try:
                 # 如果传入了数据，直接使用
                 if data is not None:
+                    self._store(data)
                     self.data = data
                     self.last_update_time = datetime.now()
                     logger.info(f"已使用传入数据更新{self.symbol}的{self.data_type}数据")
                     return
                 
-                # 根据数据类型获取最新数据
-                if self.data_type == 'daily':
-                    # 获取最近一个月的数据
-                    end_date = datetime.now().strftime('%Y-%m-%d')
-                    start_date = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
-                    new_data = qdata.get_daily_data(self.symbol, start_date, end_date)
-                elif self.data_type == 'minute':
-                    # 获取当天的分时数据
-                    today = datetime.now().strftime('%Y-%m-%d')
-                    new_data = qdata.get_minute_data(self.symbol, today, today, freq='1min')
+                last = self._buffer.last_timestamp()
+                if last is None:
+                    new_data = self._fetch_window()
+                    if new_data is not None and not new_data.empty:
+                        self._store(new_data)
+                        self.data = new_data
                 else:
-                    raise ValueError(f"不支持的数据类型: {self.data_type}")
+                    new_data = self._fetch_since(last)
+                    if new_data is not None and not new_data.empty:
+                        self._store(new_data)
+                        if not new_data.index.is_monotonic_increasing:
+                            new_data = new_data.sort_index()
+                        added = self._buffer.extend(new_data)
+                        self._frame = None
+                        logger.debug(f"已追加{self.symbol}的{added}条{self.data_type}数据")
                 
-                # 更新数据
-                if new_data is not None and not new_data.empty:
-                    self.data = new_data
+                if new_data is not None:
                     self.last_update_time = datetime.now()
                     logger.info(f"已更新{self.symbol}的{self.data_type}数据，最新时间: {self.last_update_time}")
             except Exception as e:
@@ -91,7 +275,7 @@ class DataManager:
                 if self.data_type == 'daily':
                     self.data = qdata.get_daily_data(self.symbol, start_date, end_date)
                 elif self.data_type == 'minute':
-                    self.data = qdata.get_minute_data(self.symbol, start_date, end_date, freq='1min')
+                    self.data = qdata.get_minute_data(self.symbol, start_date, end_date, frequency='1')
                 else:
                     raise ValueError(f"不支持的数据类型: {self.data_type}")
                 
@@ -159,13 +343,57 @@ class DataManager:
             self.last_update_time = None
             logger.info(f"已清除{self.symbol}的{self.data_type}缓存数据")
 
+def _datetime_indexed(df: pd.DataFrame) -> pd.DataFrame:
+    """返回以DatetimeIndex为索引并按时间排序的数据"""
+    if not isinstance(df.index, pd.DatetimeIndex):
+        if 'date' in df.columns:
+            df = df.set_index(pd.to_datetime(df['date'])).drop(columns='date')
+        else:
+            df = df.set_index(pd.to_datetime(df.index))
+    if not df.index.is_monotonic_increasing:
+        df = df.sort_index()
+    return df
+
+
+def _to_ns(value, end: bool = False, tz=None) -> int:
+    """
+    时间转换为数据库中保存的纳秒时间戳（带时区的时间为UTC）
+
+    Args:
+        value: 日期或时间
+        end: 是否为区间终点，终点只给到日期时包含当天的全部分钟数据
+        tz: 数据的时区，不带时区的value按该时区解释
+    """
+    ts = pd.Timestamp(value)
+    if end and isinstance(value, str) and len(value.strip()) <= 10:
+        ts = ts + pd.Timedelta(days=1) - pd.Timedelta(1, 'ns')
+    if tz is not None and ts.tzinfo is None:
+        ts = ts.tz_localize(tz)
+    return ts.value
+
+
 class DatabaseDataManager(DataManager):
     """
     数据库数据管理器
-    扩展基本数据管理器，增加数据库存储功能
+    扩展基本数据管理器，K线按(symbol, ts)主键写入SQLite或DuckDB：
+    写入时按主键覆盖已有K线，区间读取走主键索引，
+    update_data新获取的K线同时写入数据库，重新启动后从数据库恢复而不必重新获取
     """
-    
-    def __init__(self, symbol: str, data_type: str = 'daily', db_path: str = None):
+
+    # 保存的K线字段
+    COLUMNS = ('open', 'high', 'low', 'close', 'volume', 'amount')
+
+    # 支持的数据库引擎
+    ENGINES = ('sqlite', 'duckdb')
+
+    def __init__(
+        self,
+        symbol: str,
+        data_type: str = 'daily',
+        db_path: str = None,
+        engine: str = 'sqlite',
+        capacity: int = None
+    ):
         """
         初始化数据库数据管理器
         
@@ -173,9 +401,19 @@ class DatabaseDataManager(DataManager):
             symbol: 证券代码
             data_type: 数据类型，'daily'或'minute'
             db_path: 数据库路径，默认为None
+            engine: 数据库引擎，'sqlite'（默认，无需额外依赖）或'duckdb'
+            capacity: 环形缓冲区容量（K线条数），也是从数据库恢复的K线条数
         """
-        super().__init__(symbol, data_type)
+        super().__init__(symbol, data_type, capacity)
+        if engine not in self.ENGINES:
+            raise ValueError(f"不支持的数据库引擎: {engine}，可选: {', '.join(self.ENGINES)}")
+        if engine == 'duckdb' and find_spec('duckdb') is None:
+            raise ImportError("未找到duckdb库，请先安装: pip install qplot[duckdb]")
+        self.engine = engine
         self.db_path = db_path if db_path else f'./data/{symbol}_{data_type}.db'
+        # 同一个数据库文件可以保存多种数据类型，每种数据类型一张表
+        self.table = 'bars_' + re.sub(r'\W', '_', data_type)
+        self.conn = None
         self._init_database()
     
     def _init_database(self):
@@ -184,7 +422,6 @@ class DatabaseDataManager(DataManager):
         """
         try:
             # 确保目录存在
-            import os
             db_dir = os.path.dirname(self.db_path)
             if db_dir and not os.path.exists(db_dir):
                 os.makedirs(db_dir)
@@ -197,21 +434,163 @@ class DatabaseDataManager(DataManager):
     
     def _connect_db(self):
         """
-        连接数据库（子类实现具体逻辑）
+        连接数据库并创建K线表
+        (symbol, ts)为主键，SQLite使用WITHOUT ROWID表，K线按主键顺序存放，区间读取只需扫描主键索引
         """
-        # 由具体的子类实现
-        pass
+        if self.engine == 'duckdb':
+            import duckdb
+            self.conn = duckdb.connect(self.db_path)
+            suffix = ''
+        else:
+            import sqlite3
+            # 自动提交模式，事务由_write显式控制；图表刷新线程和调用线程共用连接，由self.lock保护
+            self.conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('PRAGMA synchronous=NORMAL')
+            suffix = ' WITHOUT ROWID'
+        fields = ', '.join(f'{name} DOUBLE' for name in self.COLUMNS)
+        self.conn.execute(
+            f'CREATE TABLE IF NOT EXISTS {self.table} ('
+            f'symbol VARCHAR NOT NULL, ts BIGINT NOT NULL, {fields}, '
+            f'PRIMARY KEY (symbol, ts)){suffix}'
+        )
+        # ts保存UTC纳秒时间戳，带时区的数据另外记录时区，读取时还原，与环形缓冲区的时间一致
+        self.conn.execute(
+            f'CREATE TABLE IF NOT EXISTS {self.table}_tz (symbol VARCHAR NOT NULL PRIMARY KEY, tz VARCHAR NOT NULL)'
+        )
     
-    def save_to_db(self):
+    def _write(self, rows: list, tz: str = '') -> None:
+        """在一个事务中按主键写入或覆盖K线，并记录数据的时区（不带时区时为空字符串）"""
+        names = ('symbol', 'ts') + self.COLUMNS
+        updates = ', '.join(f'{name} = excluded.{name}' for name in self.COLUMNS)
+        sql = (
+            f"INSERT INTO {self.table} ({', '.join(names)}) VALUES ({', '.join('?' * len(names))}) "
+            f'ON CONFLICT (symbol, ts) DO UPDATE SET {updates}'
+        )
+        self.conn.execute('BEGIN')
+        try:
+            self.conn.executemany(sql, rows)
+            self.conn.execute(
+                f'INSERT INTO {self.table}_tz (symbol, tz) VALUES (?, ?) '
+                f'ON CONFLICT (symbol) DO UPDATE SET tz = excluded.tz',
+                [self.symbol, tz]
+            )
+        except Exception:
+            self.conn.execute('ROLLBACK')
+            raise
+        self.conn.execute('COMMIT')
+    
+    def save_to_db(self, data: pd.DataFrame = None) -> int:
         """
-        将数据保存到数据库（子类实现具体逻辑）
+        将数据写入数据库，已存在的K线按(symbol, ts)覆盖
+        
+        Args:
+            data: 要写入的数据，默认为当前缓存的数据
+        
+        Returns:
+            int: 写入的K线条数
         """
-        # 由具体的子类实现
-        pass
+        with self.lock:
+            df = self.data if data is None else data
+            if self.conn is None or df is None or df.empty:
+                return 0
+            df = _datetime_indexed(df)
+            ts = df.index.values.astype('datetime64[ns]').astype('int64').tolist()
+            columns = [
+                df[name].astype(float).tolist() if name in df.columns else [None] * len(df)
+                for name in self.COLUMNS
+            ]
+            tz = df.index.tz
+            self._write(list(zip(repeat(self.symbol), ts, *columns)), str(tz) if tz is not None else '')
+            return len(ts)
+    
+    def _stored_tz(self):
+        """数据库中该证券K线的时区，不带时区时返回None"""
+        row = self.conn.execute(f'SELECT tz FROM {self.table}_tz WHERE symbol = ?', [self.symbol]).fetchone()
+        return row[0] if row and row[0] else None
+    
+    def _from_ns(self, values, tz):
+        """数据库中的UTC纳秒时间戳还原为时间，带时区的数据转换回原来的时区"""
+        index = pd.DatetimeIndex(pd.to_datetime(values, unit='ns'), name='date')
+        return index.tz_localize('UTC').tz_convert(tz) if tz else index
+    
+    def load_from_db(self, start=None, end=None, limit: int = None) -> pd.DataFrame:
+        """
+        从数据库读取区间内的数据并作为当前缓存的数据
+        
+        Args:
+            start: 开始日期或时间，默认为None表示不限；数据带时区时，不带时区的start按数据的时区解释
+            end: 结束日期或时间，默认为None表示不限；只给到日期时包含当天的全部数据
+            limit: 最多读取区间内最近的limit条，默认为None表示不限
+        
+        Returns:
+            pd.DataFrame: 以时间为索引的K线数据，写入时带时区的数据还原为原来的时区
+        """
+        with self.lock:
+            if self.conn is None:
+                return pd.DataFrame()
+            tz = self._stored_tz()
+            sql = f"SELECT ts, {', '.join(self.COLUMNS)} FROM {self.table} WHERE symbol = ?"
+            params = [self.symbol]
+            if start is not None:
+                sql += ' AND ts >= ?'
+                params.append(_to_ns(start, tz=tz))
+            if end is not None:
+                sql += ' AND ts <= ?'
+                params.append(_to_ns(end, end=True, tz=tz))
+            if limit is None:
+                rows = self.conn.execute(sql + ' ORDER BY ts', params).fetchall()
+            else:
+                rows = self.conn.execute(sql + ' ORDER BY ts DESC LIMIT ?', params + [int(limit)]).fetchall()[::-1]
+            df = pd.DataFrame.from_records(rows, columns=('ts',) + self.COLUMNS)
+            df.index = self._from_ns(df.pop('ts').to_numpy(dtype='int64'), tz)
+            self.data = df
+            return df
+    
+    def last_timestamp(self):
+        """
+        数据库中该证券最后一根K线的时间
+        
+        Returns:
+            pd.Timestamp: 最后一根K线的时间，没有数据时返回None
+        """
+        with self.lock:
+            if self.conn is None:
+                return None
+            row = self.conn.execute(
+                f'SELECT ts FROM {self.table} WHERE symbol = ? ORDER BY ts DESC LIMIT 1',
+                [self.symbol]
+            ).fetchone()
+            return self._from_ns([row[0]], self._stored_tz())[0] if row else None
     
-    def load_from_db(self):
+    def _store(self, data: pd.DataFrame) -> None:
         """
-        从数据库加载数据（子类实现具体逻辑）
+        新获取或传入的数据写入数据库
         """
-        # 由具体的子类实现
-        pass
\ No newline at end of file
+        self.save_to_db(data)
+    
+    def update_data(self, data=None) -> None:
+        """
+        更新数据并写入数据库
+        缓存为空时先从数据库恢复最近的K线，之后与DataManager相同，只获取最后一根K线之后的数据；
+        数据库为空时按DataManager的默认窗口获取
+        
+        Args:
+            data: 可选，直接传入的数据，若为None则从qdata获取数据
+        """
+        with self.lock:
+            if data is None and self._frame is None and not len(self._buffer):
+                try:
+                    self.load_from_db(limit=self.capacity)
+                except Exception as e:
+                    logger.error(f"从数据库加载{self.symbol}的{self.data_type}数据时出错: {e}")
+            super().update_data(data)
+    
+    def close(self) -> None:
+        """
+        关闭数据库连接
+        """
+        with self.lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
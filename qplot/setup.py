@@ -50,6 +50,9 @@ setup(
         ],
         'pyecharts': [
             'pyecharts>=1.9.0',  # pyecharts绘图库
+        ],
+        'duckdb': [
+            'duckdb>=0.8.0',  # DatabaseDataManager的DuckDB存储引擎
         ]
     },
     classifiers=[
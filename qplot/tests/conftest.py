@@ -0,0 +1,17 @@
+"""
+qplot测试的公共配置
+"""
+import os
+import sys
+
+import pytest
+
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# 优先导入本目录下的qplot包，以及同一仓库中的qdata
+sys.path.insert(0, os.path.join(_ROOT, 'qdata'))
+sys.path.insert(0, os.path.join(_ROOT, 'qplot'))
+
+# 导入qplot时会加载各绘图后端
+for _module in ('numpy', 'pandas', 'matplotlib', 'mplfinance', 'pyecharts'):
+    pytest.importorskip(_module)
@@ -0,0 +1,89 @@
+"""
+DatabaseDataManager的写入、区间读取和重启恢复（SQLite）
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from qplot.core.data_manager import DatabaseDataManager
+
+
+def _bars(start, periods, freq='D', close=None, tz=None):
+    index = pd.date_range(start, periods=periods, freq=freq, name='date', tz=tz)
+    close = np.arange(periods, dtype='float64') if close is None else np.asarray(close, dtype='float64')
+    return pd.DataFrame({'open': close, 'high': close, 'low': close, 'close': close,
+                         'volume': np.ones(periods), 'amount': np.ones(periods)}, index=index)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'bars.db')
+
+
+def test_upsert_overwrites_by_timestamp(db_path):
+    manager = DatabaseDataManager('600000', 'daily', db_path=db_path)
+    assert manager.save_to_db(_bars('2024-01-01', 3)) == 3
+    assert manager.save_to_db(_bars('2024-01-03', 2, close=[30, 40])) == 2
+
+    df = manager.load_from_db()
+    assert list(df.index) == list(pd.date_range('2024-01-01', periods=4, name='date'))
+    assert df['close'].tolist() == [0, 1, 30, 40]
+    manager.close()
+
+
+def test_range_reads(db_path):
+    manager = DatabaseDataManager('600000', 'minute', db_path=db_path)
+    manager.save_to_db(_bars('2024-01-02 09:31', 3, freq='min'))
+    manager.save_to_db(_bars('2024-01-03 09:31', 3, freq='min', close=[10, 11, 12]))
+
+    # 只给到日期的终点包含当天的全部分钟数据
+    day = manager.load_from_db('2024-01-02', '2024-01-02')
+    assert day['close'].tolist() == [0, 1, 2]
+    assert manager.load_from_db('2024-01-02 09:32', '2024-01-03 09:31')['close'].tolist() == [1, 2, 10]
+    assert manager.load_from_db(limit=2)['close'].tolist() == [11, 12]
+    assert manager.last_timestamp() == pd.Timestamp('2024-01-03 09:33')
+    manager.close()
+
+
+def test_symbols_share_a_database(db_path):
+    first = DatabaseDataManager('600000', 'daily', db_path=db_path)
+    second = DatabaseDataManager('000001', 'daily', db_path=db_path)
+    first.save_to_db(_bars('2024-01-01', 2))
+    second.save_to_db(_bars('2024-01-01', 3))
+    assert len(first.load_from_db()) == 2
+    assert len(second.load_from_db()) == 3
+    first.close()
+    second.close()
+
+
+def test_restart_restores_from_database(db_path, monkeypatch):
+    manager = DatabaseDataManager('600000', 'daily', db_path=db_path, capacity=3)
+    manager.update_data(_bars('2024-01-01', 5))
+    manager.close()
+
+    restarted = DatabaseDataManager('600000', 'daily', db_path=db_path, capacity=3)
+    requested = []
+    monkeypatch.setattr(restarted, '_fetch_since', lambda last: requested.append(last))
+    restarted.update_data()
+
+    assert requested == [pd.Timestamp('2024-01-05')]
+    assert list(restarted.data.index) == list(pd.date_range('2024-01-03', periods=3, name='date'))
+    restarted.close()
+
+
+def test_timezone_round_trip(db_path):
+    bars = _bars('2024-01-02 09:31', 3, freq='min', tz='Asia/Shanghai')
+    manager = DatabaseDataManager('600000', 'minute', db_path=db_path)
+    manager.save_to_db(bars)
+    manager.close()
+
+    restarted = DatabaseDataManager('600000', 'minute', db_path=db_path)
+    df = restarted.load_from_db()
+    assert str(df.index.tz) == 'Asia/Shanghai'
+    assert list(df.index) == list(bars.index)
+    # 不带时区的区间按数据的时区解释
+    assert len(restarted.load_from_db('2024-01-02 09:32', '2024-01-02')) == 2
+    assert restarted.last_timestamp() == bars.index[-1]
+    # 恢复的数据与环形缓冲区的时间一致
+    assert restarted._buffer.last_timestamp() == bars.index[-1]
+    restarted.close()
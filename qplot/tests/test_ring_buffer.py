@@ -0,0 +1,99 @@
+"""
+K线环形缓冲区与DataManager的增量更新
+"""
+import numpy as np
+import pandas as pd
+
+from qplot.core.data_manager import BarRingBuffer, DataManager
+
+
+def _bars(start, periods, freq='D', close=None, tz=None, volume_dtype='int64'):
+    index = pd.date_range(start, periods=periods, freq=freq, name='date', tz=tz)
+    close = np.arange(periods, dtype='float64') if close is None else np.asarray(close, dtype='float64')
+    return pd.DataFrame({'close': close, 'volume': np.arange(periods).astype(volume_dtype)}, index=index)
+
+
+def test_wraparound_keeps_latest_bars_in_order():
+    buffer = BarRingBuffer(5)
+    buffer.load(_bars('2024-01-01', 3))
+    added = buffer.extend(_bars('2024-01-04', 4, close=[10, 11, 12, 13]))
+    assert added == 4
+    assert len(buffer) == 5
+
+    frame = buffer.to_frame()
+    assert list(frame.index) == list(pd.date_range('2024-01-03', periods=5, name='date'))
+    assert frame['close'].tolist() == [2, 10, 11, 12, 13]
+    assert buffer.last_timestamp() == pd.Timestamp('2024-01-07')
+
+    # 多次绕回后仍按时间顺序
+    for day in range(8, 20):
+        buffer.extend(_bars(f'2024-01-{day:02d}', 1, close=[day]))
+    assert buffer.to_frame()['close'].tolist() == [15, 16, 17, 18, 19]
+
+
+def test_extend_longer_than_capacity_keeps_tail():
+    buffer = BarRingBuffer(3)
+    buffer.load(_bars('2024-01-01', 1))
+    buffer.extend(_bars('2024-01-02', 10))
+    assert list(buffer.to_frame().index) == list(pd.date_range('2024-01-09', periods=3, name='date'))
+
+
+def test_open_last_bar_is_replaced_in_place():
+    buffer = BarRingBuffer(10)
+    buffer.load(_bars('2024-01-01 09:31', 3, freq='min'))
+    update = _bars('2024-01-01 09:33', 2, freq='min', close=[99, 100])
+    assert buffer.extend(update) == 1
+
+    frame = buffer.to_frame()
+    assert len(frame) == 4
+    assert frame['close'].tolist() == [0, 1, 99, 100]
+    # 早于最后一根K线的数据被忽略
+    assert buffer.extend(_bars('2024-01-01 09:31', 1, freq='min', close=[-1])) == 0
+    assert buffer.to_frame()['close'].iloc[0] == 0
+
+
+def test_write_promotes_dtypes():
+    buffer = BarRingBuffer(10)
+    buffer.load(_bars('2024-01-01', 2))
+    assert buffer.to_frame()['volume'].dtype == np.int64
+
+    buffer.extend(_bars('2024-01-03', 1, volume_dtype='float64').assign(volume=[1.5]))
+    frame = buffer.to_frame()
+    assert frame['volume'].dtype == np.float64
+    assert frame['volume'].tolist() == [0, 1, 1.5]
+
+    # 新数据缺少的列补NaN，整数列先提升为浮点
+    buffer = BarRingBuffer(10)
+    buffer.load(_bars('2024-01-01', 2))
+    buffer.extend(_bars('2024-01-03', 1)[['close']])
+    frame = buffer.to_frame()
+    assert frame['volume'].dtype == np.float64
+    assert np.isnan(frame['volume'].iloc[-1])
+
+
+def test_timezone_is_preserved():
+    buffer = BarRingBuffer(4)
+    buffer.load(_bars('2024-01-02 09:31', 2, freq='min', tz='Asia/Shanghai'))
+    buffer.extend(_bars('2024-01-02 09:33', 1, freq='min', tz='Asia/Shanghai'))
+    frame = buffer.to_frame()
+    assert str(frame.index.tz) == 'Asia/Shanghai'
+    assert frame.index[-1] == pd.Timestamp('2024-01-02 09:33', tz='Asia/Shanghai')
+    assert buffer.last_timestamp() == frame.index[-1]
+
+
+def test_update_data_fetches_only_new_bars(monkeypatch):
+    manager = DataManager('600000', 'daily', capacity=4)
+    manager.update_data(_bars('2024-01-01', 3))
+    requested = []
+
+    def fetch_since(last):
+        requested.append(last)
+        return _bars(last, 3, close=[20, 21, 22])
+
+    monkeypatch.setattr(manager, '_fetch_since', fetch_since)
+    manager.update_data()
+
+    assert requested == [pd.Timestamp('2024-01-03')]
+    data = manager.data
+    assert list(data.index) == list(pd.date_range('2024-01-02', periods=4, name='date'))
+    assert data['close'].tolist() == [1, 20, 21, 22]
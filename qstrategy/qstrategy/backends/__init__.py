@@ -6,6 +6,7 @@
 提供策略的注册、获取和管理功能
 """
 
+import importlib
 import logging
 from typing import Dict, Type, Optional, Any
 
@@ -16,6 +17,22 @@ logger = logging.getLogger(__name__)
 # 存储已注册的策略类
 _registered_strategies: Dict[str, Type[Strategy]] = {}
 
+# 尚未导入的策略：策略名称 -> 模块路径，首次使用时才导入模块（及backtrader、qindicator）
+_lazy_strategies: Dict[str, str] = {}
+
+# 内置策略所在的模块，模块导入时自行注册
+_builtin_strategies = {
+    'sma_cross': 'qstrategy.backends.sma_cross',
+    'macd': 'qstrategy.backends.macd',
+    'rsi': 'qstrategy.backends.rsi',
+    'bbands': 'qstrategy.backends.bbands',
+    'PairTrading': 'qstrategy.backends.pair_trading',
+    'volatility_breakout': 'qstrategy.backends.volatility_breakout',
+    'mean_reversion': 'qstrategy.backends.mean_reversion',
+    'macd_kdj': 'qstrategy.backends.macd_kdj',
+    'turtle': 'qstrategy.backends.turtle',
+}
+
 # 默认策略配置
 _default_strategy = None
 
@@ -38,9 +55,42 @@ def register_strategy(name: str, strategy_class: Type[Strategy]) -> None:
         logger.warning(f"策略 '{name}' 已存在，将被覆盖")
     
     _registered_strategies[name] = strategy_class
+    _lazy_strategies.pop(name, None)
     logger.info(f"已注册策略: {name}")
 
 
+def register_lazy_strategy(name: str, module_path: str) -> None:
+    """
+    登记一个延迟加载的策略，模块在首次使用该策略时才导入
+    
+    Args:
+        name: 策略名称
+        module_path: 策略模块路径，模块导入时需要调用register_strategy注册策略类
+    """
+    if name not in _registered_strategies:
+        _lazy_strategies[name] = module_path
+
+
+def _load_strategy(name: str) -> Optional[Type[Strategy]]:
+    """
+    返回已注册的策略类，延迟加载的策略先导入其模块
+    
+    Args:
+        name: 策略名称
+    
+    Returns:
+        Optional[Type[Strategy]]: 策略类，策略不存在时返回None
+    """
+    if name not in _registered_strategies and name in _lazy_strategies:
+        module_path = _lazy_strategies[name]
+        try:
+            importlib.import_module(module_path)
+        except ImportError as e:
+            logger.error(f"加载策略 '{name}' 的模块 {module_path} 失败: {e}")
+            raise
+    return _registered_strategies.get(name)
+
+
 def get_strategy(name: str, **kwargs) -> Strategy:
     """
     获取指定名称的策略实例
@@ -55,11 +105,11 @@ def get_strategy(name: str, **kwargs) -> Strategy:
     Raises:
         ValueError: 当指定名称的策略未注册时
     """
-    if name not in _registered_strategies:
-        available = ', '.join(_registered_strategies.keys())
+    strategy_class = _load_strategy(name)
+    if strategy_class is None:
+        available = ', '.join(get_available_strategies())
         raise ValueError(f"未找到名称为 '{name}' 的策略。可用的策略有: {available}")
     
-    strategy_class = _registered_strategies[name]
     try:
         strategy_instance = strategy_class(**kwargs)
         logger.info(f"已创建策略实例: {name}")
@@ -79,8 +129,8 @@ def set_default_strategy(name: str) -> None:
     Raises:
         ValueError: 当指定名称的策略未注册时
     """
-    if name not in _registered_strategies:
-        available = ', '.join(_registered_strategies.keys())
+    if not is_strategy_registered(name):
+        available = ', '.join(get_available_strategies())
         raise ValueError(f"未找到名称为 '{name}' 的策略。可用的策略有: {available}")
     
     global _default_strategy
@@ -107,12 +157,12 @@ def get_default_strategy(**kwargs) -> Optional[Strategy]:
 
 def get_available_strategies() -> list:
     """
-    获取所有可用的策略名称
+    获取所有可用的策略名称，包括尚未导入的延迟加载策略
     
     Returns:
         list: 策略名称列表
     """
-    return list(_registered_strategies.keys())
+    return list(_registered_strategies) + [name for name in _lazy_strategies if name not in _registered_strategies]
 
 
 def is_strategy_registered(name: str) -> bool:
@@ -125,7 +175,7 @@ def is_strategy_registered(name: str) -> bool:
     Returns:
         bool: 如果策略已注册则返回True，否则返回False
     """
-    return name in _registered_strategies
+    return name in _registered_strategies or name in _lazy_strategies
 
 
 def create_strategy(name: str, **kwargs) -> Strategy:
@@ -151,31 +201,22 @@ def get_strategy_class(name: str) -> Optional[Type[Strategy]]:
     Returns:
         Optional[Type[Strategy]]: 策略类，如果策略未注册则返回None
     """
-    return _registered_strategies.get(name)
+    return _load_strategy(name)
 
 
 # 自动注册策略
-# 当模块被导入时，尝试导入并注册所有可用的策略
-# 这样用户在导入qstrategy模块时，就能自动使用所有已实现的策略
+# 当模块被导入时只登记内置策略的模块路径，策略模块在首次使用时才导入，
+# 导入qstrategy不会加载backtrader和qindicator
 
 def _auto_register_strategies():
     """
-    自动注册所有策略
-    这个函数会在模块被导入时自动执行
+    登记所有内置策略
+    这个函数会在qstrategy模块被导入时执行
     """
-    try:
-        # 导入内置策略
-        from qstrategy.backends import sma_cross, macd, rsi, bbands, pair_trading, volatility_breakout
-        from qstrategy.backends import mean_reversion
-        from qstrategy.backends import macd_kdj
-        from qstrategy.backends import turtle
-        
-        # 这里不需要显式注册，每个策略模块内部应该有自注册逻辑
-        logger.info("已自动导入所有内置策略")
-    except ImportError as e:
-        logger.warning(f"自动注册策略失败: {e}")
+    for name, module_path in _builtin_strategies.items():
+        register_lazy_strategy(name, module_path)
 
 
 # 当模块被导入时自动执行策略注册
 # _auto_register_strategies()
-# 注意：自动注册会在qstrategy.__init__.py中显式调用
\ No newline at end of file
+# 注意：自动注册会在qstrategy.__init__.py中显式调用
@@ -168,35 +168,51 @@ class PairTradingStrategy(Strategy):
         
         return BacktraderPairTradingStrategy
     
-    def init_data(self, data: Dict[str, pd.DataFrame]) -> None:
+    def init_data(self, data, copy: bool = True) -> None:
         """
         初始化策略数据
         
         Args:
-            data: 包含两只股票数据的字典，格式为{'stock1': df1, 'stock2': df2}
+            data: 包含两只股票数据的字典，格式为{'stock1': df1, 'stock2': df2}，
+                也可以是以(date, symbol)为多级索引的面板DataFrame（如qdata.get_panel_data的返回值）
+            copy: 是否复制数据，传入qdata内存映射的只读数据时可设为False
         
         Raises:
             ValueError: 当数据格式不符合要求时
         """
-        # 验证数据格式
-        if not isinstance(data, dict) or len(data) != 2:
-            raise ValueError("配对交易策略需要两只股票的数据，格式为{'stock1': df1, 'stock2': df2}")
-        
-        # 提取两只股票的数据
-        stock_keys = list(data.keys())
-        self._stock1_data = data[stock_keys[0]].copy()
-        self._stock2_data = data[stock_keys[1]].copy()
+        if isinstance(data, pd.DataFrame) and isinstance(data.index, pd.MultiIndex):
+            # 面板数据已经按统一日历对齐，只需按证券拆分
+            symbols = list(data.index.get_level_values('symbol').unique())
+            if len(symbols) != 2:
+                raise ValueError("配对交易策略需要两只股票的面板数据")
+            panel = data.dropna(how='all')
+            self._stock1_data = panel.xs(symbols[0], level='symbol')
+            self._stock2_data = panel.xs(symbols[1], level='symbol')
+            aligned = self._stock1_data.index.equals(self._stock2_data.index)
+            data = {symbols[0]: self._stock1_data, symbols[1]: self._stock2_data}
+        else:
+            # 验证数据格式
+            if not isinstance(data, dict) or len(data) != 2:
+                raise ValueError("配对交易策略需要两只股票的数据，格式为{'stock1': df1, 'stock2': df2}")
+            
+            # 提取两只股票的数据
+            stock_keys = list(data.keys())
+            self._stock1_data = data[stock_keys[0]].copy(deep=copy)
+            self._stock2_data = data[stock_keys[1]].copy(deep=copy)
+            aligned = False
         
         # 验证数据完整性
         self._validate_data(self._stock1_data)
         self._validate_data(self._stock2_data)
         
         # 确保两只股票的日期范围一致
-        common_dates = self._stock1_data.index.intersection(self._stock2_data.index)
-        self._stock1_data = self._stock1_data.loc[common_dates]
-        self._stock2_data = self._stock2_data.loc[common_dates]
+        if not aligned:
+            common_dates = self._stock1_data.index.intersection(self._stock2_data.index)
+            self._stock1_data = self._stock1_data.loc[common_dates]
+            self._stock2_data = self._stock2_data.loc[common_dates]
         
         # 保存数据
+        self._copy_data = copy
         self._data = data
     
     def calculate_indicators(self) -> pd.DataFrame:
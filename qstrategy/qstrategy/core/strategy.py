@@ -26,6 +26,7 @@ class Strategy(ABC):
         """
         self._params = kwargs
         self._data = None
+        self._copy_data = True
         self._signals = None
         self._logger = logging.getLogger(f"{self.__class__.__name__}")
     
@@ -79,16 +80,19 @@ class Strategy(ABC):
         """
         self._signals = value
     
-    def init_data(self, data: pd.DataFrame) -> None:
+    def init_data(self, data: pd.DataFrame, copy: bool = True) -> None:
         """
         初始化策略数据
         
         Args:
             data: 包含股票数据的DataFrame
+            copy: 是否复制数据；传入qdata内存映射的只读数据时可设为False，
+                此时只做浅拷贝，新增的指标列不影响原数据，但不能原地修改已有列
         """
         # 验证数据格式
         self._validate_data(data)
-        self._data = data.copy()
+        self._copy_data = copy
+        self._data = data.copy(deep=copy)
     
     def _validate_data(self, data: pd.DataFrame) -> None:
         """
@@ -120,7 +124,7 @@ class Strategy(ABC):
         # 默认实现，在子类中可以覆盖
         if self._data is None:
             raise ValueError("数据尚未初始化，请先调用init_data()")
-        return self._data.copy()
+        return self._data.copy(deep=self._copy_data)
     
     @abstractmethod
     def generate_signals(self) -> Dict[str, Any]:
@@ -28,6 +28,18 @@ except ImportError as e:
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 历史数据请求未指定起始时间时返回的交易日数（约500个自然日）
+HISTORY_SESSIONS = 340
+
+def _exchange_of(code: str) -> str:
+    """A股代码所属的交易所"""
+    if code.startswith(('6', '9', '5')):
+        return 'SSE'
+    if code.startswith(('4', '8')):
+        return 'BSE'
+    return 'SZSE'
+
+
 class QDataStockManager:
     """使用qdata管理股票数据"""
     
@@ -42,10 +54,8 @@ class QDataStockManager:
             print(f"❌ QData initialization failed: {e}")
             self.initialized = False
         
-        # 数据缓存
-        self.cache = {}
-        self.cache_ttl = {}
-        self.cache_duration = 300  # 5分钟缓存
+        # 数据缓存使用qdata进程内共享的有界内存缓存，不再单独维护字典
+        self.cache = qdata.get_memory_cache()
         
         # 预定义的股票代码映射 (TradingView格式 -> A股代码)
         self.symbol_mapping = {
@@ -101,7 +111,7 @@ class QDataStockManager:
         return tv_symbol
     
     def search_symbols(self, query: str, limit: int = 10) -> List[Dict]:
-        """搜索股票"""
+        """搜索股票：先匹配预定义的股票，再查询qdata的证券主数据索引"""
         results = []
         query_upper = query.upper()
         
@@ -118,7 +128,22 @@ class QDataStockManager:
                 })
                 
                 if len(results) >= limit:
-                    break
+                    return results
+        
+        try:
+            matches = qdata.search_symbols(query, limit=limit - len(results))
+        except Exception as e:
+            logger.warning(f"搜索证券失败: {e}")
+            return results
+        
+        for match in matches:
+            results.append({
+                'symbol': match['code'],
+                'full_name': match['code'],
+                'description': match['name'],
+                'exchange': _exchange_of(match['code']),
+                'type': match['type']
+            })
         
         return results
     
@@ -143,33 +168,62 @@ class QDataStockManager:
                 'volume_precision': 0,
                 'data_status': 'streaming'
             }
+        
+        # 不在预定义列表中的证券从qdata的证券主数据中查找
+        try:
+            instrument = qdata.get_instrument(tv_symbol)
+        except Exception as e:
+            logger.warning(f"查询证券信息失败: {e}")
+            instrument = None
+        if instrument is not None:
+            exchange = _exchange_of(instrument['code'])
+            return {
+                'name': instrument['code'],
+                'ticker': instrument['code'],
+                'exchange-traded': exchange,
+                'exchange-listed': exchange,
+                'timezone': 'Asia/Shanghai',
+                'minmov': 1,
+                'minmov2': 0,
+                'pointvalue': 1,
+                'session': '0930-1500',
+                'has_intraday': True,
+                'has_no_volume': False,
+                'description': instrument['name'],
+                'type': instrument['type'],
+                'pricescale': 1000 if instrument['type'] == 'etf' else 100,
+                'supported_resolutions': ['1', '5', '15', '30', '60', 'D', 'W', 'M'],
+                'volume_precision': 0,
+                'data_status': 'streaming'
+            }
         return None
     
-    def get_daily_data(self, tv_symbol: str, days: int = 365) -> pd.DataFrame:
-        """获取日线数据 - 优化为只获取一次"""
+    def get_daily_data(self, tv_symbol: str, days: int = 250) -> pd.DataFrame:
+        """获取最近days个交易日的日线数据（带缓存）"""
         if not self.initialized:
             return pd.DataFrame()
         
-        # 检查缓存 - 使用较长的缓存时间确保只获取一次
-        cache_key = f"{tv_symbol}_daily_data"
-        if (cache_key in self.cache and 
-            cache_key in self.cache_ttl and 
-            time.time() < self.cache_ttl[cache_key]):
-            logger.info(f"从缓存获取 {tv_symbol} 的数据")
-            return self.cache[cache_key]
-        
         try:
             # 获取真实股票代码
             real_symbol = self.get_real_symbol(tv_symbol)
             
-            # 计算日期范围
-            end_date = datetime.datetime.now()
-            start_date = end_date - datetime.timedelta(days=days)
+            # 按交易日历计算日期范围，首尾都是交易日，缓存键在非交易日也保持不变
+            calendar = qdata.calendar_for(real_symbol)
+            end_date = calendar.previous_session(datetime.datetime.now())
+            start_date = calendar.sessions_back(end_date, days)
             
             # 格式化日期
             start_date_str = start_date.strftime('%Y-%m-%d')
             end_date_str = end_date.strftime('%Y-%m-%d')
             
+            # 检查缓存，处理后的数据与qdata原始数据共用同一个有界缓存
+            cache_key = ('udf_daily', real_symbol, start_date_str, end_date_str)
+            if self.cache is not None:
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    logger.info(f"从缓存获取 {tv_symbol} 的数据")
+                    return cached
+            
             # 获取数据
             logger.info(f"获取 {real_symbol} 从 {start_date_str} 到 {end_date_str} 的数据")
             df = qdata.get_daily_data(real_symbol, start_date_str, end_date_str)
@@ -178,9 +232,9 @@ class QDataStockManager:
                 # 数据预处理
                 df = self._process_daily_data(df)
                 
-                # 缓存数据 - 设置为极长的缓存时间，确保只获取一次
-                self.cache[cache_key] = df
-                self.cache_ttl[cache_key] = time.time() + 365 * 24 * 60 * 60  # 缓存一年
+                # 结束日期为当天，按当天数据的过期时间缓存
+                if self.cache is not None:
+                    self.cache.put(cache_key, df, live=True)
                 
                 logger.info(f"成功获取 {len(df)} 条 {tv_symbol} 的数据")
                 return df
@@ -370,8 +424,15 @@ class QDataUDFRequestHandler(BaseHTTPRequestHandler):
             self.wfile.write(json.dumps({"s": "no_data"}).encode())
             return
         
+        # 按请求的起始时间换算需要的交易日数，未指定时取最近一年多的数据
+        days = HISTORY_SESSIONS
+        if from_time > 0:
+            real_symbol = self.stock_manager.get_real_symbol(symbol)
+            from_date = datetime.datetime.fromtimestamp(from_time)
+            days = max(qdata.calendar_for(real_symbol).count_sessions(from_date, datetime.datetime.now()), 1)
+        
         # 获取数据
-        df = self.stock_manager.get_daily_data(symbol, days=500)
+        df = self.stock_manager.get_daily_data(symbol, days=days)
         
         if df.empty:
             self.wfile.write(json.dumps({"s": "no_data"}).encode())
@@ -418,7 +479,7 @@ class QDataUDFRequestHandler(BaseHTTPRequestHandler):
         status = {
             "qdata_initialized": self.stock_manager.initialized,
             "available_stocks": len(self.stock_manager.available_stocks),
-            "cache_size": len(self.stock_manager.cache),
+            "cache": self.stock_manager.cache.stats() if self.stock_manager.cache is not None else None,
             "timestamp": int(time.time())
         }
         self.wfile.write(json.dumps(status, ensure_ascii=False).encode('utf-8'))
@@ -0,0 +1,31 @@
+"""
+各插件导入耗时预算的测试
+较慢的CI机器可以用环境变量IMPORT_BUDGET_SCALE放宽预算，例如IMPORT_BUDGET_SCALE=2
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import import_time_budget  # noqa: E402
+
+# 预算不含numpy和pandas，二者不可用时无法测量
+pytest.importorskip('numpy')
+pytest.importorskip('pandas')
+
+
+@pytest.mark.parametrize('package', sorted(import_time_budget.BUDGETS_MS))
+def test_import_time_within_budget(package):
+    scale = float(os.environ.get('IMPORT_BUDGET_SCALE', '1'))
+    elapsed_ms, budget, heavy = import_time_budget.check(package, scale=scale)
+    assert heavy == [], f"导入{package}时导入了重量级依赖: {', '.join(heavy)}"
+    assert elapsed_ms <= budget, f"导入{package}耗时{elapsed_ms:.1f}ms，超出预算{budget:.0f}ms"
+
+
+def test_measure_ignores_working_directory(monkeypatch):
+    # 在仓库根目录运行时也必须导入插件本身，而不是根目录下的同名包装模块
+    monkeypatch.chdir(os.path.dirname(os.path.abspath(import_time_budget.__file__)))
+    _, modules = import_time_budget.measure('qdata', import_time_budget.plugin_env())
+    assert 'qdata.backends' in modules
@@ -0,0 +1,60 @@
+"""
+延迟加载策略的按名称查找
+"""
+import os
+import sys
+import textwrap
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'qstrategy')))
+
+pytest.importorskip('pandas')
+
+from qstrategy import backends  # noqa: E402
+
+STRATEGY_MODULE = '''
+from qstrategy.backends import register_strategy
+from qstrategy.core.strategy import Strategy
+
+
+class LazyStrategy(Strategy):
+    def generate_signals(self):
+        return {}
+
+    def execute_trade(self):
+        return {}
+
+
+register_strategy('lazy_test', LazyStrategy)
+'''
+
+
+@pytest.fixture
+def lazy_strategy(tmp_path, monkeypatch):
+    (tmp_path / 'lazy_test_strategy.py').write_text(textwrap.dedent(STRATEGY_MODULE), encoding='utf-8')
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(backends, '_registered_strategies', dict(backends._registered_strategies))
+    monkeypatch.setattr(backends, '_lazy_strategies', dict(backends._lazy_strategies))
+    monkeypatch.delitem(sys.modules, 'lazy_test_strategy', raising=False)
+    backends.register_lazy_strategy('lazy_test', 'lazy_test_strategy')
+    return 'lazy_test'
+
+
+def test_get_strategy_imports_lazy_module(lazy_strategy):
+    assert lazy_strategy not in backends._registered_strategies
+    strategy = backends.get_strategy(lazy_strategy, window=5)
+    assert type(strategy).__name__ == 'LazyStrategy'
+    # 第二次直接使用已注册的策略类
+    assert type(backends.get_strategy(lazy_strategy)) is type(strategy)
+
+
+def test_get_strategy_class_imports_lazy_module(lazy_strategy):
+    strategy_class = backends.get_strategy_class(lazy_strategy)
+    assert strategy_class is not None and strategy_class.__name__ == 'LazyStrategy'
+
+
+def test_unknown_strategy():
+    assert backends.get_strategy_class('no_such_strategy') is None
+    with pytest.raises(ValueError):
+        backends.get_strategy('no_such_strategy')